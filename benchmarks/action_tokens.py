@@ -0,0 +1,78 @@
+"""
+Benchmark: resolving an approve/reject click from a signed action token
+versus parsing the notification blocks and looking the request up in the
+leave request store.
+
+Run from the repository root:
+
+    python -m benchmarks.action_tokens
+"""
+
+import os
+import tempfile
+import timeit
+
+from src.metrics import MetricsRegistry
+from src.slack.action_tokens import ActionTokenSigner
+from src.slack.slack_actions import SlackActionsHandler
+from src.storage.leave_requests import LeaveRequestStore
+from src.storage.sqlite import SQLiteDatabase
+
+ITERATIONS = 20000
+
+MESSAGE = {
+    "container": {"channel_id": "C1234567890", "message_ts": "1234567890.123456"},
+    "blocks": [
+        {
+            "type": "section",
+            "fields": [
+                {"type": "mrkdwn", "text": "*Requester:*\n<@U06MKKWAWJX>"},
+                {"type": "mrkdwn", "text": "*Type:*\nPaid Time Off"},
+                {"type": "mrkdwn", "text": "*Duration:*\n2024-03-20 to 2024-03-22"},
+                {"type": "mrkdwn", "text": "*Coverage:*\n<@U06M5QCCLN9>"}
+            ]
+        },
+        {
+            "type": "section",
+            "fields": [
+                {"type": "mrkdwn", "text": "*Tasks to Cover:*\nCode reviews, on-call"},
+                {"type": "mrkdwn", "text": "*Reason:*\nFamily trip"}
+            ]
+        },
+        {"type": "divider"},
+        {"type": "actions", "elements": []}
+    ]
+}
+
+
+def main() -> None:
+    metrics = MetricsRegistry()
+    signer = ActionTokenSigner("benchmark_secret", metrics=metrics)
+    handler = SlackActionsHandler(client=None)
+    token = signer.sign({
+        "request_id": "q2c8Yd0hZk3f",
+        "requester_id": "U06MKKWAWJX",
+        "approver_id": "U06M5QCCLN9",
+        "leave_type": "Paid Time Off",
+        "start_date": "2024-03-20",
+        "end_date": "2024-03-22"
+    })
+    assert signer.verify(token)["start_date"] == handler._extract_request_details(MESSAGE)["start_date"]
+
+    store = LeaveRequestStore(SQLiteDatabase(os.path.join(tempfile.mkdtemp(), "benchmark.db")))
+    request_id = store.create("U06MKKWAWJX", "pto", "2024-03-20", "2024-03-22", leave_type_display="Paid Time Off")
+
+    cases = {
+        "extract from blocks": lambda: handler._extract_request_details(MESSAGE),
+        "store lookup": lambda: store.get(request_id),
+        "verify action token": lambda: signer.verify(token),
+        "sign action token": lambda: signer.sign({"requester_id": "U06MKKWAWJX", "start_date": "2024-03-20"}),
+    }
+    print(f"token length: {len(token)} characters")
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=ITERATIONS, repeat=5))
+        print(f"{name:>22}: {best / ITERATIONS * 1e6:8.2f} us/op")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: deciding whether a click on approve/reject is authorized in an
+organization of 10,000 users and 500 department heads.
+
+Compares the previous check (rebuild the admin list, then accept any
+department head), a correct check that scans the approver's department,
+and the precomputed approval scope of the org directory.
+
+Run from the repository root:
+
+    python -m benchmarks.authorization
+"""
+
+import timeit
+
+from src.config.organization import OrgDirectory, load_admin_users
+
+ITERATIONS = 50000
+HEAD_COUNT = 500
+DEPARTMENT_SIZE = 20
+
+
+def main() -> None:
+    departments = {
+        f"Department {d}": {
+            "head": f"H{d:04d}",
+            "members": [f"U{d:04d}{m:02d}" for m in range(DEPARTMENT_SIZE)]
+        }
+        for d in range(HEAD_COUNT)
+    }
+    admins = load_admin_users()
+    heads = {info["head"] for info in departments.values()}
+    directory = OrgDirectory(departments, admins)
+
+    approver = f"H{HEAD_COUNT - 1:04d}"
+    own_member = f"U{HEAD_COUNT - 1:04d}00"
+    other_member = "U000000"
+
+    def previous(user_id, requester_id):
+        # Any department head passed, whoever the requester was
+        return user_id in load_admin_users() or user_id in heads
+
+    def scan(user_id, requester_id):
+        if user_id in load_admin_users():
+            return True
+        for info in departments.values():
+            if info["head"] == user_id:
+                return requester_id in info["members"]
+        return False
+
+    assert previous(approver, other_member) is True
+    assert scan(approver, other_member) is directory.can_decide(approver, other_member) is False
+
+    cases = {
+        "previous (incorrect)": lambda: previous(approver, other_member),
+        "scan departments, allowed": lambda: scan(approver, own_member),
+        "scan departments, refused": lambda: scan(approver, other_member),
+        "scope index, allowed": lambda: directory.can_decide(approver, own_member),
+        "scope index, refused": lambda: directory.can_decide(approver, other_member),
+        "scope index, non-approver": lambda: directory.can_decide(other_member, own_member),
+    }
+    print(f"{HEAD_COUNT * (DEPARTMENT_SIZE + 1)} users, {HEAD_COUNT} department heads")
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=ITERATIONS, repeat=5))
+        print(f"{name:>28}: {best / ITERATIONS * 1e6:8.3f} us/op")
+    build = min(timeit.repeat(lambda: OrgDirectory(departments, admins), number=10, repeat=3)) / 10
+    print(f"{'build directory':>28}: {build * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: render time and payload size of each message layout, compiled
+template versus building the same blocks from scratch and serializing them.
+
+Run from the repository root:
+
+    python -m benchmarks.block_templates
+"""
+
+import copy
+import json
+import timeit
+
+from src.slack import layouts
+from src.slack.block_templates import BlockTemplate
+
+ITERATIONS = 20000
+
+VALUES = {
+    "user_id": "U06MKKWAWJX",
+    "requester_id": "U06MKKWAWJX",
+    "approver_id": "U06M5QCCLN9",
+    "leave_type": "PTO",
+    "leave_type_display": "Paid Time Off",
+    "start_date": "2024-03-20",
+    "end_date": "2024-03-22",
+    "coverage_person": "U06M5QCCLN9",
+    "covering_user_id": "U06M5QCCLN9",
+    "tasks": "Code reviews, on-call",
+    "tasks_coverage": "Code reviews, on-call",
+    "reason": "Family trip",
+    "denial_reason": "No coverage that week",
+    "approve_value": "q2c8Yd0hZk3f",
+    "reject_value": "q2c8Yd0hZk3f",
+}
+
+
+def from_scratch(node, values):
+    """What the handlers did before: a fresh nested structure with every string formatted."""
+    if isinstance(node, str):
+        return node.format_map(values)
+    if isinstance(node, dict):
+        return {key: from_scratch(value, values) for key, value in node.items()}
+    if isinstance(node, list):
+        return [from_scratch(value, values) for value in node]
+    return copy.copy(node)
+
+
+def measure(fn) -> float:
+    return min(timeit.repeat(fn, number=ITERATIONS, repeat=5)) / ITERATIONS * 1e6
+
+
+def main() -> None:
+    print(f"{'layout':<24}{'bytes':>7}{'scratch':>9}{'render':>9}{'scratch+dumps':>15}{'render+dumps':>14}  (us/op)")
+    for name, template in vars(layouts).items():
+        if not isinstance(template, BlockTemplate):
+            continue
+        values = {field: VALUES[field] for field in template.fields}
+        size = len(json.dumps(template.render(**values), separators=(",", ":")).encode("utf-8"))
+        scratch = measure(lambda: from_scratch(template.blocks, values))
+        render = measure(lambda: template.render(**values))
+        scratch_dumps = measure(lambda: json.dumps(from_scratch(template.blocks, values), separators=(",", ":")))
+        render_dumps = measure(lambda: json.dumps(template.render(**values), separators=(",", ":")))
+        print(f"{name:<24}{size:>7}{scratch:>9.2f}{render:>9.2f}{scratch_dumps:>15.2f}{render_dumps:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark: packed private_metadata versus plain JSON, in size and
+encode/decode time.
+
+Run from the repository root:
+
+    python -m benchmarks.metadata_codec
+"""
+
+import json
+import timeit
+
+from src.slack.metadata import MetadataCodec
+
+ITERATIONS = 50000
+
+METADATA = {
+    "requester_id": "U06MKKWAWJX",
+    "channel_id": "C1234567890",
+    "message_ts": "1234567890.123456",
+    "leave_type": "Paid Time Off",
+    "start_date": "2024-03-20",
+    "end_date": "2024-03-22",
+    "request_id": "q2c8Yd0hZk3f"
+}
+
+
+def main() -> None:
+    codec = MetadataCodec()
+    packed = codec.encode(METADATA)
+    plain = json.dumps(METADATA)
+    assert codec.decode(packed) == METADATA
+
+    print(f"plain JSON: {len(plain)} characters, packed: {len(packed)} characters")
+    cases = {
+        "json.dumps": lambda: json.dumps(METADATA),
+        "codec.encode": lambda: codec.encode(METADATA),
+        "json.loads": lambda: json.loads(plain),
+        "codec.decode": lambda: codec.decode(packed),
+    }
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=ITERATIONS, repeat=5))
+        print(f"{name:>14}: {best / ITERATIONS * 1e6:6.2f} us/op")
+
+
+if __name__ == "__main__":
+    main()
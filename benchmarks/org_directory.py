@@ -0,0 +1,61 @@
+"""
+Benchmark: department routing lookups in a 5,000 person organization,
+scanning every department's member list versus the precomputed directory.
+
+Run from the repository root:
+
+    python -m benchmarks.org_directory
+"""
+
+import timeit
+
+from src.config.organization import OrgDirectory, load_admin_users
+
+ITERATIONS = 20000
+DEPARTMENT_COUNT = 100
+DEPARTMENT_SIZE = 50
+
+
+def main() -> None:
+    departments = {
+        f"Department {d}": {
+            "head": f"H{d:04d}",
+            "members": [f"U{d:04d}{m:03d}" for m in range(DEPARTMENT_SIZE)]
+        }
+        for d in range(DEPARTMENT_COUNT)
+    }
+    admins = [f"A{a:02d}" for a in range(10)]
+    heads = {info["head"] for info in departments.values()}
+    directory = OrgDirectory(departments, admins)
+    # The last department is the worst case for a scan
+    user_id = f"U{DEPARTMENT_COUNT - 1:04d}{DEPARTMENT_SIZE - 1:03d}"
+
+    def scan_head():
+        if user_id in heads:
+            return None
+        for info in departments.values():
+            if user_id in info["members"]:
+                return info["head"]
+        return None
+
+    def scan_authorized():
+        return user_id in load_admin_users() or user_id in heads
+
+    assert scan_head() == directory.head_of.get(user_id)
+
+    cases = {
+        "scan department head": scan_head,
+        "directory department head": lambda: directory.head_of.get(user_id),
+        "load_admin_users per click": scan_authorized,
+        "directory authorization": lambda: user_id in directory.admins or user_id in directory.heads,
+        "build directory": lambda: OrgDirectory(departments, admins),
+    }
+    print(f"{DEPARTMENT_COUNT * DEPARTMENT_SIZE} members in {DEPARTMENT_COUNT} departments")
+    for name, fn in cases.items():
+        number = ITERATIONS if name != "build directory" else 100
+        best = min(timeit.repeat(fn, number=number, repeat=5))
+        print(f"{name:>28}: {best / number * 1e6:10.2f} us/op")
+
+
+if __name__ == "__main__":
+    main()
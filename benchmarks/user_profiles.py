@@ -0,0 +1,84 @@
+"""
+Benchmark: rendering an approval request with the requester's profile.
+
+A stand-in for ``users.info`` sleeps for a typical Slack round trip, then
+the notification blocks are built with the profile looked up directly and
+through the profile cache, and 20 threads look up a cold profile at once.
+
+Run from the repository root:
+
+    python -m benchmarks.user_profiles
+"""
+
+import threading
+import time
+import timeit
+
+from src.metrics import MetricsRegistry
+from src.slack.helpers import create_admin_notification_blocks
+from src.slack.user_profiles import UserProfileCache
+
+ITERATIONS = 20000
+ROUND_TRIP = 0.05
+THREADS = 20
+
+LEAVE_REQUEST = {
+    "user": {"id": "U1"},
+    "leave_type": "pto",
+    "start_date": "2026-11-03",
+    "end_date": "2026-11-05",
+    "reason": "Family trip",
+    "tasks_coverage": "Code reviews",
+    "covering_user": {"id": "U2"},
+}
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    def users_info(self, user):
+        self.calls += 1
+        time.sleep(ROUND_TRIP)
+        return {"user": {"id": user, "real_name": "Ann Lee", "tz_label": "Philippine Standard Time",
+                         "profile": {"display_name": "annie", "title": "Engineer"}}}
+
+
+class Uncached:
+    """Looks the profile up on every render, as a builder without the cache would."""
+
+    def __init__(self, client):
+        # A TTL of 0 keeps nothing
+        self.cache = UserProfileCache(client, ttl=0, metrics=MetricsRegistry())
+
+    def get(self, user_id):
+        return self.cache.get(user_id)
+
+
+def main() -> None:
+    metrics = MetricsRegistry()
+    cached = UserProfileCache(FakeClient(), metrics=metrics)
+    uncached = Uncached(FakeClient())
+
+    render_uncached = min(timeit.repeat(lambda: create_admin_notification_blocks(LEAVE_REQUEST, uncached),
+                                        number=20, repeat=3)) / 20
+    cached.get("U1")
+    render_cached = min(timeit.repeat(lambda: create_admin_notification_blocks(LEAVE_REQUEST, cached),
+                                      number=ITERATIONS, repeat=5)) / ITERATIONS
+    print(f"{'render, users.info per call':>30}: {render_uncached * 1e6:10.1f} us/op")
+    print(f"{'render, cached profile':>30}: {render_cached * 1e6:10.1f} us/op")
+
+    client = FakeClient()
+    cold = UserProfileCache(client, metrics=MetricsRegistry())
+    threads = [threading.Thread(target=cold.get, args=("U1",)) for _ in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"{THREADS} concurrent cold lookups: {client.calls} users.info call(s) "
+          f"in {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
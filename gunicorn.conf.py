@@ -21,6 +21,19 @@ loglevel = "info"
 # keyfile = "/etc/ssl/private/server.key"
 # certfile = "/etc/ssl/certs/server.crt"
 
+def post_worker_init(worker):
+    # Open keep-alive connections to Slack before the worker takes requests
+    from src.app import slack_transport
+    try:
+        slack_transport.warm_up()
+    except Exception as e:
+        worker.log.warning(f"Slack connection warm-up failed: {e}")
+    # Download the workspace user directory now if it is missing or stale
+    from src.app import user_directory
+    if user_directory is not None:
+        user_directory.ensure_running()
+
+
 # Security configurations
 limit_request_line = 4094
 limit_request_fields = 100
@@ -4,20 +4,38 @@ Flask application for handling Slack interactions.
 
 import os
 import json
+import multiprocessing
 import hmac
-import hashlib
-import time
 from flask import Flask, request, jsonify
 from dotenv import load_dotenv
 import logging
 from logging.config import dictConfig
 from pythonjsonlogger import jsonlogger
-from slack_sdk.signature import SignatureVerifier
-from functools import wraps
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
-from src.slack.slack_commands import SlackCommandsHandler
+from src.slack.slack_commands import SlackCommandsHandler, MODAL_TEMPLATE_PATH, DEFAULT_LEAVE_MODAL
+from src.slack.modal_templates import CachedModal
+from src.slack.validation import LeaveFormValidator
+from src.slack.user_directory import UserDirectory
+from src.slack.user_profiles import UserProfileCache
 from src.slack.slack_actions import SlackActionsHandler
+from src.slack.executor import BoundedExecutor
+from src.slack.scatter import ScatterGather
+from src.slack.scheduler import PrioritizedClient, mark_trigger_received
+from src.slack.concurrency import AdaptiveScheduler
+from src.slack.circuit_breaker import CircuitBreaker, CircuitBreakerClient, CircuitGateClient
+from src.slack.verification import SlackRequestVerifier
+from src.slack.action_tokens import ActionTokenSigner, DEFAULT_TTL as DEFAULT_TOKEN_TTL
+from src.slack.metadata import MetadataCodec
+from src.slack.rate_limiter import RateLimiter, RateLimitedClient
+from src.slack.transport import ConnectionPool, PooledWebClient
+from src.config.org_config import OrgConfigWatcher
+from src.metrics import registry as metrics_registry
+from src.storage.sqlite import SQLiteDatabase
+from src.storage.outbox import NotificationOutbox, OutboxDrainer
+from src.storage.idempotency import IdempotencyStore, command_key, interaction_key
+from src.storage.leave_defaults import LeaveDefaultsStore
+from src.storage.leave_requests import LeaveRequestStore
+from src.storage.ttl_store import SQLiteTTLStore
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -59,89 +77,233 @@ dictConfig({
 # Initialize Flask app
 app = Flask(__name__)
 
+# Local SQLite store shared by all gunicorn workers
+database = SQLiteDatabase()
+
+# Idempotency keys shared by all workers, so Slack retries and double-clicks
+# don't repeat side effects
+idempotency = IdempotencyStore(
+    database,
+    ttl=float(os.getenv("SLACK_IDEMPOTENCY_TTL", "900"))
+)
+
+# Signing key is read once per worker; verification runs once per request
+request_verifier = SlackRequestVerifier(
+    os.environ.get("SLACK_SIGNING_SECRET", "test_signing_secret"),
+    replay_cache_size=int(os.getenv("SLACK_REPLAY_CACHE_SIZE", "10000"))
+)
+
+# Durable outbox: Slack calls are recorded in SQLite before the ack and
+# delivered by a drainer thread in each worker, so restarts don't lose them
+outbox = None
+if os.getenv("SLACK_OUTBOX_ENABLED", "true").lower() == "true":
+    outbox = NotificationOutbox(
+        database,
+        max_attempts=int(os.getenv("SLACK_OUTBOX_MAX_ATTEMPTS", "8"))
+    )
+
 # Initialize Slack client and handlers
-slack_client = WebClient(token=os.environ.get("SLACK_BOT_TOKEN"))
-slack_commands = SlackCommandsHandler(slack_client)
-slack_actions = SlackActionsHandler(slack_client)
-signature_verifier = SignatureVerifier(os.environ.get("SLACK_SIGNING_SECRET", "test_signing_secret"))
-
-def verify_slack_request(f):
-    """Decorator to verify Slack requests."""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        timestamp = request.headers.get('X-Slack-Request-Timestamp')
-        signature = request.headers.get('X-Slack-Signature')
-
-        if not timestamp or not signature:
-            app.logger.warning("Invalid request signature")
-            return jsonify({"ok": False, "error": "Invalid request signature"}), 401
-
-        # Check if the timestamp is too old
-        if abs(time.time() - int(timestamp)) > 60 * 5:
-            app.logger.warning("Request too old")
-            return jsonify({"ok": False, "error": "Request too old"}), 401
-
-        # Get request body as string
-        request_body = request.get_data().decode('utf-8')
-
-        # Create signature base string
-        sig_basestring = f"v0:{timestamp}:{request_body}"
-
-        # Calculate signature
-        calculated_signature = 'v0=' + hmac.new(
-            os.environ.get('SLACK_SIGNING_SECRET', '').encode('utf-8'),
-            sig_basestring.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-
-        # Compare signatures using constant time comparison
-        if not hmac.compare_digest(calculated_signature, signature):
-            app.logger.warning("Invalid request signature")
-            return jsonify({"ok": False, "error": "Invalid request signature"}), 401
-
-        return f(*args, **kwargs)
-    return decorated_function
+# API calls reuse keep-alive connections instead of a TLS handshake per call
+http_pool_size = int(os.getenv("SLACK_HTTP_POOL_SIZE", "4"))
+slack_api_timeout = int(os.getenv("SLACK_API_TIMEOUT", "10"))
+slack_transport = PooledWebClient(
+    token=os.environ.get("SLACK_BOT_TOKEN"),
+    timeout=slack_api_timeout,
+    pool=ConnectionPool(max_size=http_pool_size, timeout=slack_api_timeout)
+)
+# Calls fail fast while Slack is degraded instead of tying up the sync
+# workers until the gunicorn timeout
+slack_breaker = CircuitBreaker(
+    failure_rate=float(os.getenv("SLACK_CIRCUIT_FAILURE_RATE", "0.5")),
+    slow_call_seconds=float(os.getenv("SLACK_CIRCUIT_SLOW_CALL_SECONDS", "5")),
+    open_seconds=float(os.getenv("SLACK_CIRCUIT_OPEN_SECONDS", "30")),
+    name="slack_circuit"
+)
+# Trigger-bound calls (views.open) jump ahead of notification traffic for
+# the worker's outbound slots, so the modal opens before the trigger expires.
+# The number of slots adapts to Slack's latency and 429/5xx responses (AIMD).
+slack_scheduler = AdaptiveScheduler(
+    initial_limit=int(os.getenv("SLACK_OUTBOUND_CONCURRENCY", str(http_pool_size))),
+    max_limit=int(os.getenv("SLACK_OUTBOUND_MAX_CONCURRENCY", "32")),
+    latency_target=float(os.getenv("SLACK_OUTBOUND_LATENCY_TARGET", "1.0"))
+)
+# Outbound calls queue per Slack method tier and per channel; each worker
+# gets an equal share of the workspace limits
+rate_limit_workers = int(os.getenv("SLACK_RATE_LIMIT_WORKERS", str(multiprocessing.cpu_count() * 2 + 1)))
+slack_rate_limiter = RateLimiter(
+    share=1.0 / max(1, rate_limit_workers),
+    max_wait=float(os.getenv("SLACK_RATE_LIMIT_MAX_WAIT", "20"))
+)
+
+def build_slack_client(defer_to=None):
+    """Layer the outbound policies over the shared transport.
+
+    `defer_to` is the outbox that takes notifications while the circuit is
+    open; the outbox drainer's own client must not defer.
+    """
+    trigger_budget = float(os.getenv("SLACK_TRIGGER_BUDGET", "2.5"))
+    # An open circuit and a spent trigger budget are checked before any queueing
+    return CircuitGateClient(
+        RateLimitedClient(
+            PrioritizedClient(
+                CircuitBreakerClient(slack_transport, slack_breaker, outbox=defer_to),
+                slack_scheduler,
+                trigger_budget=trigger_budget
+            ),
+            slack_rate_limiter,
+            trigger_budget=trigger_budget
+        ),
+        slack_breaker,
+        outbox=defer_to
+    )
+
+slack_client = build_slack_client(defer_to=outbox)
+
+# The org chart can be kept in a file and changed without a restart
+org_config_watcher = None
+if os.getenv("ORG_CONFIG_PATH"):
+    org_config_watcher = OrgConfigWatcher(
+        os.environ["ORG_CONFIG_PATH"],
+        interval=float(os.getenv("ORG_CONFIG_RELOAD_INTERVAL", "5"))
+    )
+    org_config_watcher.reload()
+
+# Workspace users, from the persisted snapshot at boot and events afterwards
+user_directory = None
+if os.getenv("SLACK_USER_DIRECTORY", "true").lower() == "true":
+    user_directory = UserDirectory(
+        build_slack_client(),
+        database,
+        max_age=float(os.getenv("SLACK_USER_DIRECTORY_MAX_AGE", "86400"))
+    )
+    user_directory.load()
+
+# Requester profiles shown to approvers, cached per worker
+user_profiles = None
+if os.getenv("SLACK_PROFILE_CACHE", "true").lower() == "true":
+    user_profiles = UserProfileCache(
+        build_slack_client(),
+        ttl=float(os.getenv("SLACK_PROFILE_CACHE_TTL", "3600")),
+        negative_ttl=float(os.getenv("SLACK_PROFILE_NEGATIVE_TTL", "300"))
+    )
+
+# Per-user defaults that prefill the leave request form
+leave_defaults = None
+if os.getenv("SLACK_PREFILL_FORM", "true").lower() == "true":
+    leave_defaults = LeaveDefaultsStore(database)
+
+# Ack-first mode: interactions are acknowledged right after validation and the
+# Slack side effects run on a bounded per-worker executor
+side_effect_executor = None
+if os.getenv("SLACK_ACK_FIRST", "true").lower() == "true":
+    side_effect_executor = BoundedExecutor(
+        max_workers=int(os.getenv("SLACK_EXECUTOR_WORKERS", "4")),
+        max_queue=int(os.getenv("SLACK_EXECUTOR_QUEUE_SIZE", "100")),
+        name="side_effects"
+    )
+
+# Independent Slack calls of one interaction (message update, requester DM,
+# approver notification) run concurrently on a per-worker pool
+scatter = ScatterGather(
+    max_workers=int(os.getenv("SLACK_SCATTER_WORKERS", "8")),
+    deadline=float(os.getenv("SLACK_SCATTER_DEADLINE", "10"))
+)
+
+outbox_drainer = None
+if outbox is not None:
+    outbox_drainer = OutboxDrainer(outbox, build_slack_client(), scatter=scatter)
+
+# Requests are recorded in every mode: decisions are a compare-and-set on the
+# stored status, and the form checks new requests against existing ones
+leave_requests = LeaveRequestStore(database)
+
+# Approve/reject buttons carry signed request details, so a click needs no
+# lookup to find the request; only the decision itself is written
+action_tokens = None
+if os.getenv("SLACK_ACTION_TOKENS", "false").lower() == "true":
+    action_tokens = ActionTokenSigner(
+        os.getenv("SLACK_ACTION_TOKEN_SECRET") or os.environ.get("SLACK_SIGNING_SECRET", "test_signing_secret"),
+        ttl=float(os.getenv("SLACK_ACTION_TOKEN_TTL", str(DEFAULT_TOKEN_TTL)))
+    )
+
+# Modal metadata too long for Slack's 3000-character private_metadata is kept here briefly
+metadata_codec = MetadataCodec(
+    SQLiteTTLStore(database, "modal_metadata"),
+    spill_ttl=float(os.getenv("SLACK_METADATA_SPILL_TTL", "3600"))
+)
+
+# Dates and coverage are checked as the leave request form is filled in
+form_validator = LeaveFormValidator(
+    leave_requests,
+    ttl=float(os.getenv("SLACK_VALIDATION_CACHE_TTL", "30")),
+    users=user_directory
+)
+
+slack_actions = SlackActionsHandler(slack_client, executor=side_effect_executor, outbox=outbox, scatter=scatter,
+                                    store=leave_requests, tokens=action_tokens, metadata_codec=metadata_codec,
+                                    defaults=leave_defaults, validator=form_validator, profiles=user_profiles)
+slack_commands = SlackCommandsHandler(
+    slack_client,
+    leave_modal=CachedModal(
+        MODAL_TEMPLATE_PATH,
+        DEFAULT_LEAVE_MODAL,
+        check_interval=float(os.getenv("SLACK_MODAL_RELOAD_INTERVAL", "5"))
+    ),
+    defaults=leave_defaults,
+    submit=slack_actions.submit_leave_request,
+    validator=form_validator
+)
+
+@app.before_request
+def mark_request_arrival():
+    """Start the clock on the request's trigger_id, which Slack expires after 3 seconds."""
+    if request.path.startswith("/slack/"):
+        mark_trigger_received()
+
+@app.before_request
+def ensure_outbox_drainer():
+    """Start this worker's outbox drainer on its first request."""
+    if outbox_drainer is not None:
+        outbox_drainer.ensure_running()
+
+@app.before_request
+def ensure_org_config_watcher():
+    """Start this worker's org config watcher on its first request."""
+    if org_config_watcher is not None:
+        org_config_watcher.ensure_running()
+
+@app.before_request
+def ensure_user_directory_refresh():
+    """Start this worker's user directory refresh on its first request."""
+    if user_directory is not None:
+        user_directory.ensure_running()
 
 @app.before_request
 def verify_slack_requests():
-    """Verify Slack requests before processing."""
-    if request.endpoint in ['slack_commands', 'slack_interactivity', 'slack_actions']:
-        timestamp = request.headers.get('X-Slack-Request-Timestamp')
-        signature = request.headers.get('X-Slack-Signature')
-
-        if not timestamp or not signature:
-            app.logger.warning("Invalid request signature")
-            return jsonify({"ok": False, "error": "Invalid request signature"}), 401
-
-        # Check if the timestamp is too old
-        if abs(time.time() - int(timestamp)) > 60 * 5:
-            app.logger.warning("Request too old")
-            return jsonify({"ok": False, "error": "Request too old"}), 401
-
-        # Get request body as string
-        request_body = request.get_data().decode('utf-8')
-
-        # Create signature base string
-        sig_basestring = f"v0:{timestamp}:{request_body}"
-
-        # Calculate signature
-        calculated_signature = 'v0=' + hmac.new(
-            os.environ.get('SLACK_SIGNING_SECRET', '').encode('utf-8'),
-            sig_basestring.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-
-        # Compare signatures using constant time comparison
-        if not hmac.compare_digest(calculated_signature, signature):
-            app.logger.warning("Invalid request signature")
-            return jsonify({"ok": False, "error": "Invalid request signature"}), 401
+    """Verify the signature of every Slack request once, before routing."""
+    if not request.path.startswith("/slack/"):
+        return None
+
+    error = request_verifier.verify(
+        request.headers.get('X-Slack-Request-Timestamp'),
+        request.headers.get('X-Slack-Signature'),
+        request.get_data()
+    )
+    if error:
+        app.logger.warning(error)
+        return jsonify({"ok": False, "error": error}), 401
+    return None
 
 @app.route("/slack/commands", methods=["POST"])
-@verify_slack_request
 def handle_command():
     """Handle Slack slash commands."""
     try:
-        response = slack_commands.handle_command(request.form)
+        response = idempotency.run(
+            command_key(request.form),
+            lambda: slack_commands.handle_command(request.form),
+            default={"response_type": "ephemeral", "text": "Your request is already being processed."},
+            retry_num=request.headers.get("X-Slack-Retry-Num")
+        )
         return jsonify(response), 200
     except Exception as e:
         logger.error(f"Error handling command: {e}")
@@ -156,49 +318,59 @@ def handle_command():
 def handle_interaction():
     """Handle Slack interactive components."""
     try:
-        # Verify request signature
-        if not verify_slack_request(request):
-            logger.error("Invalid request signature")
-            return jsonify({"error": "Invalid request"}), 401
-
         # Parse payload
         payload = json.loads(request.form["payload"])
-        interaction_type = payload.get("type")
-
-        if interaction_type == "view_submission":
-            # Handle modal submission
-            try:
-                response = slack_actions.handle_view_submission(payload)
-                if not response:
-                    # For successful submissions, return an empty object
-                    return jsonify({}), 200
-                if response.get("response_action") == "errors":
-                    # For validation errors, return the errors
-                    return jsonify(response), 200
-                # For any other response, return empty object
-                return jsonify({}), 200
-            except Exception as e:
-                logger.error(f"Error in view submission: {str(e)}")
-                # On error, return empty object to close modal
-                return jsonify({}), 200
-
-        elif interaction_type == "block_actions":
-            # Handle button clicks and other block actions
-            response = slack_actions.handle_action(payload)
-            if response.get("response_action") == "clear":
-                return jsonify({}), 200
-            return jsonify(response), 200
-
-        # For any other interaction type, return empty object
-        return jsonify({}), 200
+        # Redeliveries and double-clicks get the first delivery's response
+        response = idempotency.run(
+            interaction_key(payload),
+            lambda: dispatch_interaction(payload),
+            default={},
+            retry_num=request.headers.get("X-Slack-Retry-Num")
+        )
+        return jsonify(response), 200
 
     except Exception as e:
         logger.error(f"Error handling interaction: {str(e)}")
         # On error, return empty object
         return jsonify({}), 200
 
+def dispatch_interaction(payload):
+    """Route an interactive payload and build the response body for Slack."""
+    interaction_type = payload.get("type")
+
+    if interaction_type == "view_submission":
+        # Handle modal submission
+        try:
+            response = slack_actions.handle_view_submission(payload)
+            if not response:
+                # For successful submissions, return an empty object
+                return {}
+            if response.get("response_action") == "errors":
+                # For validation errors, return the errors
+                return response
+            # For any other response, return empty object
+            return {}
+        except Exception as e:
+            logger.error(f"Error in view submission: {str(e)}")
+            # On error, return empty object to close modal
+            return {}
+
+    elif interaction_type == "block_actions":
+        action_id = (payload.get("actions") or [{}])[0].get("action_id")
+        if action_id == "reopen_leave_request_form":
+            # Re-open button sent when the /leave trigger expired
+            return slack_commands.reopen_leave_request_form(payload)
+
+        # Handle button clicks and other block actions
+        response = slack_actions.handle_action(payload)
+        if response.get("response_action") == "clear":
+            return {}
+        return response
+
+    # For any other interaction type, return empty object
+    return {}
+
 @app.route("/slack/events", methods=["POST"])
-@verify_slack_request
 def slack_events():
     """Handle Slack events and interactions"""
     data = request.json
@@ -206,9 +378,28 @@ def slack_events():
     # Handle URL verification challenge
     if data.get("type") == "url_verification":
         return jsonify({"challenge": data["challenge"]})
-    
+
+    if data.get("type") == "event_callback":
+        event = data.get("event", {})
+        if user_directory is not None:
+            # team_join / user_change keep the workspace directory current
+            user_directory.apply_event(event)
+        if user_profiles is not None and event.get("type") == "user_change" and isinstance(event.get("user"), dict):
+            # The next approval request shows the changed profile
+            user_profiles.invalidate(event["user"].get("id"))
+
     return jsonify({"ok": True})
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Expose this worker's metrics snapshot to holders of METRICS_TOKEN."""
+    token = os.getenv("METRICS_TOKEN")
+    if not token:
+        return jsonify({"error": "Not found"}), 404
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return jsonify({"error": "Unauthorized"}), 401
+    return jsonify({"pid": os.getpid(), "metrics": metrics_registry.snapshot()}), 200
+
 @app.route("/slack/actions", methods=["POST"])
 def handle_actions():
     """Handle Slack actions - mirrors the interactivity endpoint."""
@@ -0,0 +1,135 @@
+"""
+External organization config with hot reload.
+
+The org chart can live in a JSON (or, with PyYAML installed, YAML) file
+instead of the code:
+
+    {
+        "departments": {
+            "Engineering": {"head": "U01", "members": ["U02", "U03"]},
+            "Platform": {"head": "U04", "members": ["U05"], "reports_to": "U01"}
+        },
+        "admins": ["U01"],
+        "delegations": {"U03": ["U04"]},
+        "hr_channel_id": "C06SEP5F276"
+    }
+
+A watcher thread in each worker polls the file's mtime (which, unlike
+inotify, also sees updates to mounted config such as Kubernetes
+ConfigMaps) and, when it changes, parses and validates a complete new
+directory before installing it with a single swap, so a request either
+sees the old org chart or the new one. A file that fails to parse or
+validate leaves the current directory in place.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.config import organization
+from src.config.organization import OrgDirectory
+from src.metrics import MetricsRegistry, registry as default_registry
+
+logger = logging.getLogger(__name__)
+
+# The env or startup channel, saved before any reload replaces organization.HR_CHANNEL_ID
+DEFAULT_HR_CHANNEL_ID = organization.HR_CHANNEL_ID
+
+
+def parse_org_config(path: Path) -> Dict[str, Any]:
+    """The raw config in a JSON or YAML file."""
+    with path.open('r') as f:
+        if path.suffix.lower() in (".yml", ".yaml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError(f"{path} is YAML but PyYAML is not installed")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def build_directory(config: Dict[str, Any]) -> OrgDirectory:
+    """A validated directory from a parsed config. Raises ValueError if it is inconsistent."""
+    if not isinstance(config, dict) or not isinstance(config.get("departments"), dict):
+        raise ValueError("Org config must have a 'departments' object")
+    admins = config.get("admins", [])
+    if not isinstance(admins, list) or not all(isinstance(admin, str) for admin in admins):
+        raise ValueError("Org config 'admins' must be a list of user IDs")
+    if not admins:
+        raise ValueError("Org config lists no admins")
+    delegations = config.get("delegations", {})
+    if not isinstance(delegations, dict):
+        raise ValueError("Org config 'delegations' must map delegates to the heads they approve for")
+    hr_channel_id = config.get("hr_channel_id") or DEFAULT_HR_CHANNEL_ID
+    return OrgDirectory(config["departments"], admins, hr_channel_id, delegations)
+
+
+class OrgConfigWatcher:
+    """Reloads the org config when its file changes."""
+
+    def __init__(self, path: str, interval: float = 5.0, metrics: Optional[MetricsRegistry] = None):
+        self.path = Path(path)
+        self.interval = interval
+
+        metrics = metrics or default_registry
+        self._reloads = metrics.counter("org_config.reloads")
+        self._reload_errors = metrics.counter("org_config.reload_errors")
+
+        self._mtime: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def reload(self) -> bool:
+        """Install the file's org chart if it changed and is valid. Returns True if installed."""
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError as e:
+            if self._mtime is not None:
+                logger.warning(f"Org config {self.path} is unreadable, keeping the current org chart: {e}")
+            return False
+        if mtime == self._mtime:
+            return False
+        # Not retried until the file changes again, valid or not
+        self._mtime = mtime
+
+        try:
+            directory = build_directory(parse_org_config(self.path))
+        except Exception as e:
+            self._reload_errors.inc()
+            logger.error(f"Invalid org config {self.path}, keeping the current org chart: {e}")
+            return False
+        organization.install_directory(directory)
+        self._reloads.inc()
+        logger.info(f"Loaded org config {self.path}: {len(directory.departments)} departments, "
+                    f"{len(directory.department_of)} people")
+        return True
+
+    def ensure_running(self) -> None:
+        """Start the watch thread for the current process if it is not running."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="org-config-watcher", daemon=True)
+            self._thread.start()
+            self._pid = pid
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Org config watcher error: {e}", exc_info=True)
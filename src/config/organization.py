@@ -3,8 +3,8 @@ Organization configuration module.
 """
 
 import os
-import json
-from typing import List, Dict, Optional
+import threading
+from typing import Dict, FrozenSet, List, Optional, Set
 import logging
 
 # Configure logging
@@ -35,6 +35,9 @@ DEPARTMENTS = {
     }
 }
 
+# Users approving on behalf of department heads (e.g. while they are away): delegate -> heads
+DELEGATIONS: Dict[str, List[str]] = {}
+
 # Set of all department heads
 DEPARTMENT_HEADS = {dept_info["head"] for dept_info in DEPARTMENTS.values()}
 
@@ -47,28 +50,175 @@ def load_admin_users() -> List[str]:
     
     return SUPER_ADMINS + HR_ADMINS
 
+
+# Shared by every user who approves nothing, so a refusal costs one lookup
+_NO_SCOPE: FrozenSet[str] = frozenset()
+
+
+class OrgDirectory:
+    """Immutable lookup tables derived from the department structure.
+
+    Built once per structure, so routing and authorization are dictionary and
+    set lookups rather than scans over every department's member list. The
+    structure is validated while building; a directory that exists is
+    consistent.
+    """
+
+    __slots__ = ("departments", "admin_list", "hr_channel_id", "department_of", "head_of", "members_of",
+                 "heads", "admins", "reports_to", "delegations", "scope")
+
+    def __init__(self, departments: Dict[str, Dict], admins: List[str], hr_channel_id: Optional[str] = None,
+                 delegations: Optional[Dict[str, List[str]]] = None):
+        for name, info in departments.items():
+            head = info.get("head") if isinstance(info, dict) else None
+            members = info.get("members", []) if isinstance(info, dict) else None
+            if not head or not isinstance(head, str):
+                raise ValueError(f"Department {name!r} has no head")
+            if not isinstance(members, list) or not all(isinstance(member, str) and member for member in members):
+                raise ValueError(f"Department {name!r} must list its members as user IDs")
+        heads = {info["head"] for info in departments.values()}
+
+        department_of: Dict[str, str] = {}
+        head_of: Dict[str, str] = {}
+        members_of: Dict[str, Set[str]] = {}
+        # Department heads listed in another head's department, or with an explicit reports_to
+        reports_to: Dict[str, str] = {}
+
+        for name, info in departments.items():
+            head = info["head"]
+            department_of.setdefault(head, name)
+            members_of.setdefault(head, set()).update(member for member in info["members"] if member != head)
+
+            manager = info.get("reports_to")
+            if manager is not None:
+                if manager not in heads:
+                    raise ValueError(f"Department {name!r} reports to {manager!r}, who heads no department")
+                reports_to[head] = manager
+
+            for member in info["members"]:
+                if member == head:
+                    continue
+                if member in heads:
+                    if reports_to.setdefault(member, head) != head:
+                        raise ValueError(f"Department head {member} reports to both {reports_to[member]} and {head}")
+                    continue
+                if head_of.setdefault(member, head) != head:
+                    raise ValueError(f"{member} is listed in {department_of[member]!r} and {name!r} "
+                                     f"under different heads")
+                department_of.setdefault(member, name)
+
+        for head in reports_to:
+            chain = [head]
+            while chain[-1] in reports_to:
+                chain.append(reports_to[chain[-1]])
+                if chain[-1] in chain[:-1]:
+                    raise ValueError(f"Reporting cycle: {' -> '.join(chain)}")
+
+        if delegations is None:
+            delegations = {}
+        for delegate, delegators in delegations.items():
+            if not isinstance(delegators, list):
+                raise ValueError(f"Delegations of {delegate!r} must be a list of department heads")
+            unknown = [delegator for delegator in delegators if delegator not in heads]
+            if unknown:
+                raise ValueError(f"{delegate} is delegated approvals by {', '.join(map(str, unknown))}, "
+                                 f"who head no department")
+
+        # Approver -> requesters they may decide: a head's own team and the heads
+        # reporting to them, plus the scope of every head who delegated to them.
+        # Admins may decide anything and are checked separately.
+        scope: Dict[str, Set[str]] = {head: set(members) for head, members in members_of.items()}
+        for head, manager in reports_to.items():
+            scope[manager].add(head)
+        for delegate, delegators in delegations.items():
+            delegated = scope.setdefault(delegate, set())
+            for delegator in delegators:
+                delegated.update(members_of[delegator])
+                delegated.update(head for head, manager in reports_to.items() if manager == delegator)
+            delegated.discard(delegate)
+
+        self.departments = departments
+        self.admin_list = admins
+        self.delegations = delegations
+        self.scope = {approver: frozenset(requesters) for approver, requesters in scope.items()}
+        self.hr_channel_id = hr_channel_id
+        self.heads = frozenset(heads)
+        # Department heads report to HR, so they have no head of their own
+        self.head_of = head_of
+        self.department_of = department_of
+        self.members_of = {head: frozenset(members) for head, members in members_of.items()}
+        self.admins = frozenset(admins)
+        self.reports_to = reports_to
+
+    def can_decide(self, approver_id: str, requester_id: str) -> bool:
+        """Whether a user may approve or deny a requester's leave."""
+        return approver_id in self.admins or requester_id in self.scope.get(approver_id, _NO_SCOPE)
+
+    def team_members(self, head_id: str) -> FrozenSet[str]:
+        """Users whose requests a department head decides."""
+        return self.members_of.get(head_id, frozenset())
+
+
+_directory_lock = threading.Lock()
+_directory: Optional[OrgDirectory] = None
+
+def _is_current(directory: Optional[OrgDirectory]) -> bool:
+    # Rebuilt only when DEPARTMENTS, ADMIN_USERS or HR_CHANNEL_ID is replaced, e.g. by tests
+    return (directory is not None and directory.departments is DEPARTMENTS and directory.admin_list is ADMIN_USERS
+            and directory.hr_channel_id == HR_CHANNEL_ID and directory.delegations is DELEGATIONS)
+
+def get_directory() -> OrgDirectory:
+    """The current directory snapshot; callers should fetch it once per interaction."""
+    global _directory
+    directory = _directory
+    if not _is_current(directory):
+        with _directory_lock:
+            directory = _directory
+            if not _is_current(directory):
+                directory = _directory = OrgDirectory(DEPARTMENTS, ADMIN_USERS, HR_CHANNEL_ID, DELEGATIONS)
+    return directory
+
+def install_directory(directory: OrgDirectory) -> None:
+    """Make an already validated directory the current one, e.g. after reloading the org config."""
+    global _directory, DEPARTMENTS, DEPARTMENT_HEADS, DEPARTMENT_STRUCTURE, ADMIN_USERS, HR_CHANNEL_ID, DELEGATIONS
+    with _directory_lock:
+        # The module-level names follow for code that reads them directly; readers of
+        # get_directory() switch over in the single assignment to _directory
+        DEPARTMENTS = directory.departments
+        ADMIN_USERS = directory.admin_list
+        HR_CHANNEL_ID = directory.hr_channel_id
+        DELEGATIONS = directory.delegations
+        DEPARTMENT_HEADS = set(directory.heads)
+        DEPARTMENT_STRUCTURE = department_structure(directory)
+        _directory = directory
+
+def department_structure(directory: OrgDirectory) -> Dict[str, Dict]:
+    """Department heads mapped to their department and team members."""
+    return {
+        head: {"department": directory.department_of[head], "team_members": sorted(directory.team_members(head))}
+        for head in directory.members_of
+    }
+
+def get_hr_channel_id() -> Optional[str]:
+    """Channel that receives department heads' requests and unrouted ones."""
+    return get_directory().hr_channel_id
+
+def is_admin(user_id: str) -> bool:
+    """Check if user is an admin."""
+    return user_id in get_directory().admins
+
 def is_department_head(user_id: str) -> bool:
     """Check if user is a department head."""
-    return user_id in DEPARTMENT_HEADS
+    return user_id in get_directory().heads
 
 def get_department_head(user_id: str) -> Optional[str]:
     """Get department head for a user."""
-    # If user is a department head, they report to HR
-    if user_id in DEPARTMENT_HEADS:
-        return None
-        
-    # Look for user in department members
-    for dept_info in DEPARTMENTS.values():
-        if user_id in dept_info["members"]:
-            return dept_info["head"]
-    return None
+    # Department heads are not in head_of: they report to HR
+    return get_directory().head_of.get(user_id)
 
 def get_department_name(user_id: str) -> Optional[str]:
     """Get department name for a user."""
-    for dept_name, dept_info in DEPARTMENTS.items():
-        if user_id in dept_info["members"] or user_id == dept_info["head"]:
-            return dept_name
-    return None
+    return get_directory().department_of.get(user_id)
 
 # Load admin users
 ADMIN_USERS = load_admin_users()
@@ -84,43 +234,6 @@ if not HR_CHANNEL_ID:
     logger.error("SLACK_ADMIN_CHANNEL not set in environment variables")
     HR_CHANNEL_ID = "C06SEP5F276"  # Fallback to default channel
 
-# Dictionary mapping department heads to their department and team members
-DEPARTMENT_STRUCTURE = {
-    # Socials Department
-    "U06MM2BKMM2": {  # Gabe
-        "department": "Socials",
-        "team_members": [
-            "U234567",  # Replace with actual Slack user IDs
-            "U345678",
-            "U456789"
-        ]
-    },
-    
-    # Development and Architecture Department
-    "U06M5QCCLN9": {  #0xikki
-        "department": "Development and Architecture",
-        "team_members": [
-            "U06MKKWAWJX" #Kuro
-        ]
-    },
-    
-    # Human Resources Department
-    "U06PNMDFVQW": {  # Dabyll - head
-        "department": "HR",
-        "team_members": [
-            "U07UV1KFBR7", #Nikko - member
-            "U333444",
-            "U444555"
-        ]
-    },
-    
-    # Sales Department
-    "U555666": {  # Replace with actual Slack user ID of Sales Head
-        "department": "Sales",
-        "team_members": [
-            "U666777",
-            "U777888",
-            "U888999"
-        ]
-    }
-} 
\ No newline at end of file
+# Department heads mapped to their department and team members, derived from
+# DEPARTMENTS so the two cannot disagree
+DEPARTMENT_STRUCTURE = department_structure(get_directory())
@@ -0,0 +1,77 @@
+"""
+Precompiled Block Kit templates.
+
+A layout is written once as ordinary block dicts whose strings may contain
+``str.format`` fields (``"*Type:*\\n{leave_type}"``). Compiling it records
+which strings are variable: rendering rebuilds only the dicts and lists on
+the path to a variable string and shares every static subtree.
+
+Rendered blocks share their static parts between messages and must be
+treated as read-only.
+"""
+
+import string
+from typing import Any, Callable, Dict, List, Union
+
+_formatter = string.Formatter()
+
+
+def _fields(text: str) -> List[str]:
+    return [field for _, field, _, _ in _formatter.parse(text) if field is not None]
+
+
+class BlockTemplate:
+    """A compiled message layout."""
+
+    def __init__(self, blocks: List[Dict[str, Any]]):
+        self.blocks = blocks
+        self.fields = frozenset(field for slot in self._collect(blocks) for field in _fields(slot))
+        self._render = self._compile(blocks)
+
+    def render(self, **values: Any) -> List[Dict[str, Any]]:
+        """Blocks with the fields filled in."""
+        return self._render(values)
+
+    def _collect(self, node: Any) -> List[str]:
+        if isinstance(node, str):
+            return [node] if _fields(node) else []
+        if isinstance(node, dict):
+            return [slot for value in node.values() for slot in self._collect(value)]
+        if isinstance(node, list):
+            return [slot for value in node for slot in self._collect(value)]
+        return []
+
+    def _compile(self, node: Any) -> Callable[[Dict[str, Any]], Any]:
+        """A function of the values that builds the node, or returns it as-is if it is static."""
+        if isinstance(node, str):
+            if _fields(node):
+                return node.format_map
+            return lambda values: node
+        if isinstance(node, dict):
+            if not self._collect(node):
+                return lambda values: node
+            # (key, renderer or None, static value), in the layout's key order
+            entries = [
+                (key, self._compile(value) if self._collect(value) else None, value)
+                for key, value in node.items()
+            ]
+            return lambda values: {
+                key: render(values) if render is not None else value for key, render, value in entries
+            }
+        if isinstance(node, list):
+            if not self._collect(node):
+                return lambda values: node
+            items = [self._compile(value) for value in node]
+            return lambda values: [render(values) for render in items]
+        return lambda values: node
+
+
+def compile_blocks(*parts: Union[List[Dict[str, Any]], Dict[str, Any]]) -> BlockTemplate:
+    """Compile a layout from blocks and lists of blocks."""
+    blocks: List[Dict[str, Any]] = []
+    for part in parts:
+        if isinstance(part, list):
+            blocks.extend(part)
+        else:
+            blocks.append(part)
+    return BlockTemplate(blocks)
@@ -0,0 +1,203 @@
+"""
+Circuit breaker around the Slack Web API.
+
+When Slack degrades, sync gunicorn workers would otherwise block in API calls
+until the worker timeout and take the whole service down with them. The
+breaker watches the error rate and latency of recent calls; once either
+crosses its threshold the circuit opens and calls fail fast with
+``circuit_open`` (or are deferred to the outbox) instead of reaching Slack.
+After a cool-down a few probe calls are let through (half-open) and their
+outcome decides whether the circuit closes again.
+"""
+
+import http.client
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from urllib.error import URLError
+
+from slack_sdk.errors import SlackApiError
+
+from src.metrics import MetricsRegistry, registry as default_registry
+from src.slack.outbound import OutboundClient
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Slack errors that mean Slack itself is unhealthy, as opposed to a bad request
+SERVER_ERRORS = {"internal_error", "fatal_error", "service_unavailable", "request_timeout"}
+
+# Calls that can be delivered later by the outbox instead of failing
+DEFERRABLE_METHODS = {"chat_postMessage", "chat_update"}
+
+
+class CircuitOpenError(SlackApiError):
+    """Raised instead of calling Slack while the circuit is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Slack API circuit is open", {"ok": False, "error": "circuit_open"})
+        self.retry_after = retry_after
+
+
+def is_failure(error: BaseException) -> bool:
+    """Whether an exception from a Slack call counts against Slack's health."""
+    if isinstance(error, SlackApiError):
+        response = error.response
+        if getattr(response, "status_code", 200) >= 500:
+            return True
+        return response is not None and response.get("error") in SERVER_ERRORS
+    return isinstance(error, (OSError, URLError, http.client.HTTPException))
+
+
+class CircuitBreaker:
+    """Closed/open/half-open state machine over a sliding window of recent calls."""
+
+    def __init__(self, failure_rate: float = 0.5, slow_call_seconds: float = 5.0, slow_call_rate: float = 0.8,
+                 window_size: int = 20, min_calls: int = 10, open_seconds: float = 30.0,
+                 half_open_probes: int = 1, name: str = "circuit", metrics: Optional[MetricsRegistry] = None):
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.name = name
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+        self._metrics = metrics or default_registry
+        self._state_gauge = self._metrics.gauge(f"{name}.state")
+        self._rejected = self._metrics.counter(f"{name}.rejected")
+        self._latency = self._metrics.timer(f"{name}.latency")
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._advance(time.monotonic())
+            return self._state
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a probe through."""
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        """Reserve the right to make a call; False means fail fast."""
+        with self._lock:
+            self._advance(time.monotonic())
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+        self._rejected.inc()
+        return False
+
+    def is_open(self) -> bool:
+        """Whether calls are being refused, without reserving a half-open probe.
+
+        Counts as a rejection when it is, like a refused allow().
+        """
+        with self._lock:
+            self._advance(time.monotonic())
+            if self._state != OPEN:
+                return False
+        self._rejected.inc()
+        return True
+
+    def record(self, failed: bool, elapsed: float) -> None:
+        """Record the outcome of a call that allow() let through."""
+        self._latency.observe(elapsed)
+        slow = elapsed >= self.slow_call_seconds
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if failed or slow:
+                    self._transition(OPEN)
+                else:
+                    self._transition(CLOSED)
+                return
+            if self._state == OPEN:
+                # A call admitted before the circuit opened
+                return
+            self._outcomes.append((failed, slow))
+            if len(self._outcomes) < self.min_calls:
+                return
+            failures = sum(1 for f, _ in self._outcomes if f)
+            slow_calls = sum(1 for _, s in self._outcomes if s)
+            if (failures / len(self._outcomes) >= self.failure_rate
+                    or slow_calls / len(self._outcomes) >= self.slow_call_rate):
+                self._transition(OPEN)
+
+    def _advance(self, now: float) -> None:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return
+        logger.warning(f"{self.name} {self._state} -> {state}")
+        self._metrics.counter(f"{self.name}.transitions.{self._state}_to_{state}").inc()
+        self._state = state
+        self._state_gauge.set(STATE_VALUES[state])
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state != HALF_OPEN:
+            self._probes = 0
+        if state == CLOSED:
+            self._outcomes.clear()
+
+
+class CircuitBreakerClient(OutboundClient):
+    """Slack client wrapper that fails fast, or defers to an outbox, while the circuit is open."""
+
+    def __init__(self, client: Any, breaker: CircuitBreaker, outbox: Optional[Any] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        super().__init__(client)
+        self.breaker = breaker
+        # Only the handlers' client defers; the outbox drainer's must not re-queue its own deliveries
+        self.outbox = outbox
+        self._deferred = (metrics or default_registry).counter(f"{breaker.name}.deferred")
+
+    def _call(self, method: str, func: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        if not self.breaker.allow():
+            return self._refuse(method, args, kwargs)
+
+        started = time.monotonic()
+        try:
+            response = func(*args, **kwargs)
+        except BaseException as e:
+            self.breaker.record(is_failure(e), time.monotonic() - started)
+            raise
+        self.breaker.record(False, time.monotonic() - started)
+        return response
+
+    def _refuse(self, method: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        """Defer a call to the outbox while the circuit is open, or fail fast."""
+        if self.outbox is not None and method in DEFERRABLE_METHODS and not args:
+            self._deferred.inc()
+            logger.info(f"{method} deferred to the outbox while the Slack API circuit is open")
+            return {"ok": True, "deferred": True, "outbox_id": self.outbox.enqueue(method, **kwargs)}
+        raise CircuitOpenError(self.breaker.retry_after)
+
+
+class CircuitGateClient(CircuitBreakerClient):
+    """Outermost check of an open circuit, so refused calls skip the rate limit and scheduler queues.
+
+    The CircuitBreakerClient next to the transport still admits half-open
+    probes and records outcomes; this wrapper only refuses while open.
+    """
+
+    def _call(self, method: str, func: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        if self.breaker.is_open():
+            return self._refuse(method, args, kwargs)
+        return func(*args, **kwargs)
@@ -0,0 +1,119 @@
+"""
+Parser for leave requests typed as slash command text.
+
+    /leave sick today
+    /leave pto 2026-11-03..2026-11-05 cover:@kuro Family trip
+    /leave holiday next fri cover:<@U123|kuro>
+
+The first word may be a leave type, followed by a date or a range of dates
+(``a..b`` or ``a to b``) and an optional ``cover:`` user; the remaining
+words are the reason. Dates are ISO dates, ``today``, ``tomorrow``, a
+weekday (the next one on or after today) or ``next`` and a weekday (the
+next one after today). Whatever is missing is left out so the caller can
+fill it from the user's defaults or fall back to the modal.
+"""
+
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Leave type value and display name, by the words accepted for it
+LEAVE_TYPES = {
+    "pto": ("pto", "PTO"),
+    "vacation": ("pto", "PTO"),
+    "sick": ("sick_emergency", "Sick/Emergency"),
+    "emergency": ("sick_emergency", "Sick/Emergency"),
+    "holiday": ("holiday", "Holiday"),
+    "offset": ("offset", "Offset"),
+}
+
+_WEEKDAYS = {
+    name: index
+    for index, names in enumerate((("mon", "monday"), ("tue", "tues", "tuesday"), ("wed", "wednesday"),
+                                   ("thu", "thur", "thurs", "thursday"), ("fri", "friday"),
+                                   ("sat", "saturday"), ("sun", "sunday")))
+    for name in names
+}
+
+_RANGE_SEPARATORS = ("..", "to")
+
+# ".." between two dates, so "2026-11-03..2026-11-05" splits into three words
+_RANGE = re.compile(r"\.\.(?=[A-Za-z0-9])")
+
+# A mention as Slack escapes it in command text: <@U123|kuro> or <@U123>
+_MENTION = re.compile(r"^<@([A-Z0-9]+)(?:\|[^>]*)?>$")
+
+
+@lru_cache(maxsize=512)
+def resolve_date(phrase: str, today: date) -> Optional[date]:
+    """The date of a phrase relative to today, or None if it is not a date."""
+    phrase = phrase.lower()
+    if phrase == "today":
+        return today
+    if phrase == "tomorrow":
+        return today + timedelta(days=1)
+    words = phrase.split()
+    if len(words) == 2 and words[0] == "next" and words[1] in _WEEKDAYS:
+        return today + timedelta(days=(_WEEKDAYS[words[1]] - today.weekday() - 1) % 7 + 1)
+    if phrase in _WEEKDAYS:
+        return today + timedelta(days=(_WEEKDAYS[phrase] - today.weekday()) % 7)
+    try:
+        return date.fromisoformat(phrase)
+    except ValueError:
+        return None
+
+
+def _date_at(words: List[str], index: int, today: date) -> Tuple[Optional[date], int]:
+    """The date starting at words[index] and the index after it."""
+    if index + 1 < len(words) and words[index].lower() == "next":
+        resolved = resolve_date(f"next {words[index + 1]}", today)
+        if resolved is not None:
+            return resolved, index + 2
+    if index < len(words):
+        resolved = resolve_date(words[index], today)
+        if resolved is not None:
+            return resolved, index + 1
+    return None, index
+
+
+def parse_command_text(text: str, today: Optional[date] = None) -> Dict[str, Any]:
+    """Fields of a leave request found in command text, keyed by the form's action_id.
+
+    Raises ValueError for a range that ends before it starts.
+    """
+    today = today or date.today()
+    words = _RANGE.sub(" .. ", text).split()
+    fields: Dict[str, Any] = {}
+    index = 0
+
+    if words and words[0].lower() in LEAVE_TYPES:
+        fields["leave_type"], fields["leave_type_display"] = LEAVE_TYPES[words[0].lower()]
+        index = 1
+
+    start, index = _date_at(words, index, today)
+    if start is not None:
+        end = start
+        if index < len(words) and words[index].lower() in _RANGE_SEPARATORS:
+            end, after = _date_at(words, index + 1, today)
+            if end is None:
+                end = start
+            else:
+                index = after
+        if end < start:
+            raise ValueError(f"The leave ends ({end.isoformat()}) before it starts ({start.isoformat()})")
+        fields["start_date"] = start.isoformat()
+        fields["end_date"] = end.isoformat()
+
+    reason = []
+    for word in words[index:]:
+        is_cover = word.lower().startswith("cover:")
+        match = _MENTION.match(word[len("cover:"):] if is_cover else word)
+        if match and "coverage_person" not in fields:
+            fields["coverage_person"] = match.group(1)
+        elif not is_cover:
+            reason.append(word)
+        # cover:@name typed without Slack's escaping has no user ID; the form asks instead
+    if reason:
+        fields["reason"] = " ".join(reason)
+    return fields
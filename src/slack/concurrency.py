@@ -0,0 +1,95 @@
+"""
+Adaptive outbound concurrency for Slack calls.
+
+A fixed number of in-flight calls per worker is too low when Slack is fast
+and feeds 429 storms when it is slow. AdaptiveScheduler tunes the limit of
+the PriorityScheduler with AIMD: every fast successful call while the limit
+is in use adds 1/limit (about one slot per round of calls), and a 429, a
+server error or a call over the latency target cuts the limit
+multiplicatively. Each gunicorn worker adapts on its own, so the workers
+together back off as soon as Slack pushes back.
+"""
+
+import logging
+import time
+from typing import Optional
+
+from slack_sdk.errors import SlackApiError
+
+from src.metrics import MetricsRegistry
+from src.slack.circuit_breaker import CircuitOpenError, is_failure
+from src.slack.scheduler import PriorityScheduler
+
+logger = logging.getLogger(__name__)
+
+
+def is_overload(error: Optional[BaseException]) -> bool:
+    """Whether an error means Slack wants less traffic (429, 5xx, timeouts)."""
+    if error is None:
+        return False
+    if isinstance(error, SlackApiError) and getattr(error.response, "status_code", None) == 429:
+        return True
+    return is_failure(error)
+
+
+class AdaptiveScheduler(PriorityScheduler):
+    """PriorityScheduler whose limit follows additive-increase/multiplicative-decrease."""
+
+    def __init__(self, initial_limit: int = 4, min_limit: int = 1, max_limit: int = 32,
+                 latency_target: float = 1.0, backoff_ratio: float = 0.5, slow_backoff_ratio: float = 0.9,
+                 metrics: Optional[MetricsRegistry] = None):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial_limit <= max_limit")
+        super().__init__(max_concurrent=initial_limit, metrics=metrics)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+        self.slow_backoff_ratio = slow_backoff_ratio
+        self._limit = float(initial_limit)
+        # One decrease per latency target, so a burst of failures from the
+        # same overload doesn't collapse the limit to the minimum
+        self._last_decrease = 0.0
+
+        self._limit_gauge = self._metrics.gauge("scheduler.limit")
+        self._increases = self._metrics.counter("scheduler.limit_increases")
+        self._decreases = self._metrics.counter("scheduler.limit_decreases")
+        self._limit_gauge.set(initial_limit)
+
+    @property
+    def limit(self) -> int:
+        return self.max_concurrent
+
+    def observe(self, elapsed: float, error: Optional[BaseException] = None) -> None:
+        if isinstance(error, CircuitOpenError):
+            # Refused locally; says nothing about Slack's current capacity
+            return
+        with self._condition:
+            if is_overload(error):
+                self._decrease(self.backoff_ratio, "overload")
+            elif elapsed > self.latency_target:
+                self._decrease(self.slow_backoff_ratio, f"latency {elapsed:.2f}s")
+            elif error is None and self._in_flight >= self.max_concurrent / 2:
+                # Only grow while the current limit is actually being used
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+                self._apply()
+
+    def _decrease(self, ratio: float, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.latency_target:
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.min_limit), self._limit * ratio)
+        logger.info(f"Outbound concurrency limit lowered to {int(self._limit)} ({reason})")
+        self._apply()
+
+    def _apply(self) -> None:
+        limit = int(self._limit)
+        if limit > self.max_concurrent:
+            self._increases.inc()
+            # Waiters can use the new slots right away
+            self._condition.notify_all()
+        elif limit < self.max_concurrent:
+            self._decreases.inc()
+        self.max_concurrent = limit
+        self._limit_gauge.set(limit)
@@ -0,0 +1,136 @@
+"""
+Bounded background executor for Slack side effects.
+
+Interaction endpoints acknowledge Slack immediately and hand the outbound
+Slack calls (notifications, message updates) to this executor. The pool is
+created lazily inside each gunicorn worker so no threads survive a fork.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+from src.metrics import MetricsRegistry, registry as default_registry
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class BoundedExecutor:
+    """Fixed-size worker pool with a bounded FIFO queue.
+
+    When the queue is full the task runs in the submitting thread instead of
+    being dropped, which slows the ack down but never loses a notification.
+    Work that can be skipped (cache warming) uses ``offer``, which drops it.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 100,
+                 name: str = "executor", metrics: Optional[MetricsRegistry] = None):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue < 1:
+            raise ValueError("max_queue must be at least 1")
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.name = name
+        self._metrics = metrics or default_registry
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._threads: List[threading.Thread] = []
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self._queue_depth = self._metrics.gauge(f"{name}.queue_depth")
+        self._wait_time = self._metrics.timer(f"{name}.wait_time")
+        self._run_time = self._metrics.timer(f"{name}.run_time")
+        self._submitted = self._metrics.counter(f"{name}.submitted")
+        self._completed = self._metrics.counter(f"{name}.completed")
+        self._failed = self._metrics.counter(f"{name}.failed")
+        self._caller_runs = self._metrics.counter(f"{name}.caller_runs")
+        self._dropped = self._metrics.counter(f"{name}.dropped")
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> bool:
+        """Queue a task. Returns False if it had to run inline because the queue was full."""
+        self._ensure_started()
+        self._submitted.inc()
+        try:
+            self._queue.put_nowait((time.monotonic(), fn, args, kwargs))
+        except queue.Full:
+            logger.warning(f"{self.name} queue is full ({self.max_queue}), running task inline")
+            self._caller_runs.inc()
+            self._run(fn, args, kwargs)
+            return False
+        self._queue_depth.set(self._queue.qsize())
+        return True
+
+    def offer(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> bool:
+        """Queue a task that may be skipped. Returns False, without running it, if the queue was full."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((time.monotonic(), fn, args, kwargs))
+        except queue.Full:
+            self._dropped.inc()
+            return False
+        self._submitted.inc()
+        self._queue_depth.set(self._queue.qsize())
+        return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers after the queued tasks have run."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+            self._pid = None
+        for _ in threads:
+            self._queue.put(_STOP)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _ensure_started(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            # A forked worker inherits the parent's queue object but not its threads
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._threads = []
+            for index in range(self.max_workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    name=f"{self.name}-{index}",
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+            self._pid = pid
+
+    def _worker(self) -> None:
+        work_queue = self._queue
+        while True:
+            task = work_queue.get()
+            if task is _STOP:
+                break
+            enqueued_at, fn, args, kwargs = task
+            self._queue_depth.set(work_queue.qsize())
+            self._wait_time.observe(time.monotonic() - enqueued_at)
+            self._run(fn, args, kwargs)
+
+    def _run(self, fn, args, kwargs) -> None:
+        started = time.monotonic()
+        try:
+            fn(*args, **kwargs)
+            self._completed.inc()
+        except Exception as e:
+            self._failed.inc()
+            logger.error(f"Background task {getattr(fn, '__name__', fn)} failed: {str(e)}", exc_info=True)
+        finally:
+            self._run_time.observe(time.monotonic() - started)
@@ -1,8 +1,12 @@
 from datetime import datetime
-from typing import Dict, Any, Union, List
-import json
+from typing import Dict, Any, Optional, Union, List
 import logging
 
+from src.config.organization import get_directory
+from src.slack.layouts import HR_NOTIFICATION
+from src.slack.metadata import MetadataCodec, default_codec
+from src.slack.user_profiles import UserProfileCache
+
 logger = logging.getLogger(__name__)
 
 def format_date_for_display(date: Union[str, datetime]) -> str:
@@ -14,97 +18,52 @@ def format_date_for_display(date: Union[str, datetime]) -> str:
             raise ValueError(f"Invalid date format: {date}. Expected YYYY-MM-DD")
     return date.strftime("%B %d, %Y")
 
-def create_admin_notification_blocks(leave_request: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Create Block Kit blocks for admin notification of a new leave request."""
-    user = leave_request["user"]
-    covering_user = leave_request["covering_user"]
-    
-    return [
-        {
-            "type": "header",
-            "text": {
-                "type": "plain_text",
-                "text": "🏖️ New Leave Request",
-                "emoji": True
-            }
-        },
-        {
-            "type": "section",
-            "fields": [
-                {
-                    "type": "mrkdwn",
-                    "text": f"*Requester:*\n<@{user['id']}>"
-                },
-                {
-                    "type": "mrkdwn",
-                    "text": f"*Type:*\n{leave_request['leave_type'].upper()}"
-                }
-            ]
-        },
-        {
-            "type": "section",
-            "fields": [
-                {
-                    "type": "mrkdwn",
-                    "text": f"*Start Date:*\n{format_date_for_display(leave_request['start_date'])}"
-                },
-                {
-                    "type": "mrkdwn",
-                    "text": f"*End Date:*\n{format_date_for_display(leave_request['end_date'])}"
-                }
-            ]
-        },
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": f"*Reason:*\n{leave_request['reason']}"
-            }
-        },
-        {
-            "type": "section",
-            "fields": [
-                {
-                    "type": "mrkdwn",
-                    "text": f"*Tasks Coverage:*\n{leave_request['tasks_coverage']}"
-                },
-                {
-                    "type": "mrkdwn",
-                    "text": f"*Covered By:*\n<@{covering_user['id']}>"
-                }
-            ]
-        },
-        {
-            "type": "divider"
-        },
-        {
-            "type": "actions",
-            "elements": [
-                {
-                    "type": "button",
-                    "text": {
-                        "type": "plain_text",
-                        "text": "✅ Approve",
-                        "emoji": True
-                    },
-                    "style": "primary",
-                    "value": "approve",
-                    "action_id": "approve_leave_hr"
-                },
-                {
-                    "type": "button",
-                    "text": {
-                        "type": "plain_text",
-                        "text": "❌ Deny",
-                        "emoji": True
-                    },
-                    "style": "danger",
-                    "value": "deny",
-                    "action_id": "reject_leave_hr"
-                }
-            ]
-        }
-    ]
+def create_requester_context_block(user_id: str, profiles: Optional[UserProfileCache],
+                                   wait: bool = True) -> Optional[Dict[str, Any]]:
+    """Create a context block with the requester's name, title, time zone and manager.
+
+    Returns None without a profile cache or when the profile is unavailable.
+    Without wait only an already-cached profile is used.
+    """
+    if profiles is None:
+        return None
+    profile = profiles.get(user_id) if wait else profiles.peek(user_id)
+    if profile is None:
+        return None
+    directory = get_directory()
+    parts = [f"*{profile['name']}*"]
+    if profile.get("title"):
+        parts.append(profile["title"])
+    if profile.get("tz_label"):
+        parts.append(f":clock3: {profile['tz_label']}")
+    manager = directory.head_of.get(user_id) or directory.reports_to.get(user_id)
+    if manager:
+        parts.append(f"Manager: <@{manager}>")
+    return {
+        "type": "context",
+        "block_id": "requester_profile",
+        "elements": [{"type": "mrkdwn", "text": " · ".join(parts)}]
+    }
+
+def create_admin_notification_blocks(leave_request: Dict[str, Any],
+                                     profiles: Optional[UserProfileCache] = None) -> List[Dict[str, Any]]:
+    """Create Block Kit blocks for admin notification of a new leave request.
+
+    With a profile cache, the requester's profile is shown under their name.
+    """
+    blocks = HR_NOTIFICATION.render(
+        user_id=leave_request["user"]["id"],
+        leave_type=leave_request["leave_type"].upper(),
+        start_date=format_date_for_display(leave_request["start_date"]),
+        end_date=format_date_for_display(leave_request["end_date"]),
+        reason=leave_request["reason"],
+        tasks_coverage=leave_request["tasks_coverage"],
+        covering_user_id=leave_request["covering_user"]["id"]
+    )
+    context = create_requester_context_block(leave_request["user"]["id"], profiles)
+    if context is not None:
+        blocks.insert(2, context)
+    return blocks
 
 def create_user_notification_blocks(request_details: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Create Block Kit blocks for user notification of request status."""
@@ -158,8 +117,40 @@ def create_user_notification_blocks(request_details: Dict[str, Any]) -> List[Dic
     
     return blocks
 
-def create_denial_modal_view(leave_request: Dict[str, Any]) -> Dict[str, Any]:
-    """Create a modal view for collecting denial reason."""
+def create_reopen_prompt_blocks(text: str, button_text: str, action_id: str, value: str = "reopen") -> List[Dict[str, Any]]:
+    """Create Block Kit blocks offering to open a modal again after its trigger expired."""
+    return [
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": text
+            }
+        },
+        {
+            "type": "actions",
+            "elements": [
+                {
+                    "type": "button",
+                    "text": {
+                        "type": "plain_text",
+                        "text": button_text,
+                        "emoji": True
+                    },
+                    "style": "primary",
+                    "value": value,
+                    "action_id": action_id
+                }
+            ]
+        }
+    ]
+
+def create_denial_modal_view(leave_request: Dict[str, Any], private_metadata: Optional[str] = None,
+                             codec: Optional[MetadataCodec] = None) -> Dict[str, Any]:
+    """Create a modal view for collecting denial reason.
+
+    private_metadata replaces the packed metadata, e.g. with a signed action token.
+    """
     # Create metadata for the modal
     metadata = {
         "requester_id": leave_request["user"]["id"],
@@ -169,6 +160,8 @@ def create_denial_modal_view(leave_request: Dict[str, Any]) -> Dict[str, Any]:
         "start_date": leave_request["start_date"],
         "end_date": leave_request.get("end_date", leave_request["start_date"])
     }
+    if leave_request.get("request_id"):
+        metadata["request_id"] = leave_request["request_id"]
     
     # Format dates for display
     try:
@@ -185,7 +178,7 @@ def create_denial_modal_view(leave_request: Dict[str, Any]) -> Dict[str, Any]:
     modal = {
         "type": "modal",
         "callback_id": "denial_modal",
-        "private_metadata": json.dumps(metadata),
+        "private_metadata": private_metadata or (codec or default_codec).encode(metadata),
         "title": {
             "type": "plain_text",
             "text": "Deny Leave Request",
@@ -0,0 +1,257 @@
+"""
+Message layouts, compiled once at import.
+
+Field names are the keyword arguments of ``render``.
+"""
+
+from src.slack.block_templates import compile_blocks
+
+LEAVE_REQUEST_DETAILS = [
+    {
+        "type": "section",
+        "fields": [
+            {"type": "mrkdwn", "text": "*Requester:*\n<@{user_id}>"},
+            {"type": "mrkdwn", "text": "*Type:*\n{leave_type_display}"},
+            {"type": "mrkdwn", "text": "*Duration:*\n{start_date} to {end_date}"},
+            {"type": "mrkdwn", "text": "*Coverage:*\n<@{coverage_person}>"}
+        ]
+    },
+    {
+        "type": "section",
+        "fields": [
+            {"type": "mrkdwn", "text": "*Tasks to Cover:*\n{tasks}"},
+            {"type": "mrkdwn", "text": "*Reason:*\n{reason}"}
+        ]
+    }
+]
+
+# Sent to the department head or HR; the button values identify the request
+APPROVER_NOTIFICATION = compile_blocks(
+    LEAVE_REQUEST_DETAILS,
+    {"type": "divider"},
+    {
+        "type": "actions",
+        "block_id": "leave_request_actions",
+        "elements": [
+            {
+                "type": "button",
+                "text": {"type": "plain_text", "text": "✅ Approve Request", "emoji": True},
+                "style": "primary",
+                "value": "{approve_value}",
+                "action_id": "approve_leave",
+                "confirm": {
+                    "title": {"type": "plain_text", "text": "Approve Leave Request"},
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": "Are you sure you want to approve this {leave_type_display} request from <@{user_id}>?"
+                    },
+                    "confirm": {"type": "plain_text", "text": "Yes, Approve"},
+                    "deny": {"type": "plain_text", "text": "No, Cancel"},
+                    "style": "primary"
+                }
+            },
+            {
+                "type": "button",
+                "text": {"type": "plain_text", "text": "❌ Reject Request", "emoji": True},
+                "style": "danger",
+                "value": "{reject_value}",
+                "action_id": "reject_leave",
+                "confirm": {
+                    "title": {"type": "plain_text", "text": "Reject Leave Request"},
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": "Are you sure you want to reject this {leave_type_display} request from <@{user_id}>?\n"
+                                "This will open a dialog to provide a rejection reason."
+                    },
+                    "confirm": {"type": "plain_text", "text": "Yes, Reject"},
+                    "deny": {"type": "plain_text", "text": "No, Cancel"},
+                    "style": "danger"
+                }
+            }
+        ]
+    }
+)
+
+# Sent to the requester when the request is submitted
+REQUESTER_CONFIRMATION = compile_blocks(
+    LEAVE_REQUEST_DETAILS,
+    {"type": "divider"},
+    {
+        "type": "context",
+        "elements": [
+            {"type": "mrkdwn", "text": ":information_source: Your request has been submitted and is pending approval."}
+        ]
+    }
+)
+
+_APPROVAL_FIELDS = {
+    "type": "section",
+    "fields": [
+        {"type": "mrkdwn", "text": "*Type:*\n{leave_type}"},
+        {"type": "mrkdwn", "text": "*Start Date:*\n{start_date}"}
+    ]
+}
+
+# Replaces the approver notification once approved
+APPROVAL_UPDATE = compile_blocks(
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": ":white_check_mark: Leave request from <@{requester_id}> was approved by <@{approver_id}>"
+        }
+    },
+    _APPROVAL_FIELDS
+)
+
+APPROVAL_DM = compile_blocks(
+    {
+        "type": "section",
+        "text": {"type": "mrkdwn", "text": ":white_check_mark: Your {leave_type} request was approved by <@{approver_id}>"}
+    },
+    _APPROVAL_FIELDS
+)
+
+_REJECTION_FIELDS = {
+    "type": "section",
+    "fields": [
+        {"type": "mrkdwn", "text": "*Type:*\n{leave_type}"},
+        {"type": "mrkdwn", "text": "*Duration:*\n{start_date} to {end_date}"}
+    ]
+}
+
+# Replaces the approver notification once rejected
+REJECTION_UPDATE = compile_blocks(
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": ":x: Leave request from <@{requester_id}> was rejected\n*Reason:* {denial_reason}"
+        }
+    },
+    _REJECTION_FIELDS
+)
+
+REJECTION_DM = compile_blocks(
+    {
+        "type": "section",
+        "text": {"type": "mrkdwn", "text": ":x: Your {leave_type} request was rejected\n*Reason:* {denial_reason}"}
+    },
+    _REJECTION_FIELDS
+)
+
+_DECISION_BUTTONS = {
+    "type": "actions",
+    "elements": [
+        {
+            "type": "button",
+            "text": {"type": "plain_text", "text": "Approve", "emoji": True},
+            "style": "primary",
+            "action_id": "approve_leave"
+        },
+        {
+            "type": "button",
+            "text": {"type": "plain_text", "text": "Reject", "emoji": True},
+            "style": "danger",
+            "action_id": "reject_leave"
+        }
+    ]
+}
+
+# Posted by the slash command's own form submission
+COMMAND_NOTIFICATION = compile_blocks(
+    {
+        "type": "section",
+        "fields": [
+            {"type": "mrkdwn", "text": "*Requester:*\n<@{user_id}>"},
+            {"type": "mrkdwn", "text": "*Type:*\n{leave_type_display}"},
+            {"type": "mrkdwn", "text": "*Date:*\n{start_date}"},
+            {"type": "mrkdwn", "text": "*Coverage:*\n<@{coverage_person}>"}
+        ]
+    },
+    {
+        "type": "section",
+        "fields": [
+            {"type": "mrkdwn", "text": "*Tasks:*\n{tasks}"},
+            {"type": "mrkdwn", "text": "*Reason:*\n{reason}"}
+        ]
+    },
+    _DECISION_BUTTONS
+)
+
+# Dates are passed in display form
+ADMIN_NOTIFICATION = compile_blocks(
+    {
+        "type": "header",
+        "text": {"type": "plain_text", "text": ":memo: New Leave Request", "emoji": True}
+    },
+    {
+        "type": "section",
+        "fields": [
+            {"type": "mrkdwn", "text": "*Requester:*\n<@{user_id}>"},
+            {"type": "mrkdwn", "text": "*Type:*\n{leave_type}"},
+            {"type": "mrkdwn", "text": "*Start Date:*\n{start_date}"},
+            {"type": "mrkdwn", "text": "*End Date:*\n{end_date}"},
+            {"type": "mrkdwn", "text": "*Coverage:*\n<@{coverage_person}>"},
+            {"type": "mrkdwn", "text": "*Tasks:*\n{tasks}"}
+        ]
+    },
+    {
+        "type": "section",
+        "text": {"type": "mrkdwn", "text": "*Reason:*\n{reason}"}
+    },
+    _DECISION_BUTTONS
+)
+
+# helpers.create_admin_notification_blocks: HR notification with its own action IDs
+HR_NOTIFICATION = compile_blocks(
+    {
+        "type": "header",
+        "text": {"type": "plain_text", "text": "🏖️ New Leave Request", "emoji": True}
+    },
+    {
+        "type": "section",
+        "fields": [
+            {"type": "mrkdwn", "text": "*Requester:*\n<@{user_id}>"},
+            {"type": "mrkdwn", "text": "*Type:*\n{leave_type}"}
+        ]
+    },
+    {
+        "type": "section",
+        "fields": [
+            {"type": "mrkdwn", "text": "*Start Date:*\n{start_date}"},
+            {"type": "mrkdwn", "text": "*End Date:*\n{end_date}"}
+        ]
+    },
+    {
+        "type": "section",
+        "text": {"type": "mrkdwn", "text": "*Reason:*\n{reason}"}
+    },
+    {
+        "type": "section",
+        "fields": [
+            {"type": "mrkdwn", "text": "*Tasks Coverage:*\n{tasks_coverage}"},
+            {"type": "mrkdwn", "text": "*Covered By:*\n<@{covering_user_id}>"}
+        ]
+    },
+    {"type": "divider"},
+    {
+        "type": "actions",
+        "elements": [
+            {
+                "type": "button",
+                "text": {"type": "plain_text", "text": "✅ Approve", "emoji": True},
+                "style": "primary",
+                "value": "approve",
+                "action_id": "approve_leave_hr"
+            },
+            {
+                "type": "button",
+                "text": {"type": "plain_text", "text": "❌ Deny", "emoji": True},
+                "style": "danger",
+                "value": "deny",
+                "action_id": "reject_leave_hr"
+            }
+        ]
+    }
+)
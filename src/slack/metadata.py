@@ -0,0 +1,108 @@
+"""
+Compact codec for modal ``private_metadata``.
+
+Slack caps ``private_metadata`` at 3000 characters. Metadata is packed as a
+positional JSON array behind a short version prefix, which drops the
+repeated key names of a plain JSON object. If the packed form still
+exceeds the limit (long free-text fields), it is stored server-side in a
+short-lived TTL store and the modal only carries the lookup key.
+
+    m1:["U123","C456","1234.5678","PTO","2024-03-20"]   packed
+    m1~Xk2f9Qw0LrT1aB3c                                 spilled
+"""
+
+import json
+import logging
+import secrets
+from typing import Any, Dict, Optional
+
+from src.metrics import MetricsRegistry, registry as default_registry
+from src.storage.ttl_store import SQLiteTTLStore
+
+logger = logging.getLogger(__name__)
+
+PACKED_PREFIX = "m1:"
+SPILLED_PREFIX = "m1~"
+
+# Slack's limit on private_metadata, in characters
+MAX_LENGTH = 3000
+
+# Position of each field in the packed array; append only, never reorder within a version
+FIELDS = ("requester_id", "channel_id", "message_ts", "leave_type", "start_date", "end_date", "request_id")
+
+
+class MetadataCodec:
+    """Packs metadata dicts into private_metadata strings, spilling oversized ones to a TTL store."""
+
+    def __init__(self, spill_store: Optional[SQLiteTTLStore] = None, spill_ttl: float = 3600,
+                 max_length: int = MAX_LENGTH, metrics: Optional[MetricsRegistry] = None):
+        self.spill_store = spill_store
+        self.spill_ttl = spill_ttl
+        self.max_length = max_length
+
+        metrics = metrics or default_registry
+        self._spilled = metrics.counter("metadata.spilled")
+        self._spill_misses = metrics.counter("metadata.spill_misses")
+
+    def encode(self, metadata: Dict[str, Any]) -> str:
+        """private_metadata for a dict of JSON values. Raises ValueError if it is too large to carry."""
+        values = [metadata.get(field) for field in FIELDS]
+        if values[5] == values[4]:
+            # Single-day requests: end_date is restored from start_date
+            values[5] = None
+        extras = {key: value for key, value in metadata.items() if key not in FIELDS and value is not None}
+        if extras:
+            values.append(extras)
+        else:
+            while values and values[-1] is None:
+                values.pop()
+
+        packed = PACKED_PREFIX + json.dumps(values, separators=(",", ":"), ensure_ascii=False)
+        if len(packed) <= self.max_length:
+            return packed
+
+        if self.spill_store is None:
+            raise ValueError(f"Metadata is {len(packed)} characters, over the {self.max_length} limit")
+        key = secrets.token_urlsafe(12)
+        self.spill_store.put(key, packed, self.spill_ttl)
+        self._spilled.inc()
+        logger.info(f"Spilled {len(packed)} characters of modal metadata to the server-side store")
+        return SPILLED_PREFIX + key
+
+    def decode(self, value: Optional[str]) -> Dict[str, Any]:
+        """Metadata dict of a private_metadata string. Raises ValueError if it is invalid or expired."""
+        if not value:
+            return {}
+        if value.startswith(SPILLED_PREFIX):
+            packed = self.spill_store.get(value[len(SPILLED_PREFIX):]) if self.spill_store is not None else None
+            if packed is None:
+                self._spill_misses.inc()
+                raise ValueError("Spilled metadata has expired")
+            value = packed
+        if not value.startswith(PACKED_PREFIX):
+            # Plain JSON from modals opened before the codec
+            return json.loads(value)
+
+        values = json.loads(value[len(PACKED_PREFIX):])
+        if not isinstance(values, list):
+            raise ValueError("Packed metadata must be an array")
+        extras = values.pop() if len(values) > len(FIELDS) else {}
+        if not isinstance(extras, dict):
+            raise ValueError("Packed metadata extras must be an object")
+        metadata = {field: value for field, value in zip(FIELDS, values) if value is not None}
+        if "start_date" in metadata and "end_date" not in metadata:
+            metadata["end_date"] = metadata["start_date"]
+        metadata.update(extras)
+        return metadata
+
+
+# Packs without spilling; used where no store is configured
+default_codec = MetadataCodec()
+
+
+def encode_metadata(metadata: Dict[str, Any]) -> str:
+    return default_codec.encode(metadata)
+
+
+def decode_metadata(value: Optional[str]) -> Dict[str, Any]:
+    return default_codec.decode(value)
@@ -0,0 +1,114 @@
+"""
+Modal views parsed once and reloaded only when their file changes.
+
+Opening a modal must finish within the trigger's 3 second window, so the
+command path serves the view from memory. The file's mtime is checked at
+most every ``check_interval`` seconds and the view is re-parsed only when
+it changed; a file that is missing or invalid leaves the last good view
+(or the built-in fallback) in place.
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.metrics import MetricsRegistry, registry as default_registry
+
+logger = logging.getLogger(__name__)
+
+
+class CachedModal:
+    """A modal view cached in memory, hot-reloaded from a JSON file."""
+
+    def __init__(self, path: Path, fallback: Dict[str, Any], check_interval: float = 5.0,
+                 metrics: Optional[MetricsRegistry] = None):
+        self.path = Path(path)
+        self.fallback = fallback
+        self.check_interval = check_interval
+
+        metrics = metrics or default_registry
+        self._reloads = metrics.counter("modal_template.reloads")
+        self._reload_errors = metrics.counter("modal_template.reload_errors")
+
+        self._lock = threading.Lock()
+        self._view = fallback
+        self._mtime: Optional[float] = None
+        self._checked_at = float("-inf")
+        self._refresh(time.monotonic())
+
+    def view(self, today: Optional[str] = None, initial_values: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """The modal with per-request fields filled in.
+
+        ``initial_values`` prefills inputs by action_id. Only the blocks that
+        change are copied; the rest is shared with the cache and must not be
+        modified.
+        """
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._refresh(now)
+
+        today = today or datetime.now().strftime("%Y-%m-%d")
+        initial_values = initial_values or {}
+        view = dict(self._view)
+        view["blocks"] = [self._prefill(block, today, initial_values) for block in self._view.get("blocks", [])]
+        return view
+
+    def _refresh(self, now: float) -> None:
+        """Re-parse the file if its mtime changed."""
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            try:
+                mtime = self.path.stat().st_mtime
+            except OSError:
+                if self._mtime is not None:
+                    logger.warning(f"Modal template {self.path} is gone, keeping the last loaded view")
+                    self._mtime = None
+                return
+            if mtime == self._mtime:
+                return
+
+            try:
+                with self.path.open('r') as f:
+                    view = json.load(f)
+            except (OSError, ValueError) as e:
+                self._reload_errors.inc()
+                logger.error(f"Failed to load modal template {self.path}: {e}")
+                return
+            self._view = view
+            self._mtime = mtime
+            self._reloads.inc()
+            logger.info(f"Loaded modal template {self.path}")
+
+    @staticmethod
+    def _prefill(block: Dict[str, Any], today: str, initial_values: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of an input block with its initial value set, or the block itself if nothing applies."""
+        element = block.get("element")
+        if not element or "action_id" not in element:
+            return block
+        kind = element.get("type")
+        value = initial_values.get(element["action_id"])
+
+        if kind == "datepicker":
+            key, value = "initial_date", value or (None if "initial_date" in element else today)
+        elif kind == "users_select":
+            key = "initial_user"
+        elif kind == "plain_text_input":
+            key = "initial_value"
+        elif kind == "static_select":
+            # Slack requires the initial option to be one of the options, exactly
+            key = "initial_option"
+            value = next((option for option in element.get("options", []) if option.get("value") == value), None)
+        else:
+            return block
+        if not value:
+            return block
+
+        block = dict(block)
+        block["element"] = dict(element, **{key: value})
+        return block
@@ -0,0 +1,94 @@
+"""
+Typed values parsed from Slack payloads.
+"""
+
+from typing import Any, Callable, Dict, Optional, Union
+
+
+class LeaveRequest:
+    """A submitted leave request form, parsed once from the modal's state."""
+
+    __slots__ = ("user_id", "leave_type", "leave_type_display", "start_date", "end_date",
+                 "coverage_person", "tasks", "reason")
+
+    def __init__(self, user_id: str, leave_type: str, start_date: str, end_date: Optional[str] = None,
+                 leave_type_display: Optional[str] = None, coverage_person: Optional[str] = None,
+                 tasks: Optional[str] = None, reason: Optional[str] = None):
+        self.user_id = user_id
+        self.leave_type = leave_type
+        self.leave_type_display = leave_type_display or leave_type
+        self.start_date = start_date
+        self.end_date = end_date or start_date
+        self.coverage_person = coverage_person
+        self.tasks = tasks
+        self.reason = reason
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, LeaveRequest):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return (f"LeaveRequest(user_id={self.user_id!r}, leave_type={self.leave_type!r}, "
+                f"start_date={self.start_date!r}, end_date={self.end_date!r})")
+
+
+# Value of each input element of the leave request modal, by action_id
+_ELEMENT_VALUES: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "leave_type": lambda element: element.get("selected_option"),
+    "start_date": lambda element: element.get("selected_date"),
+    "end_date": lambda element: element.get("selected_date"),
+    "coverage_person": lambda element: element.get("selected_user"),
+    "tasks": lambda element: element.get("value"),
+    "reason": lambda element: element.get("value"),
+}
+
+# Checked in form order; (action_id, block_id, message)
+_REQUIRED = (
+    ("leave_type", "leave_type_block", "Please select a leave type"),
+    ("start_date", "date_block", "Please select a start date"),
+    ("end_date", "end_date_block", "Please select an end date"),
+    ("coverage_person", "coverage_block", "Please select who will cover for you"),
+    ("tasks", "tasks_block", "Please list tasks to be covered"),
+    ("reason", "reason_block", "Please provide a reason"),
+)
+
+
+def form_values(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Values of the leave request modal's inputs by action_id, as far as they are filled in."""
+    fields: Dict[str, Any] = {}
+    for block in values.values():
+        for action_id, element in block.items():
+            extract = _ELEMENT_VALUES.get(action_id)
+            if extract is not None:
+                fields[action_id] = extract(element)
+    return fields
+
+
+def parse_leave_request(user_id: str, values: Dict[str, Any],
+                        require_end_date: bool = True) -> Union[LeaveRequest, Dict[str, str]]:
+    """Parse a leave request modal's state.values in one pass.
+
+    Returns the LeaveRequest, or the Slack ``errors`` dict (block_id -> message)
+    when required fields are missing.
+    """
+    fields = form_values(values)
+    errors = {
+        block_id: message
+        for action_id, block_id, message in _REQUIRED
+        if not fields.get(action_id) and (require_end_date or action_id != "end_date")
+    }
+    if errors:
+        return errors
+
+    option = fields["leave_type"]
+    return LeaveRequest(
+        user_id=user_id,
+        leave_type=option.get("value"),
+        leave_type_display=option.get("text", {}).get("text"),
+        start_date=fields["start_date"],
+        end_date=fields.get("end_date"),
+        coverage_person=fields["coverage_person"],
+        tasks=fields["tasks"],
+        reason=fields["reason"]
+    )
@@ -0,0 +1,42 @@
+"""
+Composable wrappers around the Slack WebClient.
+
+Each wrapper exposes the same Web API methods as the client it wraps
+(``client.chat_postMessage(...)``), so handlers keep calling the client as
+before while outbound policies (rate limiting, ...) are layered in app.py.
+"""
+
+from typing import Any, Callable, Dict, Tuple
+
+from slack_sdk.errors import SlackApiError
+
+
+def api_method_name(method: str) -> str:
+    """Map a WebClient method name to its Slack API method, e.g. chat_postMessage -> chat.postMessage."""
+    return method.replace("_", ".")
+
+
+def slack_error(error: str, message: str = "") -> SlackApiError:
+    """Build a SlackApiError for a call that was refused before reaching Slack."""
+    return SlackApiError(message or error, {"ok": False, "error": error})
+
+
+class OutboundClient:
+    """Base wrapper that routes every public client method through _call()."""
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            return self._call(name, attr, args, kwargs)
+
+        call.__name__ = name
+        return call
+
+    def _call(self, method: str, func: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        return func(*args, **kwargs)
@@ -0,0 +1,226 @@
+"""
+Outbound rate limiting for Slack Web API calls.
+
+Every call takes a token from the bucket of its API method (sized by Slack's
+method tier) and, for chat.postMessage, from a per-channel bucket (Slack
+allows roughly one message per second per channel). Buckets hand out
+reservations in arrival order, so callers queue for a slot instead of
+hitting 429s. A 429 pauses the affected buckets for Retry-After seconds and
+the call is retried.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from slack_sdk.errors import SlackApiError
+
+from src.metrics import MetricsRegistry, registry as default_registry
+from src.slack.outbound import OutboundClient, api_method_name, slack_error
+from src.slack.scheduler import TRIGGER_BUDGET, trigger_time_remaining
+
+logger = logging.getLogger(__name__)
+
+# Requests per minute and burst size for each Slack rate limit tier
+TIERS = {
+    "tier1": (1, 1),
+    "tier2": (20, 5),
+    "tier3": (50, 10),
+    "tier4": (100, 20),
+    "special": (300, 30),
+}
+
+METHOD_TIERS = {
+    "chat.postMessage": "special",
+    "chat.postEphemeral": "special",
+    "chat.update": "tier3",
+    "conversations.open": "tier3",
+    "views.open": "tier4",
+    "views.update": "tier4",
+    "views.push": "tier4",
+    "users.info": "tier4",
+    "users.list": "tier2",
+}
+DEFAULT_TIER = "tier3"
+
+# chat.postMessage: about one message per second per channel, short bursts allowed
+CHANNEL_RATE_PER_MINUTE = 60
+CHANNEL_BURST = 3
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations; a negative balance is a queue."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def refund(self) -> None:
+        """Give back a reservation that will not be used."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every reservation until Slack's Retry-After has passed."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    @property
+    def idle(self) -> bool:
+        """True when the bucket is full and unpaused, i.e. can be dropped and recreated."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return self._tokens >= self.capacity and self._paused_until <= now
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class RateLimiter:
+    """Per-method and per-channel token buckets for one worker process.
+
+    `share` scales every rate down so the gunicorn workers together stay
+    within the workspace limits (e.g. 1/9 with nine workers).
+    """
+
+    def __init__(self, share: float = 1.0, max_wait: float = 20.0, max_channel_buckets: int = 1000,
+                 metrics: Optional[MetricsRegistry] = None):
+        self.share = share
+        self.max_wait = max_wait
+        self.max_channel_buckets = max_channel_buckets
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._metrics = metrics or default_registry
+
+    def buckets_for(self, api_method: str, kwargs: Dict[str, Any]) -> List[Tuple[str, TokenBucket]]:
+        tier = METHOD_TIERS.get(api_method, DEFAULT_TIER)
+        per_minute, burst = TIERS[tier]
+        buckets = [(api_method, self._bucket(api_method, per_minute, burst))]
+        channel = kwargs.get("channel")
+        if api_method == "chat.postMessage" and channel:
+            buckets.append((f"channel:{channel}", self._bucket(f"channel:{channel}", CHANNEL_RATE_PER_MINUTE, CHANNEL_BURST)))
+        return buckets
+
+    def acquire(self, buckets: List[Tuple[str, TokenBucket]], max_wait: Optional[float] = None) -> float:
+        """Wait for a slot in every bucket. Returns the time waited.
+
+        max_wait lowers the limiter's own limit for this call, e.g. to a trigger's remaining time.
+        """
+        waits = [(name, bucket.reserve()) for name, bucket in buckets]
+        wait = max(w for _, w in waits)
+        if wait > (self.max_wait if max_wait is None else min(max_wait, self.max_wait)):
+            for _, bucket in buckets:
+                bucket.refund()
+            for name, _ in waits:
+                self._metrics.counter(f"rate_limit.{name}.rejected").inc()
+            error = slack_error("ratelimited", f"Local rate limit queue is {wait:.1f}s deep")
+            # When a slot will be free, for callers that can come back later (the outbox)
+            error.retry_after = wait
+            raise error
+        for name, bucket_wait in waits:
+            self._metrics.timer(f"rate_limit.{name}.wait").observe(bucket_wait)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def throttled(self, buckets: List[Tuple[str, TokenBucket]], retry_after: float) -> None:
+        """Record a 429 and pause the buckets involved."""
+        for name, bucket in buckets:
+            bucket.pause(retry_after)
+            self._metrics.counter(f"rate_limit.{name}.throttled").inc()
+
+    def _bucket(self, name: str, per_minute: float, burst: float) -> TokenBucket:
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(name)
+                if bucket is None:
+                    if len(self._buckets) >= self.max_channel_buckets:
+                        self._prune()
+                    bucket = TokenBucket(per_minute * self.share / 60.0, burst)
+                    self._buckets[name] = bucket
+        return bucket
+
+    def _prune(self) -> None:
+        for name in [name for name, bucket in self._buckets.items() if name.startswith("channel:") and bucket.idle]:
+            del self._buckets[name]
+
+
+def retry_after_seconds(error: SlackApiError) -> Optional[float]:
+    """Return Slack's Retry-After for a 429 response, None for other errors."""
+    response = error.response
+    if getattr(response, "status_code", None) != 429:
+        return None
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after") or 1
+    try:
+        return float(value[0] if isinstance(value, list) else value)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class RateLimitedClient(OutboundClient):
+    """Slack client wrapper that queues calls through a RateLimiter.
+
+    Calls with a trigger_id never queue past their trigger's budget: they fail
+    with expired_trigger_id as soon as the wait would outlast it.
+    """
+
+    def __init__(self, client: Any, limiter: RateLimiter, max_retries: int = 3,
+                 trigger_budget: float = TRIGGER_BUDGET, metrics: Optional[MetricsRegistry] = None):
+        super().__init__(client)
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.trigger_budget = trigger_budget
+        self._expired = (metrics or default_registry).counter("rate_limit.trigger_expired")
+
+    def _call(self, method: str, func: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        api_method = api_method_name(method)
+        buckets = self.limiter.buckets_for(api_method, kwargs)
+        attempt = 0
+        while True:
+            self._acquire(method, buckets, kwargs)
+            try:
+                return func(*args, **kwargs)
+            except SlackApiError as e:
+                retry_after = retry_after_seconds(e)
+                if retry_after is None:
+                    raise
+                self.limiter.throttled(buckets, retry_after)
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                logger.warning(f"{api_method} rate limited by Slack, retrying in {retry_after}s (attempt {attempt})")
+
+    def _acquire(self, method: str, buckets: List[Tuple[str, TokenBucket]], kwargs: Dict[str, Any]) -> None:
+        """Wait for a slot, capped at the remaining trigger budget for trigger-bound calls."""
+        if "trigger_id" not in kwargs or trigger_time_remaining(self.trigger_budget) is None:
+            self.limiter.acquire(buckets)
+            return
+        remaining = trigger_time_remaining(self.trigger_budget)
+        if remaining > 0:
+            try:
+                self.limiter.acquire(buckets, max_wait=remaining)
+                return
+            except SlackApiError as e:
+                if e.response.get("error") != "ratelimited":
+                    raise
+        self._expired.inc()
+        logger.warning(f"{method} skipped: trigger_id would expire while waiting for a rate limit slot")
+        raise slack_error("expired_trigger_id", "Trigger expired before a rate limit slot was free")
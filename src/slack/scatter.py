@@ -0,0 +1,120 @@
+"""
+Scatter-gather execution for independent Slack calls.
+
+An interaction typically makes several Slack calls that do not depend on
+each other (update the approver message, DM the requester, notify the
+department head). Running them concurrently makes the interaction take as
+long as the slowest call instead of the sum of all of them.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+from src.metrics import MetricsRegistry, registry as default_registry
+
+logger = logging.getLogger(__name__)
+
+
+class CallResult:
+    """Outcome of one call in a scatter-gather: its return value or the exception it raised."""
+
+    __slots__ = ("name", "value", "error", "elapsed")
+
+    def __init__(self, name: str, value: Any = None, error: Optional[BaseException] = None, elapsed: float = 0.0):
+        self.name = name
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _invoke(name: str, fn: Callable[[], Any]) -> CallResult:
+    started = time.monotonic()
+    try:
+        return CallResult(name, value=fn(), elapsed=time.monotonic() - started)
+    except Exception as e:
+        return CallResult(name, error=e, elapsed=time.monotonic() - started)
+
+
+def run_serially(calls: Dict[str, Callable[[], Any]]) -> Dict[str, CallResult]:
+    """Run the calls one after another, collecting results the same way as ScatterGather.run()."""
+    return {name: _invoke(name, fn) for name, fn in calls.items()}
+
+
+class ScatterGather:
+    """Runs independent calls concurrently under a shared deadline.
+
+    The last call runs in the caller's thread, so a single call never pays a
+    thread handoff. Calls still running at the deadline are reported as
+    TimeoutError; they finish in the background but are not waited for.
+    """
+
+    def __init__(self, max_workers: int = 8, deadline: float = 10.0, name: str = "scatter",
+                 metrics: Optional[MetricsRegistry] = None):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self.name = name
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+        metrics = metrics or default_registry
+        self._latency = metrics.timer(f"{name}.latency")
+        self._calls = metrics.counter(f"{name}.calls")
+        self._failures = metrics.counter(f"{name}.failures")
+        self._timeouts = metrics.counter(f"{name}.timeouts")
+
+    def run(self, calls: Dict[str, Callable[[], Any]], deadline: Optional[float] = None) -> Dict[str, CallResult]:
+        """Run every call and return their results by name, in the order given."""
+        started = time.monotonic()
+        deadline = self.deadline if deadline is None else deadline
+        names = list(calls)
+        results: Dict[str, CallResult] = {}
+        if names:
+            pool = self._ensure_pool()
+            futures = {name: pool.submit(_invoke, name, calls[name]) for name in names[:-1]}
+            results[names[-1]] = _invoke(names[-1], calls[names[-1]])
+
+            wait(futures.values(), timeout=max(0.0, deadline - (time.monotonic() - started)))
+            for name, future in futures.items():
+                if future.done():
+                    results[name] = future.result()
+                else:
+                    self._timeouts.inc()
+                    logger.warning(f"{name} did not finish within the {deadline}s deadline")
+                    results[name] = CallResult(
+                        name, error=TimeoutError(f"{name} exceeded {deadline}s"),
+                        elapsed=time.monotonic() - started
+                    )
+
+        self._calls.inc(len(names))
+        self._failures.inc(sum(1 for result in results.values() if not result.ok))
+        self._latency.observe(time.monotonic() - started)
+        return {name: results[name] for name in names}
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._pid = None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def _ensure_pool(self) -> ThreadPoolExecutor:
+        pid = os.getpid()
+        if self._pid == pid and self._pool is not None:
+            return self._pool
+        with self._lock:
+            if self._pid != pid or self._pool is None:
+                # Threads do not survive a fork, so each gunicorn worker gets its own pool
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+                self._pid = pid
+            return self._pool
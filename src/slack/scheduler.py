@@ -0,0 +1,166 @@
+"""
+Prioritized admission for outbound Slack calls.
+
+A trigger_id is only valid for about three seconds, so calls that consume
+one (views.open for the leave form and the rejection modal) must not queue
+behind notification traffic from the background executor and the outbox
+drainer. Every outbound call takes a slot from a per-worker scheduler;
+trigger-bound calls are always admitted first, and give up with
+``expired_trigger_id`` when their trigger would expire before they could
+reach Slack, so the caller can fall back to a re-open button.
+"""
+
+import contextvars
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.metrics import MetricsRegistry, registry as default_registry
+from src.slack.outbound import OutboundClient, slack_error
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_TRIGGER = 0
+PRIORITY_NORMAL = 1
+LANES = {PRIORITY_TRIGGER: "trigger", PRIORITY_NORMAL: "normal"}
+
+# Slack invalidates a trigger_id 3 seconds after issuing it; keep a margin
+# for the request to reach us and the views.open round trip
+TRIGGER_BUDGET = 2.5
+
+_trigger_received_at: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "trigger_received_at", default=None
+)
+
+
+def mark_trigger_received(at: Optional[float] = None) -> None:
+    """Record when the current request (and its trigger_id) arrived."""
+    _trigger_received_at.set(time.monotonic() if at is None else at)
+
+
+def trigger_time_remaining(budget: float = TRIGGER_BUDGET) -> Optional[float]:
+    """Seconds left to use the current request's trigger_id, None if unknown."""
+    received_at = _trigger_received_at.get()
+    if received_at is None:
+        return None
+    return budget - (time.monotonic() - received_at)
+
+
+def is_trigger_expired(error: Exception) -> bool:
+    """Whether a Slack error means the trigger_id can no longer be used."""
+    response = getattr(error, "response", None)
+    return response is not None and response.get("error") == "expired_trigger_id"
+
+
+class PriorityScheduler:
+    """Limits in-flight Slack calls per worker and admits waiters by priority, then arrival."""
+
+    def __init__(self, max_concurrent: int = 4, metrics: Optional[MetricsRegistry] = None):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self._in_flight = 0
+        self._waiting: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+        self._metrics = metrics or default_registry
+        self._in_flight_gauge = self._metrics.gauge("scheduler.in_flight")
+        self._waiting_gauge = self._metrics.gauge("scheduler.waiting")
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @contextmanager
+    def slot(self, priority: int = PRIORITY_NORMAL, timeout: Optional[float] = None) -> Iterator[None]:
+        """Hold one of the scheduler's slots. Raises TimeoutError if none frees up in time."""
+        self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self, priority: int = PRIORITY_NORMAL, timeout: Optional[float] = None) -> None:
+        started = time.monotonic()
+        ticket = (priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+            self._waiting_gauge.set(len(self._waiting))
+            try:
+                while self._waiting[0] != ticket or self._in_flight >= self.max_concurrent:
+                    remaining = None if timeout is None else timeout - (time.monotonic() - started)
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"No outbound slot within {timeout:.2f}s")
+                    self._condition.wait(remaining)
+                heapq.heappop(self._waiting)
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                # The head may have changed; let the next waiter re-check
+                self._condition.notify_all()
+                raise
+            finally:
+                self._waiting_gauge.set(len(self._waiting))
+            self._in_flight += 1
+            self._in_flight_gauge.set(self._in_flight)
+            # Another slot may still be free for the next waiter in line
+            self._condition.notify_all()
+        self._metrics.timer(f"scheduler.{LANES.get(priority, priority)}.wait").observe(time.monotonic() - started)
+
+    def release(self) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._in_flight_gauge.set(self._in_flight)
+            self._condition.notify_all()
+
+    def observe(self, elapsed: float, error: Optional[BaseException] = None) -> None:
+        """Outcome of a call made under a slot. The fixed-size scheduler ignores it."""
+
+
+class PrioritizedClient(OutboundClient):
+    """Slack client wrapper that sends calls through a PriorityScheduler.
+
+    Calls with a trigger_id take the priority lane and fail fast with
+    expired_trigger_id once the trigger budget of the current request is spent.
+    """
+
+    def __init__(self, client: Any, scheduler: PriorityScheduler, trigger_budget: float = TRIGGER_BUDGET,
+                 metrics: Optional[MetricsRegistry] = None):
+        super().__init__(client)
+        self.scheduler = scheduler
+        self.trigger_budget = trigger_budget
+        self._expired = (metrics or default_registry).counter("scheduler.trigger_expired")
+
+    def _call(self, method: str, func: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        if "trigger_id" not in kwargs:
+            with self.scheduler.slot(PRIORITY_NORMAL):
+                return self._observed(func, args, kwargs)
+
+        remaining = trigger_time_remaining(self.trigger_budget)
+        try:
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError("Trigger budget already spent")
+            self.scheduler.acquire(PRIORITY_TRIGGER, timeout=remaining)
+        except TimeoutError:
+            self._expired.inc()
+            logger.warning(f"{method} skipped: trigger_id would expire before reaching Slack")
+            raise slack_error("expired_trigger_id", "Trigger expired before the call could be sent")
+        try:
+            return self._observed(func, args, kwargs)
+        finally:
+            self.scheduler.release()
+
+    def _observed(self, func: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        started = time.monotonic()
+        try:
+            response = func(*args, **kwargs)
+        except Exception as e:
+            self.scheduler.observe(time.monotonic() - started, e)
+            raise
+        self.scheduler.observe(time.monotonic() - started)
+        return response
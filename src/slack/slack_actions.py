@@ -7,24 +7,77 @@ from slack_sdk.errors import SlackApiError
 import json
 import logging
 import os
-from typing import Dict, List, Any, Optional
+from functools import partial
+from typing import Callable, Dict, List, Any, Optional
 from src.config.organization import (
     is_department_head,
     get_department_head,
     get_department_name,
-    HR_CHANNEL_ID,
     ADMIN_USERS,
-    load_admin_users
+    get_directory,
+    get_hr_channel_id,
+    is_admin
 )
 import re
-from src.slack.helpers import create_admin_notification_blocks, create_user_notification_blocks, create_denial_modal_view
+from src.slack.helpers import (
+    create_admin_notification_blocks,
+    create_requester_context_block,
+    create_user_notification_blocks,
+    create_denial_modal_view,
+    create_reopen_prompt_blocks
+)
+from src.slack.action_tokens import ActionTokenSigner, is_action_token
+from src.slack.executor import BoundedExecutor
+from src.slack.layouts import (
+    APPROVAL_DM,
+    APPROVAL_UPDATE,
+    APPROVER_NOTIFICATION,
+    REJECTION_DM,
+    REJECTION_UPDATE,
+    REQUESTER_CONFIRMATION
+)
+from src.slack.metadata import MetadataCodec, default_codec
+from src.slack.models import LeaveRequest, form_values, parse_leave_request
+from src.slack.scatter import CallResult, ScatterGather, run_serially
+from src.slack.scheduler import is_trigger_expired
+from src.slack.user_profiles import UserProfileCache
+from src.slack.validation import DISPATCHED_ACTIONS, LeaveFormValidator, updated_view, with_validation_blocks
+from src.storage.leave_defaults import LeaveDefaultsStore
+from src.storage.leave_requests import LeaveRequestStore, STATUS_APPROVED, STATUS_DENIED, STATUS_PENDING
+from src.storage.outbox import NotificationOutbox
 
 logger = logging.getLogger(__name__)
 
 class SlackActionsHandler:
-    def __init__(self, client: WebClient):
+    def __init__(self, client: WebClient, executor: Optional[BoundedExecutor] = None,
+                 outbox: Optional[NotificationOutbox] = None, scatter: Optional[ScatterGather] = None,
+                 store: Optional[LeaveRequestStore] = None, tokens: Optional[ActionTokenSigner] = None,
+                 metadata_codec: Optional[MetadataCodec] = None, defaults: Optional[LeaveDefaultsStore] = None,
+                 validator: Optional[LeaveFormValidator] = None, profiles: Optional[UserProfileCache] = None):
         self.client = client
         self.logger = logging.getLogger(__name__)
+        # With an executor or outbox the handler runs in ack-first mode: validation
+        # stays inline and the Slack side effects are delivered after the response.
+        self.executor = executor
+        self.outbox = outbox
+        # Independent Slack calls of one interaction run concurrently when set
+        self.scatter = scatter
+        # Requests are recorded on submission and looked up by ID on approve/deny
+        self.store = store
+        # Buttons and modals carry signed request details, verified without a lookup
+        self.tokens = tokens
+        self.metadata_codec = metadata_codec or default_codec
+        # Accepted submissions prefill the user's next leave request form
+        self.defaults = defaults
+        # Checks dates and coverage as the form is filled in, and again on submit
+        self.validator = validator or LeaveFormValidator(store)
+        # Approvers see the requester's profile; looked up through a per-process cache
+        self.profiles = profiles
+
+    @property
+    def ack_first(self) -> bool:
+        """Whether Slack side effects are deferred until after the response."""
+        return self.executor is not None or self.outbox is not None
 
     def handle_action(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Handle Slack interactive actions."""
@@ -32,7 +85,6 @@ class SlackActionsHandler:
             # Check payload type first
             payload_type = payload.get("type")
             logger.info(f"Handling action of type: {payload_type}")
-            logger.info(f"Full payload: {json.dumps(payload)}")
 
             if payload_type == "view_submission":
                 # Handle view submissions
@@ -52,6 +104,14 @@ class SlackActionsHandler:
                         "errors": {"action": "Invalid action"}
                     }
 
+                if action_id in DISPATCHED_ACTIONS and payload.get("view", {}).get("callback_id") == "leave_request_modal":
+                    # An input of the open leave request form changed
+                    return self._validate_leave_form(payload)
+
+                if action_id == "reopen_denial_modal":
+                    # Button from the ephemeral fallback; it carries the request itself
+                    return self._reopen_denial_modal(payload, action)
+
                 # Get container info first
                 container = payload.get("container", {})
                 channel_id = container.get("channel_id")
@@ -64,40 +124,57 @@ class SlackActionsHandler:
                         "errors": {"action": "Could not extract request details"}
                     }
 
-                # Extract request details from message
-                message = payload.get("message", {})
-                if not message:
-                    logger.error("No message found in payload")
-                    return {
-                        "response_action": "errors",
-                        "errors": {"action": "Could not extract request details"}
-                    }
+                if self.tokens is not None and is_action_token(action.get("value")):
+                    request_details = self.tokens.verify(action["value"])
+                    if request_details is None:
+                        return {
+                            "response_action": "errors",
+                            "errors": {"action": "This request has expired. Please ask the requester to submit it again."}
+                        }
+                    request_details.update(channel_id=channel_id, message_ts=message_ts)
+                else:
+                    request_details = self._stored_request_details(action, container)
+                if request_details is None:
+                    # Notifications posted before requests were stored only carry their details in the blocks
+                    message = payload.get("message", {})
+                    if not message:
+                        logger.error("No message found in payload")
+                        return {
+                            "response_action": "errors",
+                            "errors": {"action": "Could not extract request details"}
+                        }
 
-                # Add container info to message for _extract_request_details
-                message["container"] = container
+                    # Add container info to message for _extract_request_details
+                    message["container"] = container
 
-                request_details = self._extract_request_details(message)
-                if not request_details:
-                    logger.error("Could not extract request details from message")
+                    request_details = self._extract_request_details(message)
+                    if not request_details:
+                        logger.error("Could not extract request details from message")
+                        return {
+                            "response_action": "errors",
+                            "errors": {"action": "Could not extract request details"}
+                        }
+
+                status = request_details.get("status", STATUS_PENDING)
+                if status != STATUS_PENDING:
                     return {
                         "response_action": "errors",
-                        "errors": {"action": "Could not extract request details"}
+                        "errors": {"action": f"This request has already been {status}"}
                     }
 
                 # Check authorization
                 requester_id = request_details.get("requester_id")
                 if user_id == requester_id:
                     # Check if user is super admin
-                    admin_users = load_admin_users()
-                    logger.info(f"User {user_id} is trying to handle their own request. Admin users: {admin_users}")
-                    if user_id not in admin_users:
+                    logger.info(f"User {user_id} is trying to handle their own request")
+                    if not is_admin(user_id):
                         logger.error(f"User {user_id} tried to handle their own request but is not an admin")
                         return {
                             "response_action": "errors",
                             "errors": {"action": "You cannot approve or reject your own request"}
                         }
 
-                if not self._is_authorized(user_id, requester_id):
+                if not self._is_authorized(user_id, requester_id, request_details.get("approver_id")):
                     logger.error(f"User {user_id} is not authorized to perform this action")
                     return {
                         "response_action": "errors",
@@ -108,6 +185,14 @@ class SlackActionsHandler:
                 try:
                     if action_id == "approve_leave":
                         logger.info(f"Processing approval from user {user_id}")
+                        if not self._decide(request_details, STATUS_APPROVED, user_id):
+                            return {
+                                "response_action": "errors",
+                                "errors": {"action": "This request has already been decided"}
+                            }
+                        if self.ack_first:
+                            self._queue_approval_processing(payload, request_details)
+                            return {"response_action": "clear"}
                         # Process approval immediately
                         if not self._handle_approval(payload, request_details):
                             return {
@@ -125,21 +210,9 @@ class SlackActionsHandler:
                                 "errors": {"action": "Could not open rejection modal"}
                             }
 
-                        # Extract request details from message
-                        message = payload.get("message", {})
-                        # Add container info to message for _extract_request_details
-                        message["container"] = payload.get("container", {})
-                        
-                        request_details = self._extract_request_details(message)
-                        if not request_details:
-                            logger.error("Could not extract request details from message")
-                            return {
-                                "response_action": "errors",
-                                "errors": {"action": "Could not extract request details"}
-                            }
-
                         # Create leave request object for modal
                         leave_request = {
+                            "request_id": request_details.get("request_id"),
                             "user": {"id": request_details["requester_id"]},
                             "channel_id": request_details["channel_id"],
                             "message_ts": request_details["message_ts"],
@@ -150,7 +223,8 @@ class SlackActionsHandler:
 
                         # Create and open the rejection modal
                         try:
-                            modal_view = create_denial_modal_view(leave_request)
+                            modal_view = create_denial_modal_view(leave_request, self._sign(request_details),
+                                                                  codec=self.metadata_codec)
                             logger.info(f"Opening modal with view: {json.dumps(modal_view)}")
                             response = self.client.views_open(
                                 trigger_id=payload["trigger_id"],
@@ -158,6 +232,15 @@ class SlackActionsHandler:
                             )
                             logger.info(f"Modal open response: {json.dumps(response)}")
                             return {"response_action": "clear"}
+                        except SlackApiError as e:
+                            if not is_trigger_expired(e):
+                                logger.error(f"Error opening rejection modal: {str(e)}", exc_info=True)
+                                return {
+                                    "response_action": "errors",
+                                    "errors": {"action": "Could not open rejection modal"}
+                                }
+                            self._prompt_reopen_denial_modal(channel_id, user_id, leave_request)
+                            return {"response_action": "clear"}
                         except Exception as e:
                             logger.error(f"Error opening rejection modal: {str(e)}", exc_info=True)
                             return {
@@ -207,9 +290,9 @@ class SlackActionsHandler:
                 metadata_str = view.get("private_metadata", "{}")
                 
                 try:
-                    metadata = json.loads(metadata_str)
+                    metadata = self._load_metadata(metadata_str)
                     logger.info(f"Decoded metadata: {json.dumps(metadata)}")
-                except json.JSONDecodeError as e:
+                except ValueError as e:
                     logger.error(f"Failed to decode metadata: {str(e)}")
                     return {
                         "response_action": "errors",
@@ -241,6 +324,18 @@ class SlackActionsHandler:
                         }
                     }
 
+                if not self._decide(metadata, STATUS_DENIED, payload.get("user", {}).get("id"), denial_reason):
+                    return {
+                        "response_action": "errors",
+                        "errors": {
+                            "denial_reason": "This request has already been decided."
+                        }
+                    }
+
+                if self.ack_first:
+                    self._queue_rejection_processing(payload)
+                    return {}
+
                 try:
                     # Update original message in channel
                     channel_id = metadata["channel_id"]
@@ -250,59 +345,35 @@ class SlackActionsHandler:
                     start_date = metadata.get("start_date", "")
                     end_date = metadata.get("end_date", start_date)
 
-                    # Update the original message first
-                    self.client.chat_update(
-                        channel=channel_id,
-                        ts=message_ts,
-                        text=f"Leave request from <@{requester_id}> was rejected",
-                        blocks=[
-                            {
-                                "type": "section",
-                                "text": {
-                                    "type": "mrkdwn",
-                                    "text": f":x: Leave request from <@{requester_id}> was rejected\n*Reason:* {denial_reason}"
-                                }
-                            },
-                            {
-                                "type": "section",
-                                "fields": [
-                                    {"type": "mrkdwn", "text": f"*Type:*\n{leave_type}"},
-                                    {"type": "mrkdwn", "text": f"*Duration:*\n{start_date} to {end_date}"}
-                                ]
-                            }
-                        ]
-                    )
+                    fields = {
+                        "requester_id": requester_id,
+                        "leave_type": leave_type,
+                        "start_date": start_date,
+                        "end_date": end_date,
+                        "denial_reason": denial_reason
+                    }
 
-                    # Send DM to requester
-                    try:
-                        # Open DM channel first
-                        dm_open = self.client.conversations_open(users=[requester_id])
-                        dm_channel = dm_open["channel"]["id"]
-                        
-                        self.client.chat_postMessage(
-                            channel=dm_channel,
+                    # Update the original message and DM the requester concurrently
+                    results = self._gather({
+                        "chat_update": partial(self.client.chat_update,
+                            channel=channel_id,
+                            ts=message_ts,
+                            text=f"Leave request from <@{requester_id}> was rejected",
+                            blocks=REJECTION_UPDATE.render(**fields)
+                        ),
+                        "requester_dm": partial(self.client.chat_postMessage,
+                            channel=requester_id,
                             text=f"Your {leave_type} request was rejected",
-                            blocks=[
-                                {
-                                    "type": "section",
-                                    "text": {
-                                        "type": "mrkdwn",
-                                        "text": f":x: Your {leave_type} request was rejected\n*Reason:* {denial_reason}"
-                                    }
-                                },
-                                {
-                                    "type": "section",
-                                    "fields": [
-                                        {"type": "mrkdwn", "text": f"*Type:*\n{leave_type}"},
-                                        {"type": "mrkdwn", "text": f"*Duration:*\n{start_date} to {end_date}"}
-                                    ]
-                                }
-                            ]
+                            blocks=REJECTION_DM.render(**fields)
                         )
-                    except SlackApiError as e:
-                        logger.error(f"Failed to send DM: {str(e)}")
+                    })
+
+                    if not results["requester_dm"].ok:
+                        logger.error(f"Failed to send DM: {str(results['requester_dm'].error)}")
                         # Continue even if DM fails
-                    
+                    if not results["chat_update"].ok:
+                        raise results["chat_update"].error
+
                     # Return empty response to close modal
                     return {}
 
@@ -325,167 +396,27 @@ class SlackActionsHandler:
 
             elif callback_id == "leave_request_modal":
                 # Extract form values from state
-                state_values = view.get("state", {}).get("values", {})
-                
-                # Validate required fields
-                errors = {}
-                
-                # Validate leave type
-                leave_type_values = state_values.get("leave_type_block", {}).get("leave_type", {})
-                if not leave_type_values.get("selected_option"):
-                    errors["leave_type_block"] = "Please select a leave type"
-                
-                # Validate start date
-                start_date = state_values.get("date_block", {}).get("start_date", {}).get("selected_date")
-                if not start_date:
-                    errors["date_block"] = "Please select a start date"
-                
-                # Validate end date
-                end_date = state_values.get("end_date_block", {}).get("end_date", {}).get("selected_date")
-                if not end_date:
-                    errors["end_date_block"] = "Please select an end date"
-                
-                # Validate coverage person
-                coverage_person = state_values.get("coverage_block", {}).get("coverage_person", {}).get("selected_user")
-                if not coverage_person:
-                    errors["coverage_block"] = "Please select who will cover for you"
-                
-                # Validate tasks
-                tasks = state_values.get("tasks_block", {}).get("tasks", {}).get("value")
-                if not tasks:
-                    errors["tasks_block"] = "Please list tasks to be covered"
-                
-                # Validate reason
-                reason = state_values.get("reason_block", {}).get("reason", {}).get("value")
-                if not reason:
-                    errors["reason_block"] = "Please provide a reason"
-                
-                if errors:
+                leave_request = parse_leave_request(
+                    payload.get("user", {}).get("id"),
+                    view.get("state", {}).get("values", {})
+                )
+                if not isinstance(leave_request, LeaveRequest):
                     return {
                         "response_action": "errors",
-                        "errors": errors
+                        "errors": leave_request
                     }
-                
-                try:
-                    # Get user info
-                    user = payload.get("user", {})
-                    user_id = user.get("id")
-                    
-                    # Get leave type display text
-                    leave_type_option = leave_type_values.get("selected_option", {})
-                    leave_type = leave_type_option.get("value")
-                    leave_type_display = leave_type_option.get("text", {}).get("text", leave_type)
-                    
-                    # Create notification blocks
-                    notification_blocks = [
-                        {
-                            "type": "section",
-                            "fields": [
-                                {"type": "mrkdwn", "text": f"*Requester:*\n<@{user_id}>"},
-                                {"type": "mrkdwn", "text": f"*Type:*\n{leave_type_display}"},
-                                {"type": "mrkdwn", "text": f"*Duration:*\n{start_date} to {end_date}"},
-                                {"type": "mrkdwn", "text": f"*Coverage:*\n<@{coverage_person}>"}
-                            ]
-                        },
-                        {
-                            "type": "section",
-                            "fields": [
-                                {"type": "mrkdwn", "text": f"*Tasks:*\n{tasks}"},
-                                {"type": "mrkdwn", "text": f"*Reason:*\n{reason}"}
-                            ]
-                        },
-                        {
-                            "type": "actions",
-                            "elements": [
-                                {
-                                    "type": "button",
-                                    "text": {
-                                        "type": "plain_text",
-                                        "text": "✅ Approve",
-                                        "emoji": True
-                                    },
-                                    "style": "primary",
-                                    "action_id": "approve_leave"
-                                },
-                                {
-                                    "type": "button",
-                                    "text": {
-                                        "type": "plain_text",
-                                        "text": "❌ Reject",
-                                        "emoji": True
-                                    },
-                                    "style": "danger",
-                                    "action_id": "reject_leave"
-                                }
-                            ]
-                        }
-                    ]
-                    
-                    # Send confirmation to user
-                    try:
-                        self.client.chat_postMessage(
-                            channel=user_id,
-                            text=f"Your {leave_type_display} request has been submitted",
-                            blocks=notification_blocks[:-1] + [{
-                                "type": "context",
-                                "elements": [
-                                    {
-                                        "type": "mrkdwn",
-                                        "text": ":information_source: Your request has been submitted and is pending approval."
-                                    }
-                                ]
-                            }]
-                        )
-                    except SlackApiError as e:
-                        logger.error(f"Failed to send confirmation to user: {str(e)}")
-                        # Continue even if confirmation fails
-                    
-                    # Check if user is department head
-                    if is_department_head(user_id):
-                        # If user is department head, send directly to HR
-                        if HR_CHANNEL_ID:
-                            try:
-                                self.client.chat_postMessage(
-                                    channel=HR_CHANNEL_ID,
-                                    text=f"New {leave_type_display} request from Department Head <@{user_id}>",
-                                    blocks=notification_blocks
-                                )
-                            except SlackApiError as e:
-                                logger.error(f"Failed to send to HR channel: {str(e)}")
-                    else:
-                        # Get department head
-                        dept_head = get_department_head(user_id)
-                        if dept_head:
-                            try:
-                                self.client.chat_postMessage(
-                                    channel=dept_head,
-                                    text=f"New {leave_type_display} request from <@{user_id}>",
-                                    blocks=notification_blocks
-                                )
-                            except SlackApiError as e:
-                                logger.error(f"Failed to send to department head: {str(e)}")
-                        elif HR_CHANNEL_ID:
-                            try:
-                                self.client.chat_postMessage(
-                                    channel=HR_CHANNEL_ID,
-                                    text=f"New {leave_type_display} request from <@{user_id}> (No department head found)",
-                                    blocks=notification_blocks
-                                )
-                            except SlackApiError as e:
-                                logger.error(f"Failed to send to HR channel: {str(e)}")
-                    
-                    # Return empty response to close modal
-                    return {}
-                    
-                except Exception as e:
-                    logger.error(f"Error processing leave request: {str(e)}", exc_info=True)
+
+                errors = self.validator.validate(leave_request.user_id, leave_request.start_date,
+                                                 leave_request.end_date, leave_request.coverage_person, fresh=True)
+                if errors:
                     return {
                         "response_action": "errors",
-                        "errors": {
-                            "submission": "Failed to process request. Please try again."
-                        }
+                        "errors": errors
                     }
-            
+
+                self.submit_leave_request(leave_request)
+                return {}
+
             # For any other modal, just close it
             return {}
             
@@ -498,198 +429,308 @@ class SlackActionsHandler:
                 }
             }
 
-    def _validate_leave_request(self, values: Dict[str, Any]) -> Optional[Dict[str, Dict[str, str]]]:
-        """Validate leave request form values."""
-        errors = {}
-        
-        # Validate leave type
-        leave_type_block = values.get("leave_type_block", {})
-        if not leave_type_block.get("leave_type", {}).get("selected_option", {}).get("value"):
-            errors["leave_type_block"] = "Please select a leave type"
-        
-        # Validate dates
-        date_block = values.get("date_block", {})
-        if not date_block.get("start_date", {}).get("selected_date"):
-            errors["date_block"] = "Please select a start date"
-        
-        # Validate coverage
-        coverage_block = values.get("coverage_block", {})
-        if not coverage_block.get("coverage_person", {}).get("selected_user"):
-            errors["coverage_block"] = "Please select who will cover for you"
-        
-        # Validate tasks
-        tasks_block = values.get("tasks_block", {})
-        if not tasks_block.get("tasks", {}).get("value"):
-            errors["tasks_block"] = "Please list tasks to be covered"
-        
-        # Validate reason
-        reason_block = values.get("reason_block", {})
-        if not reason_block.get("reason", {}).get("value"):
-            errors["reason_block"] = "Please provide a reason"
-        
-        return errors if errors else None
-
-    def _queue_leave_request_processing(self, payload: Dict[str, Any]) -> None:
+    def _validate_leave_form(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Show the open leave request form's errors under its inputs."""
+        view = payload["view"]
+        if self.profiles is not None:
+            # Fetch the requester's profile while they fill in the form, for the approver notification
+            self.profiles.peek(payload["user"]["id"])
+        fields = form_values(view.get("state", {}).get("values", {}))
+        errors = self.validator.validate(payload["user"]["id"], fields.get("start_date"),
+                                         fields.get("end_date"), fields.get("coverage_person"))
+
+        blocks = with_validation_blocks(view.get("blocks", []), errors)
+        if blocks == view.get("blocks", []):
+            # The warnings shown are still right
+            return {}
+        try:
+            # The hash makes Slack refuse the update if the view changed in the meantime
+            self.client.views_update(view_id=view["id"], hash=view.get("hash"), view=updated_view(view, blocks))
+        except SlackApiError as e:
+            logger.info(f"Skipped leave form validation update: {e.response['error']}")
+        return {}
+
+    def _prompt_reopen_denial_modal(self, channel_id: str, user_id: str, leave_request: Dict[str, Any]) -> None:
+        """Offer a button to open the rejection modal again after its trigger expired."""
+        logger.warning(f"Trigger expired opening rejection modal for {user_id}, sending re-open prompt")
+        try:
+            self.client.chat_postEphemeral(
+                channel=channel_id,
+                user=user_id,
+                text="The rejection form took too long to open",
+                blocks=create_reopen_prompt_blocks(
+                    ":hourglass: The rejection form took too long to open. Click below to try again.",
+                    "Open rejection form",
+                    "reopen_denial_modal",
+                    self._sign(dict(leave_request, requester_id=leave_request["user"]["id"]))
+                    or leave_request.get("request_id")
+                    or json.dumps(leave_request)
+                )
+            )
+        except SlackApiError as e:
+            logger.error(f"Failed to send re-open prompt: {str(e)}")
+
+    def _reopen_denial_modal(self, payload: Dict[str, Any], action: Dict[str, Any]) -> Dict[str, Any]:
+        """Open the rejection modal from the re-open prompt."""
+        user_id = payload.get("user", {}).get("id")
+        try:
+            if self.tokens is not None and is_action_token(action.get("value")):
+                details = self.tokens.verify(action["value"])
+                if details is None:
+                    raise ValueError("Invalid or expired action token")
+            else:
+                details = self._stored_request_details(action, {})
+            if details is not None:
+                leave_request = dict(details, user={"id": details["requester_id"]})
+            else:
+                leave_request = json.loads(action.get("value") or "")
+            requester_id = leave_request["user"]["id"]
+        except (ValueError, KeyError, TypeError):
+            logger.error(f"Invalid re-open value: {action.get('value')}")
+            return {
+                "response_action": "errors",
+                "errors": {"action": "Could not extract request details"}
+            }
+
+        if user_id == requester_id and not is_admin(user_id):
+            return {
+                "response_action": "errors",
+                "errors": {"action": "You cannot approve or reject your own request"}
+            }
+        if not self._is_authorized(user_id, requester_id, leave_request.get("approver_id")):
+            return {
+                "response_action": "errors",
+                "errors": {"action": "You are not authorized to perform this action"}
+            }
+
+        try:
+            self.client.views_open(
+                trigger_id=payload.get("trigger_id"),
+                # Signed again so the denial carries a token, as when opened from the notification
+                view=create_denial_modal_view(leave_request, self._sign(details) if details is not None else None,
+                                              codec=self.metadata_codec)
+            )
+        except SlackApiError as e:
+            # The prompt stays visible, so the approver can click again
+            logger.error(f"Error re-opening rejection modal: {str(e)}")
+        return {"response_action": "clear"}
+
+    def _submit(self, fn, *args) -> None:
+        """Run a side effect through the outbox or background executor, or inline without either."""
+        if self.outbox is not None:
+            # Record every Slack call of this side effect atomically before acking;
+            # the outbox drainer delivers them
+            with self.outbox.batch():
+                fn(*args)
+            return
+        if self.executor is None:
+            fn(*args)
+            return
+        self.executor.submit(fn, *args)
+
+    def _deliver(self, method: str, **kwargs: Any) -> Any:
+        """Make a Slack Web API call, or record it in the outbox when one is configured."""
+        if self.outbox is not None:
+            return self.outbox.enqueue(method, **kwargs)
+        return getattr(self.client, method)(**kwargs)
+
+    def _gather(self, calls: Dict[str, Callable[[], Any]]) -> Dict[str, CallResult]:
+        """Run independent Slack calls, concurrently when a scatter-gather pool is configured.
+
+        With an outbox the calls are only recorded, in this thread: the records
+        are local writes that must join the current batch. The outbox drainer
+        then sends them concurrently, one ordered group per channel.
+        """
+        if self.scatter is None or self.outbox is not None:
+            return run_serially(calls)
+        return self.scatter.run(calls)
+
+    def _approver_for(self, user_id: str) -> Optional[str]:
+        """Where a user's requests are routed: HR for department heads, otherwise their department head."""
+        if is_department_head(user_id):
+            return get_hr_channel_id()
+        return get_department_head(user_id) or get_hr_channel_id()
+
+    def _record_leave_request(self, leave_request: LeaveRequest) -> Optional[str]:
+        """Store a validated submission and return its request ID, or None without a store."""
+        if self.store is None:
+            return None
+        try:
+            return self.store.create(
+                requester_id=leave_request.user_id,
+                leave_type=leave_request.leave_type,
+                leave_type_display=leave_request.leave_type_display,
+                start_date=leave_request.start_date,
+                end_date=leave_request.end_date,
+                approver_id=self._approver_for(leave_request.user_id),
+                coverage_person=leave_request.coverage_person,
+                tasks=leave_request.tasks,
+                reason=leave_request.reason
+            )
+        except Exception as e:
+            # The request still goes out; its buttons just fall back to the message blocks
+            logger.error(f"Failed to store leave request for {leave_request.user_id}: {str(e)}", exc_info=True)
+            return None
+
+    def _remember_defaults(self, leave_request: LeaveRequest) -> None:
+        """Update the submitter's form defaults; a failure only loses the prefill."""
+        if self.defaults is None:
+            return
+        try:
+            self.defaults.record(leave_request)
+        except Exception as e:
+            logger.error(f"Failed to update form defaults for {leave_request.user_id}: {str(e)}")
+
+    def _sign(self, details: Dict[str, Any]) -> Optional[str]:
+        """Action token for the request details, None when tokens are not configured."""
+        if self.tokens is None:
+            return None
+        return self.tokens.sign(details)
+
+    def _load_metadata(self, metadata_str: str) -> Dict[str, Any]:
+        """Decode denial modal metadata: a signed action token or packed metadata. Raises ValueError if invalid."""
+        if is_action_token(metadata_str):
+            metadata = self.tokens.verify(metadata_str) if self.tokens is not None else None
+            if metadata is None:
+                raise ValueError("Invalid or expired action token")
+            return metadata
+        return self.metadata_codec.decode(metadata_str)
+
+    @staticmethod
+    def _request_id_from_value(value: Optional[str]) -> Optional[str]:
+        """The request ID of a button value: the bare ID, or the JSON of older notifications."""
+        if not value:
+            return None
+        if not value.startswith("{"):
+            return value
+        try:
+            return json.loads(value).get("request_id")
+        except (ValueError, AttributeError):
+            return None
+
+    def _stored_request_details(self, action: Dict[str, Any], container: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Look up the request behind a button by the request ID in its value."""
+        if self.store is None:
+            return None
+        request_id = self._request_id_from_value(action.get("value"))
+        record = self.store.get(request_id) if request_id else None
+        if record is None:
+            return None
+
+        channel_id = container.get("channel_id") or record["channel_id"]
+        message_ts = container.get("message_ts") or record["message_ts"]
+        if record["message_ts"] is None and message_ts:
+            self.store.attach_message(request_id, channel_id, message_ts)
+        return {
+            "request_id": request_id,
+            "requester_id": record["requester_id"],
+            "channel_id": channel_id,
+            "message_ts": message_ts,
+            "leave_type": record["leave_type_display"],
+            "start_date": record["start_date"],
+            "end_date": record["end_date"],
+            "status": record["status"]
+        }
+
+    def _decide(self, details: Dict[str, Any], status: str, user_id: str, denial_reason: Optional[str] = None) -> bool:
+        """Record a decision on a stored request. False if it had already been decided."""
+        request_id = details.get("request_id")
+        if self.store is None or not request_id:
+            # Legacy notification without a stored request
+            return True
+        return self.store.decide(request_id, status, user_id, denial_reason)
+
+    def submit_leave_request(self, leave_request: LeaveRequest) -> Optional[str]:
+        """Record a validated request and notify its approver; returns the request ID if stored."""
+        request_id = self._record_leave_request(leave_request)
+        # The user's open forms (and forms naming them as coverage) now overlap this request
+        self.validator.forget(leave_request.user_id)
+
+        if self.ack_first:
+            self._queue_leave_request_processing(leave_request, request_id)
+        else:
+            # Without ack-first the notifications are sent before responding
+            self._process_leave_request(leave_request, request_id)
+        return request_id
+
+    def _queue_leave_request_processing(self, leave_request: LeaveRequest, request_id: Optional[str] = None) -> None:
         """Queue leave request processing to be handled asynchronously."""
-        import threading
-        thread = threading.Thread(target=self._process_leave_request, args=(payload,))
-        thread.daemon = True
-        thread.start()
+        self._submit(self._process_leave_request, leave_request, request_id)
 
-    def _process_leave_request(self, payload: Dict[str, Any]) -> None:
+    def _process_leave_request(self, leave_request: LeaveRequest, request_id: Optional[str] = None) -> None:
         """Process leave request in background."""
+        user_id = leave_request.user_id
         try:
-            view = payload.get("view", {})
-            user = payload.get("user", {})
-            values = view.get("state", {}).get("values", {})
-            
-            # Extract form values
-            leave_type_option = values.get("leave_type_block", {}).get("leave_type", {}).get("selected_option", {})
-            leave_type = leave_type_option.get("value")
-            leave_type_display = leave_type_option.get("text", {}).get("text", leave_type)
-            start_date = values.get("date_block", {}).get("start_date", {}).get("selected_date")
-            coverage_person = values.get("coverage_block", {}).get("coverage_person", {}).get("selected_user")
-            tasks = values.get("tasks_block", {}).get("tasks", {}).get("value")
-            reason = values.get("reason_block", {}).get("reason", {}).get("value")
-            
-            logger.info(f"Processing leave request for user {user.get('id')} of type {leave_type_display}")
-            
-            # Create notification blocks with approval/rejection buttons
-            notification_blocks = [
-                {
-                    "type": "section",
-                    "fields": [
-                        {"type": "mrkdwn", "text": f"*Requester:*\n<@{user.get('id')}>"},
-                        {"type": "mrkdwn", "text": f"*Type:*\n{leave_type_display}"},
-                        {"type": "mrkdwn", "text": f"*Start Date:*\n{start_date}"},
-                        {"type": "mrkdwn", "text": f"*Coverage:*\n<@{coverage_person}>"}
-                    ]
-                },
-                {
-                    "type": "section",
-                    "fields": [
-                        {"type": "mrkdwn", "text": f"*Tasks to Cover:*\n{tasks}"},
-                        {"type": "mrkdwn", "text": f"*Reason:*\n{reason}"}
-                    ]
-                },
-                {
-                    "type": "divider"
-                },
-                {
-                    "type": "actions",
-                    "block_id": "leave_request_actions",
-                    "elements": [
-                        {
-                            "type": "button",
-                            "text": {
-                                "type": "plain_text",
-                                "text": "✅ Approve Request",
-                                "emoji": True
-                            },
-                            "style": "primary",
-                            "value": json.dumps({
-                                "request_id": f"{user.get('id')}_{start_date}_{leave_type}",
-                                "action": "approve"
-                            }),
-                            "action_id": "approve_leave",
-                            "confirm": {
-                                "title": {
-                                    "type": "plain_text",
-                                    "text": "Approve Leave Request"
-                                },
-                                "text": {
-                                    "type": "mrkdwn",
-                                    "text": f"Are you sure you want to approve this {leave_type_display} request from <@{user.get('id')}>?"
-                                },
-                                "confirm": {
-                                    "type": "plain_text",
-                                    "text": "Yes, Approve"
-                                },
-                                "deny": {
-                                    "type": "plain_text",
-                                    "text": "No, Cancel"
-                                },
-                                "style": "primary"
-                            }
-                        },
-                        {
-                            "type": "button",
-                            "text": {
-                                "type": "plain_text",
-                                "text": "❌ Reject Request",
-                                "emoji": True
-                            },
-                            "style": "danger",
-                            "value": json.dumps({
-                                "request_id": f"{user.get('id')}_{start_date}_{leave_type}",
-                                "action": "reject"
-                            }),
-                            "action_id": "reject_leave",
-                            "confirm": {
-                                "title": {
-                                    "type": "plain_text",
-                                    "text": "Reject Leave Request"
-                                },
-                                "text": {
-                                    "type": "mrkdwn",
-                                    "text": f"Are you sure you want to reject this {leave_type_display} request from <@{user.get('id')}>?\nThis will open a dialog to provide a rejection reason."
-                                },
-                                "confirm": {
-                                    "type": "plain_text",
-                                    "text": "Yes, Reject"
-                                },
-                                "deny": {
-                                    "type": "plain_text",
-                                    "text": "No, Cancel"
-                                },
-                                "style": "danger"
-                            }
-                        }
-                    ]
-                }
-            ]
-            
-            # Send confirmation to user
-            user_blocks = notification_blocks[:-1]  # Remove action buttons for user notification
-            user_blocks.append({
-                "type": "context",
-                "elements": [
-                    {
-                        "type": "mrkdwn",
-                        "text": ":information_source: Your request has been submitted and is pending approval."
-                    }
-                ]
+            leave_type = leave_request.leave_type
+            leave_type_display = leave_request.leave_type_display
+            start_date = leave_request.start_date
+            end_date = leave_request.end_date
+            coverage_person = leave_request.coverage_person
+            tasks = leave_request.tasks
+            reason = leave_request.reason
+
+            logger.info(f"Processing leave request for user {user_id} of type {leave_type_display}")
+            self._remember_defaults(leave_request)
+
+            token = self._sign({
+                "request_id": request_id,
+                "requester_id": user_id,
+                "approver_id": self._approver_for(user_id),
+                "leave_type": leave_type_display,
+                "start_date": start_date,
+                "end_date": end_date
             })
             
-            try:
-                self.client.chat_postMessage(
-                    channel=user.get("id"),
+            details = {
+                "user_id": user_id,
+                "leave_type_display": leave_type_display,
+                "start_date": start_date,
+                "end_date": end_date,
+                "coverage_person": coverage_person,
+                "tasks": tasks,
+                "reason": reason
+            }
+            # Notification with approval/rejection buttons, and the requester's copy without them
+            notification_blocks = APPROVER_NOTIFICATION.render(
+                approve_value=token or request_id or json.dumps({
+                    "request_id": f"{user_id}_{start_date}_{leave_type}",
+                    "action": "approve"
+                }),
+                reject_value=token or request_id or json.dumps({
+                    "request_id": f"{user_id}_{start_date}_{leave_type}",
+                    "action": "reject"
+                }),
+                **details
+            )
+            # With an outbox (or neither outbox nor executor) this runs before the ack, so
+            # only a cached profile is used; the lookup then warms the cache for next time
+            requester_context = create_requester_context_block(
+                user_id, self.profiles, wait=self.outbox is None and self.executor is not None)
+            if requester_context is not None:
+                notification_blocks.insert(1, requester_context)
+            user_blocks = REQUESTER_CONFIRMATION.render(**details)
+
+            calls = {
+                "confirmation": partial(self._deliver, "chat_postMessage",
+                    channel=user_id,
                     text=f"Your {leave_type_display} request has been submitted",
                     blocks=user_blocks
                 )
-                logger.info(f"Sent confirmation to user {user.get('id')}")
-            except SlackApiError as e:
-                logger.error(f"Failed to send confirmation to user: {str(e)}")
-                raise
-            
+            }
+
             # Check if user is department head
-            user_id = user.get("id")
             logger.info(f"Checking if user {user_id} is department head")
-            
+            hr_channel_id = get_hr_channel_id()
+
             if is_department_head(user_id):
-                logger.info(f"User {user_id} is department head, sending to HR channel {HR_CHANNEL_ID}")
+                logger.info(f"User {user_id} is department head, sending to HR channel {hr_channel_id}")
                 # If user is department head, send directly to HR
-                if HR_CHANNEL_ID:
-                    try:
-                        self.client.chat_postMessage(
-                            channel=HR_CHANNEL_ID,
-                            text=f"New {leave_type_display} request from Department Head <@{user_id}>",
-                            blocks=notification_blocks
-                        )
-                        logger.info(f"Successfully sent request to HR channel {HR_CHANNEL_ID}")
-                    except SlackApiError as e:
-                        logger.error(f"Failed to send to HR channel: {str(e)}")
-                        # Don't raise here - we've already confirmed to the user
+                if hr_channel_id:
+                    calls["hr_channel"] = partial(self._deliver, "chat_postMessage",
+                        channel=hr_channel_id,
+                        text=f"New {leave_type_display} request from Department Head <@{user_id}>",
+                        blocks=notification_blocks
+                    )
                 else:
                     logger.error("HR_CHANNEL_ID not configured")
             else:
@@ -697,38 +738,46 @@ class SlackActionsHandler:
                 dept_head = get_department_head(user_id)
                 if dept_head:
                     logger.info(f"Sending request to department head {dept_head}")
-                    try:
-                        self.client.chat_postMessage(
-                            channel=dept_head,
-                            text=f"New {leave_type_display} request from <@{user_id}>",
-                            blocks=notification_blocks
-                        )
-                        logger.info(f"Successfully sent request to department head {dept_head}")
-                    except SlackApiError as e:
-                        logger.error(f"Failed to send to department head: {str(e)}")
-                        # Don't raise here - we've already confirmed to the user
+                    calls["department_head"] = partial(self._deliver, "chat_postMessage",
+                        channel=dept_head,
+                        text=f"New {leave_type_display} request from <@{user_id}>",
+                        blocks=notification_blocks
+                    )
                 else:
                     logger.info(f"No department head found for user {user_id}, sending to HR")
-                    if HR_CHANNEL_ID:
-                        try:
-                            self.client.chat_postMessage(
-                                channel=HR_CHANNEL_ID,
-                                text=f"New {leave_type_display} request from <@{user_id}> (No department head found)",
-                                blocks=notification_blocks
-                            )
-                            logger.info(f"Successfully sent request to HR channel {HR_CHANNEL_ID}")
-                        except SlackApiError as e:
-                            logger.error(f"Failed to send to HR channel: {str(e)}")
-                            # Don't raise here - we've already confirmed to the user
+                    if hr_channel_id:
+                        calls["hr_channel"] = partial(self._deliver, "chat_postMessage",
+                            channel=hr_channel_id,
+                            text=f"New {leave_type_display} request from <@{user_id}> (No department head found)",
+                            blocks=notification_blocks
+                        )
                     else:
                         logger.error("HR_CHANNEL_ID not configured")
-                
+
+            # The confirmation and the approver notification do not depend on each other
+            results = self._gather(calls)
+
+            for name, result in results.items():
+                if name == "confirmation":
+                    continue
+                if result.ok:
+                    logger.info(f"Successfully sent request via {name}")
+                else:
+                    logger.error(f"Failed to send request via {name}: {str(result.error)}")
+                    # Don't raise here - the confirmation is reported separately
+
+            confirmation = results["confirmation"]
+            if not confirmation.ok:
+                logger.error(f"Failed to send confirmation to user: {str(confirmation.error)}")
+                raise confirmation.error
+            logger.info(f"Sent confirmation to user {user_id}")
+
         except Exception as e:
             logger.error(f"Error processing leave request: {str(e)}", exc_info=True)
             # Try to notify user of error
             try:
                 self.client.chat_postMessage(
-                    channel=user.get("id"),
+                    channel=user_id,
                     text="There was an error processing your leave request. Please contact HR or try again."
                 )
             except:
@@ -736,10 +785,7 @@ class SlackActionsHandler:
 
     def _queue_rejection_processing(self, payload: Dict[str, Any]) -> None:
         """Queue rejection processing to be handled asynchronously."""
-        import threading
-        thread = threading.Thread(target=self._process_rejection, args=(payload,))
-        thread.daemon = True
-        thread.start()
+        self._submit(self._process_rejection, payload)
 
     def _process_rejection(self, payload: Dict[str, Any]) -> None:
         """Process rejection in background."""
@@ -752,9 +798,9 @@ class SlackActionsHandler:
             try:
                 metadata_str = view.get("private_metadata", "{}")
                 logger.info(f"Processing rejection with metadata string: {metadata_str}")
-                metadata = json.loads(metadata_str)
+                metadata = self._load_metadata(metadata_str)
                 logger.info(f"Decoded metadata: {json.dumps(metadata)}")
-            except json.JSONDecodeError as e:
+            except ValueError as e:
                 logger.error(f"Failed to decode private metadata: {str(e)}")
                 raise ValueError("Invalid metadata format")
             
@@ -777,61 +823,38 @@ class SlackActionsHandler:
             
             logger.info(f"Processing rejection for user {requester_id} in channel {channel_id}")
             
-            # Update original message
-            try:
-                update_response = self.client.chat_update(
+            fields = {
+                "requester_id": requester_id,
+                "leave_type": leave_type,
+                "start_date": start_date,
+                "end_date": end_date,
+                "denial_reason": denial_reason
+            }
+
+            # Update the original message and notify the requester concurrently
+            results = self._gather({
+                "chat_update": partial(self._deliver, "chat_update",
                     channel=channel_id,
                     ts=message_ts,
                     text=f"Leave request from <@{requester_id}> was rejected",
-                    blocks=[
-                        {
-                            "type": "section",
-                            "text": {
-                                "type": "mrkdwn",
-                                "text": f":x: Leave request from <@{requester_id}> was rejected\n*Reason:* {denial_reason}"
-                            }
-                        },
-                        {
-                            "type": "section",
-                            "fields": [
-                                {"type": "mrkdwn", "text": f"*Type:*\n{leave_type}"},
-                                {"type": "mrkdwn", "text": f"*Duration:*\n{start_date} to {end_date}"}
-                            ]
-                        }
-                    ]
-                )
-                logger.info(f"Successfully updated original message: {json.dumps(update_response)}")
-            except SlackApiError as e:
-                logger.error(f"Failed to update original message: {str(e)}")
-                # Continue to notify user even if update fails
-            
-            # Notify requester with a single message attempt, similar to approval flow
-            try:
-                self.client.chat_postMessage(
+                    blocks=REJECTION_UPDATE.render(**fields)
+                ),
+                "requester_dm": partial(self._deliver, "chat_postMessage",
                     channel=requester_id,
                     text=f"Your {leave_type} request was rejected",
-                    blocks=[
-                        {
-                            "type": "section",
-                            "text": {
-                                "type": "mrkdwn",
-                                "text": f":x: Your {leave_type} request was rejected\n*Reason:* {denial_reason}"
-                            }
-                        },
-                        {
-                            "type": "section",
-                            "fields": [
-                                {"type": "mrkdwn", "text": f"*Type:*\n{leave_type}"},
-                                {"type": "mrkdwn", "text": f"*Duration:*\n{start_date} to {end_date}"}
-                            ]
-                        }
-                    ]
+                    blocks=REJECTION_DM.render(**fields)
                 )
+            })
+
+            if results["chat_update"].ok:
+                logger.info("Successfully updated original message")
+            else:
+                logger.error(f"Failed to update original message: {str(results['chat_update'].error)}")
+            if results["requester_dm"].ok:
                 logger.info(f"Successfully sent rejection notification to user {requester_id}")
-            except SlackApiError as e:
-                logger.error(f"Failed to send rejection notification to user {requester_id}: {str(e)}")
-                # Don't raise here - we've already updated the original message
-            
+            else:
+                logger.error(f"Failed to send rejection notification to user {requester_id}: {str(results['requester_dm'].error)}")
+
         except Exception as e:
             error_msg = str(e)
             logger.error(f"Error processing rejection: {error_msg}", exc_info=True)
@@ -846,98 +869,62 @@ class SlackActionsHandler:
                 except Exception as notify_error:
                     logger.error(f"Failed to send error notification to user: {str(notify_error)}", exc_info=True)
 
-    def _is_authorized(self, user_id: str, requester_id: str) -> bool:
-        """Check if user is authorized to approve/reject the request."""
-        # Admin users can approve/reject any request
-        if user_id in load_admin_users():
-            return True
-
-        # Department heads can approve/reject requests from their team members
-        if is_department_head(user_id):
+    def _is_authorized(self, user_id: str, requester_id: str, approver_id: Optional[str] = None) -> bool:
+        """Check if user is authorized to approve/reject the request.
+
+        approver_id is the approver signed into an action token: besides admins,
+        only that department head or one of their delegates may act on it.
+        """
+        directory = get_directory()
+        # Admins decide any request; heads (and their delegates) only their own team's
+        if not directory.can_decide(user_id, requester_id):
+            return False
+        if approver_id is None or approver_id == user_id or user_id in directory.admins:
             return True
-
-        return False
+        if approver_id in directory.heads:
+            return approver_id in directory.delegations.get(user_id, ())
+        # Routed to the HR channel, where the scope check above decides
+        return True
 
     def _extract_request_details(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Extract request details from message blocks."""
+        """Extract request details from the blocks of a notification posted without a request ID."""
         try:
-            logger.info(f"Extracting request details from message: {json.dumps(message)}")
-            
-            # Get channel ID from container or message
-            channel_id = message.get("channel_id")  # Try direct channel_id first
-            if not channel_id:
-                # Try container path from the payload
-                container = message.get("container", {})
-                channel_id = container.get("channel_id")
-                logger.info(f"Found channel_id from container: {channel_id}")
-            
-            if not channel_id:
-                logger.error("Could not find channel_id in message or container")
-                return None
-
-            # Get message timestamp
-            message_ts = message.get("ts")  # Try direct ts first
-            if not message_ts:
-                # Try container path
-                container = message.get("container", {})
-                message_ts = container.get("message_ts")
-                logger.info(f"Found message_ts from container: {message_ts}")
-
-            if not message_ts:
-                logger.error("Could not find message_ts in message or container")
-                return None
-
-            # Extract fields from blocks
-            blocks = message.get("blocks", [])
-            if not blocks:
-                logger.error("No blocks found in message")
+            container = message.get("container", {})
+            channel_id = message.get("channel_id") or container.get("channel_id")
+            message_ts = message.get("ts") or container.get("message_ts")
+            if not channel_id or not message_ts:
+                logger.error(f"Could not find the message location: channel_id={channel_id}, message_ts={message_ts}")
                 return None
 
-            # First block should contain the requester, type, duration, and coverage
-            first_block = next((b for b in blocks if b.get("type") == "section" and b.get("fields")), None)
-            if not first_block:
-                logger.error("Could not find section block with fields")
-                return None
-
-            fields = first_block.get("fields", [])
-            logger.info(f"Found fields in first block: {json.dumps(fields)}")
-            
-            if len(fields) < 4:  # We expect 4 fields (requester, type, duration, coverage)
-                logger.error(f"Not enough fields in block: {json.dumps(fields)}")
-                return None
-
-            # Extract requester ID from the first field
-            requester_text = fields[0].get("text", "")
-            requester_match = re.search(r"<@([^>]+)>", requester_text)
+            # Fields are "*Label:*\nvalue"; index them by label so the layout and order don't matter
+            fields: Dict[str, str] = {}
+            for block in message.get("blocks", []):
+                if block.get("type") != "section":
+                    continue
+                for field in block.get("fields", []):
+                    label, separator, value = field.get("text", "").partition(":*\n")
+                    if separator:
+                        fields[label.lstrip("*")] = value
+
+            requester_match = re.search(r"<@([^>]+)>", fields.get("Requester", ""))
             if not requester_match:
-                logger.error(f"Could not extract requester ID from text: {requester_text}")
+                logger.error("Could not find the requester in the message blocks")
                 return None
-            
-            requester_id = requester_match.group(1)
-            logger.info(f"Extracted requester_id: {requester_id}")
-
-            # Extract leave type from the second field
-            leave_type_text = fields[1].get("text", "")
-            leave_type = leave_type_text.split("*Type:*\n")[-1] if "*Type:*\n" in leave_type_text else ""
-            logger.info(f"Extracted leave_type: {leave_type}")
 
-            # Extract duration from the third field
-            duration_text = fields[2].get("text", "")
-            duration = duration_text.split("*Duration:*\n")[-1] if "*Duration:*\n" in duration_text else ""
-            start_date, end_date = duration.split(" to ") if " to " in duration else (duration, duration)
-            logger.info(f"Extracted duration - start_date: {start_date}, end_date: {end_date}")
+            if "Duration" in fields:
+                start_date, _, end_date = fields["Duration"].partition(" to ")
+            else:
+                start_date = fields.get("Start Date", "")
+                end_date = fields.get("End Date", "")
 
-            details = {
-                "requester_id": requester_id,
+            return {
+                "requester_id": requester_match.group(1),
                 "channel_id": channel_id,
                 "message_ts": message_ts,
-                "leave_type": leave_type,
+                "leave_type": fields.get("Type", ""),
                 "start_date": start_date,
-                "end_date": end_date
+                "end_date": end_date or start_date
             }
-            
-            logger.info(f"Successfully extracted request details: {json.dumps(details)}")
-            return details
 
         except Exception as e:
             logger.error(f"Error extracting request details: {str(e)}", exc_info=True)
@@ -945,10 +932,7 @@ class SlackActionsHandler:
 
     def _queue_approval_processing(self, payload: Dict[str, Any], request_details: Dict[str, Any]) -> None:
         """Queue approval processing to be handled asynchronously."""
-        import threading
-        thread = threading.Thread(target=self._handle_approval, args=(payload, request_details))
-        thread.daemon = True
-        thread.start()
+        self._submit(self._handle_approval, payload, request_details)
 
     def _handle_approval(self, payload: Dict[str, Any], request_details: Dict[str, Any]) -> bool:
         """Handle leave request approval."""
@@ -970,60 +954,37 @@ class SlackActionsHandler:
                 }.items() if not value]
                 raise ValueError(f"Missing required fields for approval: {', '.join(missing_fields)}")
 
-            # First, update the original message to remove buttons and show approval
-            try:
-                self.client.chat_update(
+            fields = {
+                "requester_id": requester_id,
+                "approver_id": user_id,
+                "leave_type": leave_type,
+                "start_date": request_details.get("start_date")
+            }
+
+            # Update the original message to remove buttons and confirm to the requester concurrently
+            results = self._gather({
+                "chat_update": partial(self._deliver, "chat_update",
                     channel=channel_id,
                     ts=message_ts,
                     text=f"Leave request from <@{requester_id}> was approved",
-                    blocks=[
-                        {
-                            "type": "section",
-                            "text": {
-                                "type": "mrkdwn",
-                                "text": f":white_check_mark: Leave request from <@{requester_id}> was approved by <@{user_id}>"
-                            }
-                        },
-                        {
-                            "type": "section",
-                            "fields": [
-                                {"type": "mrkdwn", "text": f"*Type:*\n{leave_type}"},
-                                {"type": "mrkdwn", "text": f"*Start Date:*\n{request_details.get('start_date')}"}
-                            ]
-                        }
-                    ]
-                )
-                logger.info("Successfully updated original message")
-            except SlackApiError as e:
-                logger.error(f"Failed to update original message: {str(e.response)}")
-                return False
-
-            # Then, send a confirmation to the requester
-            try:
-                self.client.chat_postMessage(
+                    blocks=APPROVAL_UPDATE.render(**fields)
+                ),
+                "requester_dm": partial(self._deliver, "chat_postMessage",
                     channel=requester_id,
                     text=f"Your {leave_type} request was approved by <@{user_id}>",
-                    blocks=[
-                        {
-                            "type": "section",
-                            "text": {
-                                "type": "mrkdwn",
-                                "text": f":white_check_mark: Your {leave_type} request was approved by <@{user_id}>"
-                            }
-                        },
-                        {
-                            "type": "section",
-                            "fields": [
-                                {"type": "mrkdwn", "text": f"*Type:*\n{leave_type}"},
-                                {"type": "mrkdwn", "text": f"*Start Date:*\n{request_details.get('start_date')}"}
-                            ]
-                        }
-                    ]
+                    blocks=APPROVAL_DM.render(**fields)
                 )
+            })
+
+            if results["requester_dm"].ok:
                 logger.info(f"Successfully sent approval notification to user {requester_id}")
-            except SlackApiError as e:
-                logger.error(f"Failed to send notification to requester: {str(e.response)}")
-                # Don't return False here - we've already updated the original message
+            else:
+                logger.error(f"Failed to send notification to requester: {str(results['requester_dm'].error)}")
+
+            if not results["chat_update"].ok:
+                logger.error(f"Failed to update original message: {str(results['chat_update'].error)}")
+                return False
+            logger.info("Successfully updated original message")
 
             return True
 
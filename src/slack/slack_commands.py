@@ -1,21 +1,129 @@
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, Optional
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from pathlib import Path
-import json
 import logging
-from datetime import datetime
-from src.config.organization import is_department_head, get_department_head, HR_CHANNEL_ID, get_department_name
-from src.slack.helpers import format_date_for_display, create_admin_notification_blocks, create_user_notification_blocks
+from src.config.organization import is_department_head, get_department_head, get_hr_channel_id, get_department_name
+from src.slack.command_parser import parse_command_text
+from src.slack.layouts import COMMAND_NOTIFICATION
+from src.slack.modal_templates import CachedModal
+from src.slack.models import LeaveRequest, parse_leave_request
+from src.slack.helpers import format_date_for_display, create_admin_notification_blocks, create_user_notification_blocks, create_reopen_prompt_blocks
+from src.slack.scheduler import is_trigger_expired
+from src.slack.validation import LeaveFormValidator, with_validation_blocks
+from src.storage.leave_defaults import LeaveDefaultsStore
 
 logger = logging.getLogger(__name__)
 
+MODAL_TEMPLATE_PATH = Path(__file__).parent / 'templates' / 'leave_request_modal.json'
+
+# Used until templates/leave_request_modal.json exists; date pickers default to today
+DEFAULT_LEAVE_MODAL = {
+    "type": "modal",
+    "callback_id": "leave_request_modal",
+    "title": {"type": "plain_text", "text": "Submit Leave Request", "emoji": True},
+    "submit": {"type": "plain_text", "text": "Submit", "emoji": True},
+    "close": {"type": "plain_text", "text": "Cancel", "emoji": True},
+    "blocks": [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": ":calendar: Leave Request Details",
+                "emoji": True
+            }
+        },
+        {
+            "type": "input",
+            "block_id": "leave_type_block",
+            "element": {
+                "type": "static_select",
+                "action_id": "leave_type",
+                "placeholder": {"type": "plain_text", "text": "Select leave type", "emoji": True},
+                "options": [
+                    {"text": {"type": "plain_text", "text": "PTO", "emoji": True}, "value": "pto"},
+                    {"text": {"type": "plain_text", "text": "Sick/Emergency", "emoji": True}, "value": "sick_emergency"},
+                    {"text": {"type": "plain_text", "text": "Holiday", "emoji": True}, "value": "holiday"},
+                    {"text": {"type": "plain_text", "text": "Offset", "emoji": True}, "value": "offset"}
+                ]
+            },
+            "label": {"type": "plain_text", "text": "Leave Type", "emoji": True}
+        },
+        {
+            "type": "input",
+            "block_id": "date_block",
+            "dispatch_action": True,
+            "element": {
+                "type": "datepicker",
+                "action_id": "start_date",
+                "placeholder": {"type": "plain_text", "text": "Select start date", "emoji": True}
+            },
+            "label": {"type": "plain_text", "text": "Start Date", "emoji": True}
+        },
+        {
+            "type": "input",
+            "block_id": "end_date_block",
+            "dispatch_action": True,
+            "element": {
+                "type": "datepicker",
+                "action_id": "end_date",
+                "placeholder": {"type": "plain_text", "text": "Select end date", "emoji": True}
+            },
+            "label": {"type": "plain_text", "text": "End Date", "emoji": True}
+        },
+        {
+            "type": "input",
+            "block_id": "coverage_block",
+            "dispatch_action": True,
+            "element": {
+                "type": "users_select",
+                "action_id": "coverage_person",
+                "placeholder": {"type": "plain_text", "text": "Select a person", "emoji": True}
+            },
+            "label": {"type": "plain_text", "text": "Who will cover for you?", "emoji": True}
+        },
+        {
+            "type": "input",
+            "block_id": "tasks_block",
+            "element": {
+                "type": "plain_text_input",
+                "action_id": "tasks",
+                "multiline": True,
+                "placeholder": {"type": "plain_text", "text": "List your tasks", "emoji": True}
+            },
+            "label": {"type": "plain_text", "text": "Tasks to be covered", "emoji": True}
+        },
+        {
+            "type": "input",
+            "block_id": "reason_block",
+            "element": {
+                "type": "plain_text_input",
+                "action_id": "reason",
+                "placeholder": {"type": "plain_text", "text": "Enter your reason", "emoji": True}
+            },
+            "label": {"type": "plain_text", "text": "Reason for leave", "emoji": True}
+        }
+    ]
+}
+
+
 class SlackCommandsHandler:
     """Handler for Slack slash commands."""
 
-    def __init__(self, client: WebClient):
+    def __init__(self, client: WebClient, leave_modal: Optional[CachedModal] = None,
+                 defaults: Optional[LeaveDefaultsStore] = None,
+                 submit: Optional[Callable[[LeaveRequest], Any]] = None,
+                 validator: Optional[LeaveFormValidator] = None):
         """Initialize with Slack client."""
         self.client = client
+        # Parsed once here rather than on every command
+        self.leave_modal = leave_modal or CachedModal(MODAL_TEMPLATE_PATH, DEFAULT_LEAVE_MODAL)
+        # Prefills the form from the user's previous requests when set
+        self.defaults = defaults
+        # Submits a request typed as command text (SlackActionsHandler.submit_leave_request)
+        self.submit = submit
+        # Requests typed as text get the same checks as the form
+        self.validator = validator or LeaveFormValidator()
 
     def handle_command(self, payload):
         """Handle slash commands."""
@@ -88,10 +196,53 @@ class SlackCommandsHandler:
                     }]
                 }
 
-            # Open modal
+            initial_values = dict(self._defaults_for(payload["user_id"]))
+            errors: Dict[str, str] = {}
+            text = (payload.get("text") or "").strip()
+            if text and self.submit is not None:
+                try:
+                    initial_values.update(parse_command_text(text))
+                except ValueError as e:
+                    return {
+                        "ok": False,
+                        "error": str(e),
+                        "response_type": "ephemeral",
+                        "text": str(e),
+                        "blocks": [{
+                            "type": "section",
+                            "text": {"type": "mrkdwn", "text": f":warning: {e}"}
+                        }]
+                    }
+                # The same checks as the form; a request that fails them opens the form instead
+                errors = self.validator.validate(payload["user_id"], initial_values.get("start_date"),
+                                                 initial_values.get("end_date"), initial_values.get("coverage_person"),
+                                                 fresh=True)
+                leave_request = self._leave_request_from_text(payload["user_id"], initial_values)
+                if leave_request is not None and not errors:
+                    # Everything is in the text: submit without opening the form
+                    self.submit(leave_request)
+                    return {
+                        "ok": True,
+                        "response_type": "ephemeral",
+                        "text": "Your leave request has been submitted",
+                        "blocks": [{
+                            "type": "section",
+                            "text": {
+                                "type": "mrkdwn",
+                                "text": f":white_check_mark: Your {leave_request.leave_type_display} request for "
+                                        f"{leave_request.start_date} to {leave_request.end_date} has been submitted."
+                            }
+                        }]
+                    }
+
+            # Open modal, with whatever the text did give already filled in
+            # and a warning under each input the text got wrong
+            view = self.leave_modal.view(initial_values=initial_values)
+            if errors:
+                view = dict(view, blocks=with_validation_blocks(view["blocks"], errors))
             self.client.views_open(
                 trigger_id=payload["trigger_id"],
-                view=self._load_modal_template()
+                view=view
             )
 
             return {
@@ -108,6 +259,10 @@ class SlackCommandsHandler:
             }
 
         except SlackApiError as e:
+            if is_trigger_expired(e):
+                # Too late to open the modal from this command; let the user retry with a fresh trigger
+                logger.warning(f"Trigger expired opening leave request form for {payload.get('user_id')}")
+                return self._reopen_prompt()
             logger.error(f"Slack API error: {e.response['error']}")
             return {
                 "ok": False,
@@ -138,101 +293,67 @@ class SlackCommandsHandler:
                 }]
             }
 
-    def _load_modal_template(self):
-        """Load the modal template from file."""
+    def reopen_leave_request_form(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Open the leave request form from the re-open button of an expired command."""
         try:
-            template_path = Path(__file__).parent / 'templates' / 'leave_request_modal.json'
-            with open(template_path, 'r') as f:
-                modal = json.load(f)
-                return modal
-        except FileNotFoundError:
-            # Fallback to default template with updated Block Kit features
-            return {
-                "type": "modal",
-                "callback_id": "leave_request_modal",
-                "title": {"type": "plain_text", "text": "Submit Leave Request", "emoji": True},
-                "submit": {"type": "plain_text", "text": "Submit", "emoji": True},
-                "close": {"type": "plain_text", "text": "Cancel", "emoji": True},
-                "blocks": [
-                    {
-                        "type": "header",
-                        "text": {
-                            "type": "plain_text",
-                            "text": ":calendar: Leave Request Details",
-                            "emoji": True
-                        }
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "leave_type_block",
-                        "element": {
-                            "type": "static_select",
-                            "action_id": "leave_type",
-                            "placeholder": {"type": "plain_text", "text": "Select leave type", "emoji": True},
-                            "options": [
-                                {"text": {"type": "plain_text", "text": "PTO", "emoji": True}, "value": "pto"},
-                                {"text": {"type": "plain_text", "text": "Sick/Emergency", "emoji": True}, "value": "sick_emergency"},
-                                {"text": {"type": "plain_text", "text": "Holiday", "emoji": True}, "value": "holiday"},
-                                {"text": {"type": "plain_text", "text": "Offset", "emoji": True}, "value": "offset"}
-                            ]
-                        },
-                        "label": {"type": "plain_text", "text": "Leave Type", "emoji": True}
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "date_block",
-                        "element": {
-                            "type": "datepicker",
-                            "action_id": "start_date",
-                            "placeholder": {"type": "plain_text", "text": "Select start date", "emoji": True},
-                            "initial_date": datetime.now().strftime("%Y-%m-%d")
-                        },
-                        "label": {"type": "plain_text", "text": "Start Date", "emoji": True}
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "end_date_block",
-                        "element": {
-                            "type": "datepicker",
-                            "action_id": "end_date",
-                            "placeholder": {"type": "plain_text", "text": "Select end date", "emoji": True},
-                            "initial_date": datetime.now().strftime("%Y-%m-%d")
-                        },
-                        "label": {"type": "plain_text", "text": "End Date", "emoji": True}
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "coverage_block",
-                        "element": {
-                            "type": "users_select",
-                            "action_id": "coverage_person",
-                            "placeholder": {"type": "plain_text", "text": "Select a person", "emoji": True}
-                        },
-                        "label": {"type": "plain_text", "text": "Who will cover for you?", "emoji": True}
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "tasks_block",
-                        "element": {
-                            "type": "plain_text_input",
-                            "action_id": "tasks",
-                            "multiline": True,
-                            "placeholder": {"type": "plain_text", "text": "List your tasks", "emoji": True}
-                        },
-                        "label": {"type": "plain_text", "text": "Tasks to be covered", "emoji": True}
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "reason_block",
-                        "element": {
-                            "type": "plain_text_input",
-                            "action_id": "reason",
-                            "placeholder": {"type": "plain_text", "text": "Enter your reason", "emoji": True}
-                        },
-                        "label": {"type": "plain_text", "text": "Reason for leave", "emoji": True}
-                    }
-                ]
-            }
+            self.client.views_open(
+                trigger_id=payload["trigger_id"],
+                view=self._load_modal_template(payload.get("user", {}).get("id"))
+            )
+            return {}
+        except SlackApiError as e:
+            # The prompt with the button stays visible, so the user can simply click again
+            logger.error(f"Failed to re-open leave request form: {e.response['error']}")
+            return {}
+
+    def _reopen_prompt(self) -> Dict[str, Any]:
+        """Ephemeral reply with a button that opens the leave request form again."""
+        return {
+            "ok": True,
+            "response_type": "ephemeral",
+            "text": "The leave request form took too long to open",
+            "blocks": create_reopen_prompt_blocks(
+                ":hourglass: The leave request form took too long to open. Click below to try again.",
+                "Open leave request form",
+                "reopen_leave_request_form"
+            )
+        }
+
+    def _load_modal_template(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """The leave request modal, served from the in-memory cache and prefilled for the user."""
+        return self.leave_modal.view(initial_values=self._defaults_for(user_id))
+
+    @staticmethod
+    def _leave_request_from_text(user_id: str, fields: Dict[str, Any]) -> Optional[LeaveRequest]:
+        """A request from command text and defaults, or None if the form is still needed.
+
+        The leave type and dates must come from the text; coverage and tasks may
+        come from the user's defaults, and the reason defaults to the leave type.
+        """
+        if "leave_type_display" not in fields or "start_date" not in fields:
+            return None
+        if not fields.get("coverage_person") or not fields.get("tasks"):
+            return None
+        return LeaveRequest(
+            user_id=user_id,
+            leave_type=fields["leave_type"],
+            leave_type_display=fields["leave_type_display"],
+            start_date=fields["start_date"],
+            end_date=fields["end_date"],
+            coverage_person=fields["coverage_person"],
+            tasks=fields["tasks"],
+            reason=fields.get("reason") or fields["leave_type_display"]
+        )
+
+    def _defaults_for(self, user_id: Optional[str]) -> Dict[str, Any]:
+        """The user's form defaults; an empty form if they cannot be read."""
+        if self.defaults is None or not user_id:
+            return {}
+        try:
+            return self.defaults.get(user_id)
+        except Exception as e:
+            logger.error(f"Failed to load form defaults for {user_id}: {str(e)}")
+            return {}
 
     def handle_modal_submission(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Handle modal submission for leave request."""
@@ -250,121 +371,32 @@ class SlackCommandsHandler:
                     }
                 }
 
-            # Extract form values
-            values = payload.get("view", {}).get("state", {}).get("values", {})
-            
-            # Extract leave type
-            leave_type_block = values.get("leave_type_block", {})
-            leave_type_option = leave_type_block.get("leave_type", {}).get("selected_option", {})
-            leave_type = leave_type_option.get("value")
-            leave_type_display = leave_type_option.get("text", {}).get("text", leave_type)
-            
-            if not leave_type:
-                return {
-                    "response_action": "errors",
-                    "errors": {
-                        "leave_type_block": "Please select a leave type"
-                    }
-                }
-
-            # Extract dates
-            date_block = values.get("date_block", {})
-            start_date = date_block.get("start_date", {}).get("selected_date")
-            if not start_date:
-                return {
-                    "response_action": "errors",
-                    "errors": {
-                        "date_block": "Please select a start date"
-                    }
-                }
-
-            # Extract coverage person
-            coverage_block = values.get("coverage_block", {})
-            coverage_person = coverage_block.get("coverage_person", {}).get("selected_user")
-            if not coverage_person:
+            # The command's form has no required end date
+            leave_request = parse_leave_request(
+                user_id,
+                payload.get("view", {}).get("state", {}).get("values", {}),
+                require_end_date=False
+            )
+            if not isinstance(leave_request, LeaveRequest):
                 return {
                     "response_action": "errors",
-                    "errors": {
-                        "coverage_block": "Please select who will cover for you"
-                    }
+                    "errors": leave_request
                 }
 
-            # Extract tasks and reason
-            tasks = values.get("tasks_block", {}).get("tasks", {}).get("value")
-            reason = values.get("reason_block", {}).get("reason", {}).get("value")
-            if not tasks or not reason:
-                errors = {}
-                if not tasks:
-                    errors["tasks_block"] = "Please list tasks to be covered"
-                if not reason:
-                    errors["reason_block"] = "Please provide a reason"
-                return {
-                    "response_action": "errors",
-                    "errors": errors
-                }
+            if self.defaults is not None:
+                try:
+                    self.defaults.record(leave_request)
+                except Exception as e:
+                    logger.error(f"Failed to update form defaults for {user_id}: {str(e)}")
 
-            # Create notification blocks
-            notification_blocks = [
-                {
-                    "type": "section",
-                    "fields": [
-                        {
-                            "type": "mrkdwn",
-                            "text": f"*Requester:*\n<@{user_id}>"
-                        },
-                        {
-                            "type": "mrkdwn",
-                            "text": f"*Type:*\n{leave_type_display}"
-                        },
-                        {
-                            "type": "mrkdwn",
-                            "text": f"*Date:*\n{start_date}"
-                        },
-                        {
-                            "type": "mrkdwn",
-                            "text": f"*Coverage:*\n<@{coverage_person}>"
-                        }
-                    ]
-                },
-                {
-                    "type": "section",
-                    "fields": [
-                        {
-                            "type": "mrkdwn",
-                            "text": f"*Tasks:*\n{tasks}"
-                        },
-                        {
-                            "type": "mrkdwn",
-                            "text": f"*Reason:*\n{reason}"
-                        }
-                    ]
-                },
-                {
-                    "type": "actions",
-                    "elements": [
-                        {
-                            "type": "button",
-                            "text": {
-                                "type": "plain_text",
-                                "text": "Approve",
-                                "emoji": True
-                            },
-                            "style": "primary",
-                            "action_id": "approve_leave"
-                        },
-                        {
-                            "type": "button",
-                            "text": {
-                                "type": "plain_text",
-                                "text": "Reject",
-                                "emoji": True
-                            },
-                            "style": "danger",
-                            "action_id": "reject_leave"
-                        }
-                    ]
-                }
-            ]
+            notification_blocks = COMMAND_NOTIFICATION.render(
+                user_id=user_id,
+                leave_type_display=leave_request.leave_type_display,
+                start_date=leave_request.start_date,
+                coverage_person=leave_request.coverage_person,
+                tasks=leave_request.tasks,
+                reason=leave_request.reason
+            )
 
             # Send notification to user
             self.client.chat_postMessage(
@@ -392,23 +424,3 @@ class SlackCommandsHandler:
                     "submission": f"Error: {str(e)}"
                 }
             }
-
-    def _get_workspace_users(self) -> List[Dict[str, Any]]:
-        """Get a list of users in the workspace for the dropdown."""
-        try:
-            response = self.client.users_list()
-            if response["ok"]:
-                # Filter out bots and inactive users
-                users = [
-                    {
-                        "text": {"type": "plain_text", "text": user.get("real_name", user["name"]), "emoji": True},
-                        "value": user["id"]
-                    }
-                    for user in response["members"]
-                    if not user.get("is_bot", False) and not user.get("deleted", False)
-                ]
-                return users
-            return []
-        except SlackApiError as e:
-            logger.error(f"Error fetching workspace users: {e}")
-            return [] 
\ No newline at end of file
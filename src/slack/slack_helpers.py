@@ -4,66 +4,24 @@ Helper functions for creating Slack message blocks and views.
 from typing import Dict, Any, List
 from datetime import datetime
 import logging
-import json
+
+from src.slack.layouts import ADMIN_NOTIFICATION
+from src.slack.metadata import encode_metadata
 
 logger = logging.getLogger(__name__)
 
 def create_admin_notification_blocks(user_id: str, leave_type: str, start_date: str,
                                   end_date: str, coverage_person: str, tasks: str, reason: str, **kwargs) -> List[Dict[str, Any]]:
     """Create notification blocks for admin/department head."""
-    return [
-        {
-            "type": "header",
-            "text": {
-                "type": "plain_text",
-                "text": ":memo: New Leave Request",
-                "emoji": True
-            }
-        },
-        {
-            "type": "section",
-            "fields": [
-                {"type": "mrkdwn", "text": f"*Requester:*\n<@{user_id}>"},
-                {"type": "mrkdwn", "text": f"*Type:*\n{leave_type}"},
-                {"type": "mrkdwn", "text": f"*Start Date:*\n{format_date_for_display(start_date)}"},
-                {"type": "mrkdwn", "text": f"*End Date:*\n{format_date_for_display(end_date)}"},
-                {"type": "mrkdwn", "text": f"*Coverage:*\n<@{coverage_person}>"},
-                {"type": "mrkdwn", "text": f"*Tasks:*\n{tasks}"}
-            ]
-        },
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": f"*Reason:*\n{reason}"
-            }
-        },
-        {
-            "type": "actions",
-            "elements": [
-                {
-                    "type": "button",
-                    "text": {
-                        "type": "plain_text",
-                        "text": "Approve",
-                        "emoji": True
-                    },
-                    "style": "primary",
-                    "action_id": "approve_leave"
-                },
-                {
-                    "type": "button",
-                    "text": {
-                        "type": "plain_text",
-                        "text": "Reject",
-                        "emoji": True
-                    },
-                    "style": "danger",
-                    "action_id": "reject_leave"
-                }
-            ]
-        }
-    ]
+    return ADMIN_NOTIFICATION.render(
+        user_id=user_id,
+        leave_type=leave_type,
+        start_date=format_date_for_display(start_date),
+        end_date=format_date_for_display(end_date),
+        coverage_person=coverage_person,
+        tasks=tasks,
+        reason=reason
+    )
 
 def create_user_notification_blocks(user_id: str, leave_type: str, start_date: str,
                                  end_date: str, coverage_person: str, tasks: str, reason: str, **kwargs) -> List[Dict[str, Any]]:
@@ -143,7 +101,7 @@ def create_denial_modal_view(leave_request: Dict[str, Any]) -> Dict[str, Any]:
     }
     
     # Add metadata
-    modal["private_metadata"] = json.dumps(metadata)
+    modal["private_metadata"] = encode_metadata(metadata)
     
     # Add blocks
     modal["blocks"] = [
@@ -0,0 +1,188 @@
+"""
+Keep-alive HTTPS transport for the Slack WebClient.
+
+The stock WebClient opens a new TLS connection through urllib for every API
+call. PooledWebClient sends requests over persistent http.client connections
+kept in a small per-worker pool, and can pre-connect the pool when a worker
+boots so handshakes stay off the interaction path.
+"""
+
+import http.client
+import io
+import logging
+import os
+import ssl
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from urllib.request import Request
+
+from slack_sdk import WebClient
+
+from src.metrics import MetricsRegistry, registry as default_registry
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean an idle keep-alive connection was closed by the server
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class ConnectionPool:
+    """Idle keep-alive connections per origin (scheme://host), for one worker process."""
+
+    def __init__(self, max_size: int = 4, timeout: float = 30.0, max_idle: float = 50.0,
+                 ssl_context: Optional[ssl.SSLContext] = None, metrics: Optional[MetricsRegistry] = None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self._idle: Dict[str, List[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+        metrics = metrics or default_registry
+        self._hits = metrics.counter("http_pool.hits")
+        self._misses = metrics.counter("http_pool.misses")
+        self._discarded = metrics.counter("http_pool.discarded")
+        self._idle_gauge = metrics.gauge("http_pool.idle")
+        self._connect_time = metrics.timer("http_pool.connect_time")
+
+    def acquire(self, origin: str) -> Tuple[http.client.HTTPConnection, bool]:
+        """Return (connection, reused). Opens a new connection when none is idle."""
+        now = time.monotonic()
+        with self._lock:
+            self._check_fork()
+            idle = self._idle.get(origin, [])
+            while idle:
+                connection, released_at = idle.pop()
+                if now - released_at <= self.max_idle:
+                    self._hits.inc()
+                    self._update_idle_gauge()
+                    return connection, True
+                connection.close()
+                self._discarded.inc()
+            self._update_idle_gauge()
+        self._misses.inc()
+        return self._connect(origin), False
+
+    def release(self, origin: str, connection: http.client.HTTPConnection) -> None:
+        """Return a healthy connection to the pool, closing it if the pool is full."""
+        with self._lock:
+            self._check_fork()
+            idle = self._idle.setdefault(origin, [])
+            if len(idle) < self.max_size:
+                idle.append((connection, time.monotonic()))
+                self._update_idle_gauge()
+                return
+        connection.close()
+
+    def discard(self, connection: http.client.HTTPConnection) -> None:
+        connection.close()
+        self._discarded.inc()
+
+    def warm_up(self, origin: str, count: Optional[int] = None) -> int:
+        """Open up to `count` idle connections to `origin`. Returns how many were opened."""
+        opened = 0
+        for _ in range(count or self.max_size):
+            with self._lock:
+                if len(self._idle.get(origin, [])) >= self.max_size:
+                    break
+            try:
+                connection = self._connect(origin)
+            except OSError as e:
+                logger.warning(f"Could not pre-connect to {origin}: {str(e)}")
+                break
+            self.release(origin, connection)
+            opened += 1
+        return opened
+
+    def close(self) -> None:
+        with self._lock:
+            for idle in self._idle.values():
+                for connection, _ in idle:
+                    connection.close()
+            self._idle.clear()
+            self._update_idle_gauge()
+
+    def _connect(self, origin: str) -> http.client.HTTPConnection:
+        """Open a connection, including the TLS handshake, and time it."""
+        parts = urlsplit(origin)
+        if parts.scheme == "https":
+            connection = http.client.HTTPSConnection(parts.netloc, timeout=self.timeout, context=self.ssl_context)
+        else:
+            connection = http.client.HTTPConnection(parts.netloc, timeout=self.timeout)
+        started = time.monotonic()
+        connection.connect()
+        self._connect_time.observe(time.monotonic() - started)
+        return connection
+
+    def _check_fork(self) -> None:
+        # Sockets inherited from the parent process must not be shared
+        pid = os.getpid()
+        if pid != self._pid:
+            self._idle = {}
+            self._pid = pid
+
+    def _update_idle_gauge(self) -> None:
+        self._idle_gauge.set(sum(len(idle) for idle in self._idle.values()))
+
+
+class PooledWebClient(WebClient):
+    """WebClient that sends API calls over pooled keep-alive connections."""
+
+    def __init__(self, *args: Any, pool: Optional[ConnectionPool] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.pool = pool or ConnectionPool(timeout=self.timeout, ssl_context=self.ssl)
+
+    def warm_up(self, count: Optional[int] = None) -> int:
+        """Pre-connect to the Slack API host, e.g. from gunicorn's post_worker_init."""
+        parts = urlsplit(self.base_url)
+        return self.pool.warm_up(f"{parts.scheme}://{parts.netloc}", count)
+
+    def _perform_urllib_http_request_internal(self, url: str, req: Request) -> Dict[str, Any]:
+        parts = urlsplit(url)
+        if self.proxy is not None or parts.scheme.lower() not in ("http", "https"):
+            return super()._perform_urllib_http_request_internal(url, req)
+
+        origin = f"{parts.scheme.lower()}://{parts.netloc}"
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        headers = dict(req.header_items())
+        connection, reused = self.pool.acquire(origin)
+        try:
+            response, body = self._send(connection, req.get_method(), path, req.data, headers)
+        except STALE_CONNECTION_ERRORS:
+            self.pool.discard(connection)
+            if not reused:
+                raise
+            # The server closed the idle connection before our request; retry once on a new one
+            connection, _ = self.pool.acquire(origin)
+            try:
+                response, body = self._send(connection, req.get_method(), path, req.data, headers)
+            except BaseException:
+                self.pool.discard(connection)
+                raise
+        except BaseException:
+            self.pool.discard(connection)
+            raise
+
+        if response.will_close:
+            self.pool.discard(connection)
+        else:
+            self.pool.release(origin, connection)
+
+        if response.status >= 300:
+            # Same contract as urlopen(): non-2xx responses raise HTTPError
+            raise HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(body))
+
+        if response.headers.get_content_type() == "application/gzip":
+            return {"status": response.status, "headers": response.headers, "body": body}
+        charset = response.headers.get_content_charset() or "utf-8"
+        return {"status": response.status, "headers": response.headers, "body": body.decode(charset)}
+
+    def _send(self, connection: http.client.HTTPConnection, method: str, path: str,
+              data: Optional[bytes], headers: Dict[str, str]) -> Tuple[http.client.HTTPResponse, bytes]:
+        connection.request(method, path, body=data, headers=headers)
+        response = connection.getresponse()
+        return response, response.read()
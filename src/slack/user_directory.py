@@ -0,0 +1,268 @@
+"""
+Local copy of the Slack workspace's user directory.
+
+The directory is downloaded with cursor pagination, persisted in SQLite and
+served from memory. A worker boots from the persisted snapshot without
+calling Slack; ``team_join`` and ``user_change`` events keep it current,
+and other workers pick those changes up from SQLite by their sync time. A
+full re-download runs in the background only when the snapshot is missing
+or older than ``max_age``, and only one worker does it at a time. Each
+worker checks for both every ``refresh_interval`` from a refresh thread,
+so a fresh deployment downloads the directory without waiting for a lookup.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from slack_sdk import WebClient
+
+from src.metrics import MetricsRegistry, registry as default_registry
+from src.storage.sqlite import SQLiteDatabase
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS slack_users (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    real_name TEXT,
+    display_name TEXT,
+    is_bot INTEGER NOT NULL DEFAULT 0,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    updated INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_slack_users_synced ON slack_users (synced_at);
+CREATE TABLE IF NOT EXISTS slack_user_sync (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    completed_at REAL,
+    claimed_at REAL
+);
+"""
+
+_COLUMNS = ("id", "name", "real_name", "display_name", "is_bot", "deleted", "updated")
+
+# Rows written by other workers may commit slightly out of sync_at order
+_SYNC_OVERLAP = 5.0
+
+# A full sync claimed by a worker that died is taken over after this long
+_CLAIM_TIMEOUT = 600.0
+
+
+def iter_workspace_users(client: WebClient, page_size: int = 200) -> Iterator[Dict[str, Any]]:
+    """Every member of the workspace, following users.list cursors to the last page."""
+    cursor = None
+    while True:
+        response = client.users_list(limit=page_size, cursor=cursor) if cursor else client.users_list(limit=page_size)
+        yield from response["members"]
+        cursor = (response.get("response_metadata") or {}).get("next_cursor")
+        if not cursor:
+            return
+
+
+def _record(user: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields kept for a Slack user object."""
+    profile = user.get("profile") or {}
+    return {
+        "id": user["id"],
+        "name": user.get("name"),
+        "real_name": user.get("real_name") or profile.get("real_name"),
+        "display_name": profile.get("display_name"),
+        "is_bot": bool(user.get("is_bot")),
+        "deleted": bool(user.get("deleted")),
+        "updated": int(user.get("updated") or 0),
+    }
+
+
+class UserDirectory:
+    """Workspace users by ID, in memory, backed by a persisted snapshot."""
+
+    def __init__(self, client: WebClient, db: SQLiteDatabase, max_age: float = 24 * 3600,
+                 refresh_interval: float = 30.0, page_size: int = 200, metrics: Optional[MetricsRegistry] = None):
+        self.client = client
+        self.db = db
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval
+        self.page_size = page_size
+        self.db.register_schema(SCHEMA)
+
+        metrics = metrics or default_registry
+        self._full_syncs = metrics.counter("user_directory.full_syncs")
+        self._sync_errors = metrics.counter("user_directory.sync_errors")
+        self._events = metrics.counter("user_directory.events")
+        self._size = metrics.gauge("user_directory.users")
+
+        self._lock = threading.Lock()
+        self._users: Dict[str, Dict[str, Any]] = {}
+        self._watermark = 0.0
+        self._refreshed_at = float("-inf")
+        self._syncing = False
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stopping = threading.Event()
+
+    def load(self) -> None:
+        """Load the persisted snapshot into memory; no Slack calls."""
+        rows = self.db.connection().execute(f"SELECT {', '.join(_COLUMNS)}, synced_at FROM slack_users").fetchall()
+        with self._lock:
+            self._users = {row["id"]: self._from_row(row) for row in rows}
+            self._watermark = max((row["synced_at"] for row in rows), default=0.0)
+        self._size.set(len(self._users))
+        logger.info(f"Loaded {len(rows)} workspace users from the snapshot")
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """A user's record, or None if the directory does not know them."""
+        self._maybe_refresh()
+        return self._users.get(user_id)
+
+    def active_users(self) -> List[Dict[str, Any]]:
+        """People in the workspace: no bots, no deactivated accounts."""
+        self._maybe_refresh()
+        return [user for user in self._users.values() if not user["is_bot"] and not user["deleted"]]
+
+    def apply_event(self, event: Dict[str, Any]) -> None:
+        """Fold a team_join or user_change event into the directory."""
+        if event.get("type") not in ("team_join", "user_change") or not isinstance(event.get("user"), dict):
+            return
+        record = _record(event["user"])
+        self._events.inc()
+        self._save([record])
+        with self._lock:
+            current = self._users.get(record["id"])
+            if current is None or record["updated"] >= current["updated"]:
+                self._users[record["id"]] = record
+        self._size.set(len(self._users))
+
+    def sync(self) -> None:
+        """Download the whole directory and replace the snapshot; slow, call off the request path."""
+        records = [_record(user) for user in iter_workspace_users(self.client, self.page_size)]
+        self._save(records, completed=True)
+        with self._lock:
+            for record in records:
+                current = self._users.get(record["id"])
+                if current is None or record["updated"] >= current["updated"]:
+                    self._users[record["id"]] = record
+        self._full_syncs.inc()
+        self._size.set(len(self._users))
+        logger.info(f"Synced {len(records)} workspace users from Slack")
+
+    def ensure_running(self) -> None:
+        """Start the refresh thread for the current process if it is not running."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="user-directory-refresh", daemon=True)
+            self._thread.start()
+            self._pid = pid
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            self._maybe_refresh()
+            if self._stopping.wait(self.refresh_interval):
+                return
+
+    def _save(self, records: List[Dict[str, Any]], completed: bool = False) -> None:
+        now = time.time()
+        with self.db.transaction() as connection:
+            # An older copy (e.g. a listing that started before an event) never overwrites a newer one
+            connection.executemany(
+                """
+                INSERT INTO slack_users (id, name, real_name, display_name, is_bot, deleted, updated, synced_at)
+                VALUES (:id, :name, :real_name, :display_name, :is_bot, :deleted, :updated, :synced_at)
+                ON CONFLICT (id) DO UPDATE SET
+                    name = excluded.name, real_name = excluded.real_name, display_name = excluded.display_name,
+                    is_bot = excluded.is_bot, deleted = excluded.deleted, updated = excluded.updated,
+                    synced_at = excluded.synced_at
+                WHERE excluded.updated >= slack_users.updated
+                """,
+                [dict(record, synced_at=now) for record in records]
+            )
+            if completed:
+                connection.execute(
+                    "INSERT INTO slack_user_sync (id, completed_at, claimed_at) VALUES (1, ?, NULL) "
+                    "ON CONFLICT (id) DO UPDATE SET completed_at = excluded.completed_at, claimed_at = NULL",
+                    (now,)
+                )
+
+    def _maybe_refresh(self) -> None:
+        """Pick up other workers' changes, and start a full sync if the snapshot is stale."""
+        now = time.monotonic()
+        if now - self._refreshed_at < self.refresh_interval:
+            return
+        with self._lock:
+            if now - self._refreshed_at < self.refresh_interval:
+                return
+            self._refreshed_at = now
+            watermark = self._watermark
+        try:
+            rows = self.db.connection().execute(
+                f"SELECT {', '.join(_COLUMNS)}, synced_at FROM slack_users WHERE synced_at > ?",
+                (watermark - _SYNC_OVERLAP,)
+            ).fetchall()
+            with self._lock:
+                for row in rows:
+                    record = self._from_row(row)
+                    current = self._users.get(record["id"])
+                    if current is None or record["updated"] >= current["updated"]:
+                        self._users[record["id"]] = record
+                    self._watermark = max(self._watermark, row["synced_at"])
+            if self._claim_full_sync():
+                threading.Thread(target=self._run_sync, name="user-directory-sync", daemon=True).start()
+        except Exception as e:
+            logger.error(f"Failed to refresh the user directory: {e}")
+
+    def _claim_full_sync(self) -> bool:
+        """True if the snapshot is stale and this worker got to re-download it."""
+        if self._syncing:
+            return False
+        now = time.time()
+        with self.db.transaction() as connection:
+            row = connection.execute("SELECT completed_at, claimed_at FROM slack_user_sync WHERE id = 1").fetchone()
+            if row is not None and row["completed_at"] is not None and now - row["completed_at"] < self.max_age:
+                return False
+            if row is not None and row["claimed_at"] is not None and now - row["claimed_at"] < _CLAIM_TIMEOUT:
+                return False
+            connection.execute(
+                "INSERT INTO slack_user_sync (id, completed_at, claimed_at) VALUES (1, NULL, ?) "
+                "ON CONFLICT (id) DO UPDATE SET claimed_at = excluded.claimed_at",
+                (now,)
+            )
+        self._syncing = True
+        return True
+
+    def _run_sync(self) -> None:
+        try:
+            self.sync()
+        except Exception as e:
+            self._sync_errors.inc()
+            logger.error(f"Workspace user sync failed: {e}", exc_info=True)
+            self._release_claim()
+        finally:
+            self._syncing = False
+
+    def _release_claim(self) -> None:
+        """Let the next refresh (of any worker) retry a full sync that failed."""
+        try:
+            with self.db.transaction() as connection:
+                connection.execute("UPDATE slack_user_sync SET claimed_at = NULL WHERE id = 1")
+        except Exception as e:
+            logger.error(f"Failed to release the user sync claim: {e}")
+
+    @staticmethod
+    def _from_row(row) -> Dict[str, Any]:
+        record = {column: row[column] for column in _COLUMNS}
+        record["is_bot"] = bool(record["is_bot"])
+        record["deleted"] = bool(record["deleted"])
+        return record
@@ -0,0 +1,174 @@
+"""
+Read-through cache of Slack user profiles (``users.info``).
+
+Notifications show the requester's name and time zone; looking them up per
+render would add a Slack call to every interaction. Profiles are cached per
+process for ``ttl`` seconds. Unknown and deactivated users are cached as
+None for ``negative_ttl``, so a bad ID is not looked up on every render.
+Concurrent lookups of the same user share one ``users.info`` call.
+
+Code that runs before Slack is acknowledged uses ``peek``, which never
+waits: ``users.info`` goes through the rate limiter and circuit breaker and
+can take far longer than Slack's 3-second ack deadline. Its fetches run on a
+small bounded pool and are skipped when the pool is backed up.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+
+from src.metrics import MetricsRegistry, registry as default_registry
+from src.slack.executor import BoundedExecutor
+
+logger = logging.getLogger(__name__)
+
+# users.info errors that mean the user will not be found by asking again
+_NOT_FOUND = ("user_not_found", "user_not_visible", "account_inactive")
+
+
+class _Flight:
+    """A users.info call in progress, waited on by every concurrent lookup of the user."""
+
+    __slots__ = ("done", "profile")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.profile: Optional[Dict[str, Any]] = None
+
+
+def _profile(user: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of a users.info user that notifications use."""
+    profile = user.get("profile") or {}
+    return {
+        "id": user["id"],
+        "name": profile.get("display_name") or user.get("real_name") or profile.get("real_name") or user.get("name"),
+        "real_name": user.get("real_name") or profile.get("real_name"),
+        "title": profile.get("title") or None,
+        "tz": user.get("tz"),
+        "tz_label": user.get("tz_label"),
+        "tz_offset": user.get("tz_offset"),
+    }
+
+
+class UserProfileCache:
+    """Slack user profiles by ID, fetched on a miss and kept for a while."""
+
+    def __init__(self, client: WebClient, ttl: float = 3600, negative_ttl: float = 300, max_entries: int = 10000,
+                 wait_timeout: float = 5.0, fetch_workers: int = 2, fetch_queue: int = 50,
+                 metrics: Optional[MetricsRegistry] = None):
+        self.client = client
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+
+        metrics = metrics or default_registry
+        self._hits = metrics.counter("user_profiles.hits")
+        self._negative_hits = metrics.counter("user_profiles.negative_hits")
+        self._misses = metrics.counter("user_profiles.misses")
+        self._coalesced = metrics.counter("user_profiles.coalesced")
+        self._errors = metrics.counter("user_profiles.errors")
+        self._hit_rate = metrics.gauge("user_profiles.hit_rate")
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        # Background fetches started by peek; threads start on first use, in each worker
+        self._fetcher = BoundedExecutor(max_workers=fetch_workers, max_queue=fetch_queue,
+                                        name="user_profiles.fetch", metrics=metrics)
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """The user's profile, or None if they are unknown, deactivated or Slack could not be reached."""
+        cached, flight, leader = self._lookup(user_id)
+        if flight is None:
+            return cached
+        if not leader:
+            self._coalesced.inc()
+            flight.done.wait(self.wait_timeout)
+            return flight.profile
+        return self._load(user_id, flight)
+
+    def peek(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """The cached profile, without waiting for Slack.
+
+        On a miss the profile is fetched in the background, so it is cached
+        by the next render; safe to call before acknowledging Slack. When the
+        fetch pool is backed up the fetch is skipped and a later call retries.
+        """
+        cached, flight, leader = self._lookup(user_id)
+        if leader and not self._fetcher.offer(self._load, user_id, flight):
+            self._settle(user_id, flight, None, 0.0)
+        return cached
+
+    def _lookup(self, user_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[_Flight], bool]:
+        """The cached profile, or the fetch to wait on and whether this caller has to make it."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(user_id)
+            if cached is not None and cached[0] > now:
+                self._cache.move_to_end(user_id)
+                (self._hits if cached[1] is not None else self._negative_hits).inc()
+                self._update_hit_rate()
+                return cached[1], None, False
+            flight = self._flights.get(user_id)
+            if flight is not None:
+                return None, flight, False
+            flight = self._flights[user_id] = _Flight()
+        self._misses.inc()
+        self._update_hit_rate()
+        return None, flight, True
+
+    def _load(self, user_id: str, flight: _Flight) -> Optional[Dict[str, Any]]:
+        """Fetch a profile for the flight this caller leads, cache it and release the waiters."""
+        profile, ttl = None, 0.0
+        try:
+            profile, ttl = self._fetch(user_id)
+        finally:
+            self._settle(user_id, flight, profile, ttl)
+        return profile
+
+    def _settle(self, user_id: str, flight: _Flight, profile: Optional[Dict[str, Any]], ttl: float) -> None:
+        """End a flight: cache its result for ttl seconds (0 keeps nothing) and release the waiters."""
+        with self._lock:
+            if ttl:
+                self._cache[user_id] = (time.monotonic() + ttl, profile)
+                self._cache.move_to_end(user_id)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            del self._flights[user_id]
+        flight.profile = profile
+        flight.done.set()
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget a user's profile, e.g. after a user_change event."""
+        with self._lock:
+            self._cache.pop(user_id, None)
+
+    def _fetch(self, user_id: str) -> Tuple[Optional[Dict[str, Any]], float]:
+        """The profile and how long to cache it; a TTL of 0 means do not cache."""
+        try:
+            user = self.client.users_info(user=user_id)["user"]
+        except SlackApiError as e:
+            error = e.response.get("error") if e.response is not None else None
+            if error in _NOT_FOUND:
+                return None, self.negative_ttl
+            self._errors.inc()
+            logger.warning(f"users.info failed for {user_id}: {error}")
+            return None, 0.0
+        except Exception as e:
+            self._errors.inc()
+            logger.warning(f"users.info failed for {user_id}: {e}")
+            return None, 0.0
+        if user.get("deleted"):
+            return None, self.negative_ttl
+        return _profile(user), self.ttl
+
+    def _update_hit_rate(self) -> None:
+        hits = self._hits.value + self._negative_hits.value
+        total = hits + self._misses.value
+        self._hit_rate.set(hits / total if total else 0.0)
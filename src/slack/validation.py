@@ -0,0 +1,139 @@
+"""
+Validation of the leave request form while it is being filled in.
+
+The date pickers and coverage selector dispatch block actions as soon as
+they change, so errors such as an end date before the start date are shown
+in the open modal instead of after a rejected submission. Results are
+cached briefly per (user, dates, coverage), as every change of an input is
+validated again. Submissions are always checked against the store.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.metrics import MetricsRegistry, registry as default_registry
+from src.slack.user_directory import UserDirectory
+from src.storage.leave_requests import STATUS_DENIED, LeaveRequestStore
+
+logger = logging.getLogger(__name__)
+
+# Inputs that trigger validation, by action_id
+DISPATCHED_ACTIONS = ("start_date", "end_date", "coverage_person")
+
+# Suffix of the context blocks that show an input's error under it
+VALIDATION_BLOCK_SUFFIX = "_validation"
+
+# Fields a views_update may carry over from the open view
+_VIEW_FIELDS = ("type", "callback_id", "title", "submit", "close", "private_metadata",
+                "clear_on_close", "notify_on_close", "external_id")
+
+
+class LeaveFormValidator:
+    """Checks a leave request's dates and coverage against the rules and existing requests."""
+
+    def __init__(self, store: Optional[LeaveRequestStore] = None, ttl: float = 30.0, max_entries: int = 1024,
+                 users: Optional[UserDirectory] = None, metrics: Optional[MetricsRegistry] = None):
+        self.store = store
+        # Coverage by bots and deactivated accounts is refused when the workspace directory is kept
+        self.users = users
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        metrics = metrics or default_registry
+        self._hits = metrics.counter("form_validation.cache_hits")
+        self._misses = metrics.counter("form_validation.cache_misses")
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple, Tuple[float, Dict[str, str]]]" = OrderedDict()
+
+    def validate(self, user_id: str, start_date: Optional[str], end_date: Optional[str],
+                 coverage_person: Optional[str], fresh: bool = False) -> Dict[str, str]:
+        """Errors by block_id; only fields that are filled in are checked.
+
+        Submissions pass fresh: a cached result may predate a request recorded
+        since, possibly by another worker.
+        """
+        key = (user_id, start_date, end_date, coverage_person)
+        now = time.monotonic()
+        if not fresh:
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is not None and cached[0] > now:
+                    self._cache.move_to_end(key)
+                    self._hits.inc()
+                    return dict(cached[1])
+        self._misses.inc()
+
+        errors = self._check(user_id, start_date, end_date, coverage_person)
+        with self._lock:
+            self._cache[key] = (now + self.ttl, errors)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return dict(errors)
+
+    def forget(self, user_id: str) -> None:
+        """Drop cached results involving a user, e.g. after they submit a request."""
+        with self._lock:
+            for key in [key for key in self._cache if user_id in (key[0], key[3])]:
+                del self._cache[key]
+
+    def _check(self, user_id: str, start_date: Optional[str], end_date: Optional[str],
+               coverage_person: Optional[str]) -> Dict[str, str]:
+        errors: Dict[str, str] = {}
+        if start_date and end_date and end_date < start_date:
+            errors["end_date_block"] = "The end date must be on or after the start date"
+        if coverage_person and coverage_person == user_id:
+            errors["coverage_block"] = "Please choose someone other than yourself to cover"
+        elif coverage_person and self.users is not None:
+            # Users the directory does not know yet are given the benefit of the doubt
+            member = self.users.get(coverage_person)
+            if member is not None and (member["deleted"] or member["is_bot"]):
+                errors["coverage_block"] = "Please choose an active member of the workspace to cover"
+        if self.store is None or not start_date or "end_date_block" in errors:
+            return errors
+
+        end_date = end_date or start_date
+        try:
+            own = self._active(self.store.overlapping(start_date, end_date, requester_id=user_id))
+            if own:
+                errors["date_block"] = (f"You already have leave from {own[0]['start_date']} "
+                                        f"to {own[0]['end_date']}")
+            if coverage_person and "coverage_block" not in errors:
+                if self._active(self.store.overlapping(start_date, end_date, requester_id=coverage_person)):
+                    errors["coverage_block"] = f"<@{coverage_person}> is on leave during these dates"
+        except Exception as e:
+            # The request can still be submitted; the approver sees the calendar anyway
+            logger.error(f"Failed to check leave calendar for {user_id}: {str(e)}")
+        return errors
+
+    @staticmethod
+    def _active(requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [request for request in requests if request["status"] != STATUS_DENIED]
+
+
+def with_validation_blocks(blocks: List[Dict[str, Any]], errors: Dict[str, str]) -> List[Dict[str, Any]]:
+    """The view's blocks with a warning under each input that has an error, and none elsewhere."""
+    updated = []
+    for block in blocks:
+        block_id = block.get("block_id") or ""
+        if block_id.endswith(VALIDATION_BLOCK_SUFFIX):
+            continue
+        updated.append(block)
+        if block_id in errors:
+            updated.append({
+                "type": "context",
+                "block_id": block_id + VALIDATION_BLOCK_SUFFIX,
+                "elements": [{"type": "mrkdwn", "text": f":warning: {errors[block_id]}"}]
+            })
+    return updated
+
+
+def updated_view(view: Dict[str, Any], blocks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """A views_update payload for an open view with new blocks."""
+    updated = {key: view[key] for key in _VIEW_FIELDS if key in view}
+    updated["blocks"] = blocks
+    return updated
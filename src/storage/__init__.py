@@ -0,0 +1,3 @@
+"""
+Local persistence (SQLite in WAL mode) shared by all gunicorn workers.
+"""
@@ -0,0 +1,112 @@
+"""
+Idempotency for Slack redeliveries and double submissions.
+
+Slack retries slow requests and users double-click buttons. Each interaction
+is keyed by its trigger_id, action_ts or view.id; the first delivery runs the
+handler and caches its response, later deliveries within the TTL get the
+cached response without touching Slack again. Validation errors are not
+cached: Slack keeps the view.id when the user corrects the form, and the
+corrected submission has to reach the handler. Keys live in SQLite so every
+gunicorn worker sees them.
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from src.metrics import MetricsRegistry, registry as default_registry
+from src.storage.sqlite import SQLiteDatabase
+from src.storage.ttl_store import SQLiteTTLStore
+
+logger = logging.getLogger(__name__)
+
+# Placeholder stored while the first delivery is still being handled
+IN_PROGRESS = "__in_progress__"
+
+
+def interaction_key(payload: Dict[str, Any]) -> Optional[str]:
+    """Derive the idempotency key for an interactivity payload."""
+    payload_type = payload.get("type")
+    if payload_type == "view_submission":
+        view_id = payload.get("view", {}).get("id")
+        return f"view:{view_id}" if view_id else None
+    if payload_type == "block_actions":
+        action = (payload.get("actions") or [{}])[0]
+        if action.get("action_id") == "approve_leave":
+            # A message can only be approved once, so double-clicks collapse too;
+            # per user, so a refusal shown to one clicker is not replayed to the approver
+            container = payload.get("container", {})
+            if container.get("channel_id") and container.get("message_ts"):
+                return (f"approve:{container['channel_id']}:{container['message_ts']}:"
+                        f"{payload.get('user', {}).get('id')}")
+        if action.get("action_ts"):
+            return f"action:{action['action_ts']}:{payload.get('user', {}).get('id')}"
+    trigger_id = payload.get("trigger_id")
+    return f"trigger:{trigger_id}" if trigger_id else None
+
+
+def command_key(payload: Dict[str, Any]) -> Optional[str]:
+    """Derive the idempotency key for a slash command."""
+    trigger_id = payload.get("trigger_id")
+    return f"trigger:{trigger_id}" if trigger_id else None
+
+
+def _is_cacheable(response: Any) -> bool:
+    """Whether a response may be replayed to later deliveries of the same key."""
+    return not (isinstance(response, dict) and response.get("response_action") == "errors")
+
+
+class IdempotencyStore:
+    """Runs a handler at most once per key within the TTL."""
+
+    def __init__(self, db: SQLiteDatabase, ttl: float = 900.0, metrics: Optional[MetricsRegistry] = None):
+        self.ttl = ttl
+        self._store = SQLiteTTLStore(db, "idempotency_keys")
+        metrics = metrics or default_registry
+        self._hits = metrics.counter("idempotency.hits")
+        self._misses = metrics.counter("idempotency.misses")
+        self._in_progress = metrics.counter("idempotency.in_progress")
+        self._retries = metrics.counter("idempotency.slack_retries")
+
+    def run(self, key: Optional[str], handler: Callable[[], Any], default: Any = None,
+            retry_num: Optional[str] = None) -> Any:
+        """Return the cached response for a duplicate key, otherwise run the handler.
+
+        `default` is returned for a duplicate that arrives while the first
+        delivery is still running.
+        """
+        if retry_num:
+            self._retries.inc()
+        if not key:
+            return handler()
+
+        if not self._store.add(key, IN_PROGRESS, self.ttl):
+            cached = self._store.get(key)
+            if cached is None:
+                # Expired between the two queries; treat as a new delivery
+                return self.run(key, handler, default)
+            if cached == IN_PROGRESS:
+                self._in_progress.inc()
+                logger.info(f"Duplicate delivery for {key} while the first is in progress")
+                return default
+            self._hits.inc()
+            logger.info(f"Duplicate delivery for {key}, returning cached response")
+            return json.loads(cached)
+
+        self._misses.inc()
+        try:
+            response = handler()
+        except Exception:
+            # Let a redelivery try again
+            self._store.delete(key)
+            raise
+        if not _is_cacheable(response):
+            # Let the corrected resubmission run the handler
+            self._store.delete(key)
+            return response
+        self._store.put(key, json.dumps(response), self.ttl)
+        return response
+
+    def clear(self) -> None:
+        """Forget every key."""
+        self._store.clear()
@@ -0,0 +1,87 @@
+"""
+Per-user defaults for the leave request form.
+
+Updated incrementally on every accepted submission: the last coverage
+person and task list are kept as-is, and a count per leave type gives the
+user's most-used type. Opening the form is then a primary-key lookup
+instead of a scan over the user's request history.
+"""
+
+import logging
+import time
+from typing import Any, Dict
+
+from src.slack.models import LeaveRequest
+from src.storage.sqlite import SQLiteDatabase
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leave_defaults (
+    user_id TEXT PRIMARY KEY,
+    coverage_person TEXT,
+    tasks TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leave_type_counts (
+    user_id TEXT NOT NULL,
+    leave_type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (user_id, leave_type)
+) WITHOUT ROWID;
+"""
+
+
+class LeaveDefaultsStore:
+    """Form defaults per user, derived from their accepted submissions."""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+        self.db.register_schema(SCHEMA)
+
+    def record(self, leave_request: LeaveRequest) -> None:
+        """Fold an accepted submission into the submitter's defaults."""
+        now = time.time()
+        with self.db.transaction() as connection:
+            connection.execute(
+                """
+                INSERT INTO leave_defaults (user_id, coverage_person, tasks, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (user_id) DO UPDATE SET
+                    coverage_person = excluded.coverage_person,
+                    tasks = excluded.tasks,
+                    updated_at = excluded.updated_at
+                """,
+                (leave_request.user_id, leave_request.coverage_person, leave_request.tasks, now)
+            )
+            connection.execute(
+                """
+                INSERT INTO leave_type_counts (user_id, leave_type, count, last_used) VALUES (?, ?, 1, ?)
+                ON CONFLICT (user_id, leave_type) DO UPDATE SET
+                    count = count + 1,
+                    last_used = excluded.last_used
+                """,
+                (leave_request.user_id, leave_request.leave_type, now)
+            )
+
+    def get(self, user_id: str) -> Dict[str, Any]:
+        """Defaults keyed by the form's action_id; empty for users who never submitted."""
+        connection = self.db.connection()
+        defaults: Dict[str, Any] = {}
+        row = connection.execute(
+            "SELECT coverage_person, tasks FROM leave_defaults WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if row:
+            defaults.update((key, row[key]) for key in ("coverage_person", "tasks") if row[key])
+
+        # Ties go to the type used most recently
+        row = connection.execute(
+            """
+            SELECT leave_type FROM leave_type_counts WHERE user_id = ?
+            ORDER BY count DESC, last_used DESC LIMIT 1
+            """,
+            (user_id,)
+        ).fetchone()
+        if row:
+            defaults["leave_type"] = row["leave_type"]
+        return defaults
@@ -0,0 +1,157 @@
+"""
+Persistent store of leave requests.
+
+Each submitted request gets a row with its routing and decision state, so
+approve/deny actions look the request up by ID instead of re-reading the
+Slack message. Decisions are compare-and-set on the status column, which
+makes a request decidable exactly once even when several gunicorn workers
+handle clicks on it at the same time.
+"""
+
+import logging
+import secrets
+import time
+from typing import Any, Dict, List, Optional
+
+from src.storage.sqlite import SQLiteDatabase
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_APPROVED = "approved"
+STATUS_DENIED = "denied"
+
+# 9 random bytes: 12 URL-safe characters, short enough for button values and modal metadata
+REQUEST_ID_BYTES = 9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leave_requests (
+    id TEXT PRIMARY KEY,
+    requester_id TEXT NOT NULL,
+    approver_id TEXT,
+    leave_type TEXT NOT NULL,
+    leave_type_display TEXT,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    coverage_person TEXT,
+    tasks TEXT,
+    reason TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    channel_id TEXT,
+    message_ts TEXT,
+    decided_by TEXT,
+    denial_reason TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_leave_requests_requester ON leave_requests (requester_id, start_date);
+CREATE INDEX IF NOT EXISTS idx_leave_requests_approver ON leave_requests (approver_id, status);
+CREATE INDEX IF NOT EXISTS idx_leave_requests_status ON leave_requests (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_leave_requests_dates ON leave_requests (start_date, end_date);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_leave_requests_message ON leave_requests (channel_id, message_ts);
+"""
+
+
+def new_request_id() -> str:
+    """A compact, unguessable request ID."""
+    return secrets.token_urlsafe(REQUEST_ID_BYTES)
+
+
+class LeaveRequestStore:
+    """Leave requests in SQLite; rows are returned as plain dicts."""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+        self.db.register_schema(SCHEMA)
+
+    def create(self, requester_id: str, leave_type: str, start_date: str, end_date: Optional[str] = None,
+               approver_id: Optional[str] = None, leave_type_display: Optional[str] = None,
+               coverage_person: Optional[str] = None, tasks: Optional[str] = None,
+               reason: Optional[str] = None) -> str:
+        """Record a new pending request and return its ID."""
+        request_id = new_request_id()
+        now = time.time()
+        self.db.connection().execute(
+            """
+            INSERT INTO leave_requests
+                (id, requester_id, approver_id, leave_type, leave_type_display, start_date, end_date,
+                 coverage_person, tasks, reason, status, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (request_id, requester_id, approver_id, leave_type, leave_type_display or leave_type,
+             start_date, end_date or start_date, coverage_person, tasks, reason, STATUS_PENDING, now, now)
+        )
+        return request_id
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        row = self.db.connection().execute(
+            "SELECT * FROM leave_requests WHERE id = ?", (request_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def get_by_message(self, channel_id: str, message_ts: str) -> Optional[Dict[str, Any]]:
+        """Find the request behind an approver notification."""
+        row = self.db.connection().execute(
+            "SELECT * FROM leave_requests WHERE channel_id = ? AND message_ts = ?", (channel_id, message_ts)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def attach_message(self, request_id: str, channel_id: str, message_ts: str) -> None:
+        """Remember where the approver notification for a request was posted."""
+        self.db.connection().execute(
+            """
+            UPDATE leave_requests SET channel_id = ?, message_ts = ?, updated_at = ?
+            WHERE id = ? AND message_ts IS NULL
+            """,
+            (channel_id, message_ts, time.time(), request_id)
+        )
+
+    def decide(self, request_id: str, status: str, decided_by: str, denial_reason: Optional[str] = None) -> bool:
+        """Move a pending request to approved/denied. False if it was already decided."""
+        if status not in (STATUS_APPROVED, STATUS_DENIED):
+            raise ValueError(f"Invalid decision: {status}")
+        cursor = self.db.connection().execute(
+            """
+            UPDATE leave_requests SET status = ?, decided_by = ?, denial_reason = ?, updated_at = ?
+            WHERE id = ? AND status = ?
+            """,
+            (status, decided_by, denial_reason, time.time(), request_id, STATUS_PENDING)
+        )
+        if cursor.rowcount != 1:
+            logger.info(f"Leave request {request_id} was already decided, ignoring {status} by {decided_by}")
+            return False
+        return True
+
+    def for_requester(self, requester_id: str, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """A requester's requests, most recent start date first."""
+        query = "SELECT * FROM leave_requests WHERE requester_id = ?"
+        params: List[Any] = [requester_id]
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY start_date DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self.db.connection().execute(query, params)]
+
+    def for_approver(self, approver_id: str, status: str = STATUS_PENDING, limit: int = 50) -> List[Dict[str, Any]]:
+        """Requests routed to an approver (department head or HR channel) in a given status."""
+        rows = self.db.connection().execute(
+            "SELECT * FROM leave_requests WHERE approver_id = ? AND status = ? ORDER BY created_at LIMIT ?",
+            (approver_id, status, limit)
+        )
+        return [dict(row) for row in rows]
+
+    def overlapping(self, start_date: str, end_date: str, status: Optional[str] = None,
+                    limit: int = 200, requester_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Requests whose dates intersect [start_date, end_date] (ISO dates), optionally for one requester."""
+        query = "SELECT * FROM leave_requests WHERE start_date <= ? AND end_date >= ?"
+        params: List[Any] = [end_date, start_date]
+        if requester_id:
+            query += " AND requester_id = ?"
+            params.append(requester_id)
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY start_date LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self.db.connection().execute(query, params)]
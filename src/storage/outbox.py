@@ -0,0 +1,329 @@
+"""
+Durable outbox for outbound Slack calls.
+
+Handlers record the Slack calls an interaction needs (approver notification,
+requester DM, chat_update) in SQLite before acknowledging Slack. A drainer
+thread in every gunicorn worker delivers them with retries and exponential
+backoff; calls that keep failing are moved to a dead-letter table. Rows
+claimed by a worker that dies are picked up again once their lease expires.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from slack_sdk.errors import SlackApiError
+
+from src.metrics import MetricsRegistry, registry as default_registry
+from src.storage.sqlite import SQLiteDatabase
+
+if TYPE_CHECKING:
+    from src.slack.scatter import ScatterGather
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    method TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    locked_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at);
+CREATE TABLE IF NOT EXISTS outbox_dead_letters (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    outbox_id INTEGER NOT NULL,
+    method TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    failed_at REAL NOT NULL
+);
+"""
+
+# Slack errors that will not succeed on retry
+PERMANENT_ERRORS = {
+    "channel_not_found",
+    "not_in_channel",
+    "is_archived",
+    "user_not_found",
+    "account_inactive",
+    "invalid_auth",
+    "not_authed",
+    "token_revoked",
+    "invalid_blocks",
+    "invalid_arguments",
+    "msg_too_long",
+    "message_not_found",
+    "cant_update_message",
+}
+
+# Refusals by this process's own client layers; the call never reached Slack
+LOCAL_REFUSALS = {"circuit_open", "ratelimited"}
+
+
+class OutboxMessage:
+    """A claimed outbox row."""
+
+    __slots__ = ("id", "method", "kwargs", "attempts", "created_at")
+
+    def __init__(self, id: int, method: str, kwargs: Dict[str, Any], attempts: int, created_at: float):
+        self.id = id
+        self.method = method
+        self.kwargs = kwargs
+        self.attempts = attempts
+        self.created_at = created_at
+
+
+class NotificationOutbox:
+    """Transactional record of pending Slack calls."""
+
+    def __init__(self, db: SQLiteDatabase, max_attempts: int = 8, base_backoff: float = 2.0,
+                 max_backoff: float = 300.0, lease_seconds: float = 60.0,
+                 metrics: Optional[MetricsRegistry] = None):
+        self.db = db
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.lease_seconds = lease_seconds
+        self.new_messages = threading.Event()
+        self._local = threading.local()
+        self.db.register_schema(SCHEMA)
+
+        metrics = metrics or default_registry
+        self._enqueued = metrics.counter("outbox.enqueued")
+        self._delivered = metrics.counter("outbox.delivered")
+        self._retried = metrics.counter("outbox.retried")
+        self._dead_lettered = metrics.counter("outbox.dead_lettered")
+        self._delivery_latency = metrics.timer("outbox.delivery_latency")
+        self._pending = metrics.gauge("outbox.pending")
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Collect every enqueue() in the block and write them in one transaction."""
+        if getattr(self._local, "batch", None) is not None:
+            # Nested batches join the outer one
+            yield
+            return
+        self._local.batch = []
+        try:
+            yield
+            calls = self._local.batch
+        finally:
+            self._local.batch = None
+        if calls:
+            self.enqueue_many(calls)
+
+    def enqueue(self, method: str, **kwargs: Any) -> Optional[int]:
+        """Record a Slack Web API call, e.g. enqueue("chat_postMessage", channel=..., text=...)."""
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            batch.append((method, kwargs))
+            return None
+        return self.enqueue_many([(method, kwargs)])[0]
+
+    def enqueue_many(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[int]:
+        """Record several calls atomically."""
+        now = time.time()
+        ids = []
+        with self.db.transaction() as connection:
+            for method, kwargs in calls:
+                cursor = connection.execute(
+                    "INSERT INTO outbox (method, payload, next_attempt_at, created_at) VALUES (?, ?, ?, ?)",
+                    (method, json.dumps(kwargs), now, now)
+                )
+                ids.append(cursor.lastrowid)
+        self._enqueued.inc(len(ids))
+        self.new_messages.set()
+        return ids
+
+    def claim(self, limit: int = 20) -> List[OutboxMessage]:
+        """Lease due messages to the calling worker."""
+        now = time.time()
+        with self.db.transaction() as connection:
+            rows = connection.execute(
+                """
+                SELECT id, method, payload, attempts, created_at FROM outbox
+                WHERE (status = 'pending' AND next_attempt_at <= ?)
+                   OR (status = 'in_flight' AND locked_until < ?)
+                ORDER BY id
+                LIMIT ?
+                """,
+                (now, now, limit)
+            ).fetchall()
+            if rows:
+                connection.executemany(
+                    "UPDATE outbox SET status = 'in_flight', locked_until = ? WHERE id = ?",
+                    [(now + self.lease_seconds, row["id"]) for row in rows]
+                )
+        return [
+            OutboxMessage(row["id"], row["method"], json.loads(row["payload"]), row["attempts"], row["created_at"])
+            for row in rows
+        ]
+
+    def mark_delivered(self, message: OutboxMessage) -> None:
+        with self.db.transaction() as connection:
+            connection.execute("DELETE FROM outbox WHERE id = ?", (message.id,))
+        self._delivered.inc()
+        self._delivery_latency.observe(max(0.0, time.time() - message.created_at))
+
+    def mark_failed(self, message: OutboxMessage, error: str, permanent: bool = False,
+                    retry_after: Optional[float] = None) -> None:
+        """Schedule a retry with exponential backoff, or dead-letter the message."""
+        attempts = message.attempts + 1
+        now = time.time()
+        with self.db.transaction() as connection:
+            if permanent or attempts >= self.max_attempts:
+                connection.execute(
+                    """
+                    INSERT INTO outbox_dead_letters
+                        (outbox_id, method, payload, attempts, last_error, created_at, failed_at)
+                    SELECT id, method, payload, ?, ?, created_at, ? FROM outbox WHERE id = ?
+                    """,
+                    (attempts, error, now, message.id)
+                )
+                connection.execute("DELETE FROM outbox WHERE id = ?", (message.id,))
+                dead = True
+            else:
+                delay = retry_after if retry_after is not None else self.backoff(attempts)
+                connection.execute(
+                    """
+                    UPDATE outbox SET status = 'pending', attempts = ?, next_attempt_at = ?,
+                        locked_until = NULL, last_error = ?
+                    WHERE id = ?
+                    """,
+                    (attempts, now + delay, error, message.id)
+                )
+                dead = False
+        if dead:
+            self._dead_lettered.inc()
+            logger.error(f"Outbox message {message.id} ({message.method}) dead-lettered after {attempts} attempts: {error}")
+        else:
+            self._retried.inc()
+            logger.warning(f"Outbox message {message.id} ({message.method}) failed, attempt {attempts}: {error}")
+
+    def release(self, message: OutboxMessage, delay: float) -> None:
+        """Put a claimed message back without counting an attempt, e.g. while Slack is known to be down."""
+        with self.db.transaction() as connection:
+            connection.execute(
+                "UPDATE outbox SET status = 'pending', next_attempt_at = ?, locked_until = NULL WHERE id = ?",
+                (time.time() + delay, message.id)
+            )
+
+    def backoff(self, attempts: int) -> float:
+        """Exponential backoff with +/-10% jitter."""
+        delay = min(self.max_backoff, self.base_backoff * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.9, 1.1)
+
+    def pending_count(self) -> int:
+        count = self.db.connection().execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+        self._pending.set(count)
+        return count
+
+    def dead_letter_count(self) -> int:
+        return self.db.connection().execute("SELECT COUNT(*) FROM outbox_dead_letters").fetchone()[0]
+
+
+class OutboxDrainer:
+    """Delivers outbox messages through a Slack client on a background thread.
+
+    With a ScatterGather, each claimed batch is delivered concurrently;
+    messages for the same channel still go out in the order they were recorded.
+    """
+
+    def __init__(self, outbox: NotificationOutbox, client: Any, batch_size: int = 20,
+                 poll_interval: float = 5.0, scatter: Optional["ScatterGather"] = None):
+        self.outbox = outbox
+        self.client = client
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.scatter = scatter
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def drain(self) -> int:
+        """Deliver every due message. Returns the number delivered."""
+        delivered = 0
+        while True:
+            messages = self.outbox.claim(self.batch_size)
+            if not messages:
+                break
+            if self.scatter is None:
+                delivered += self._deliver_in_order(messages)
+                continue
+            by_channel: Dict[Any, List[OutboxMessage]] = {}
+            for message in messages:
+                by_channel.setdefault(message.kwargs.get("channel"), []).append(message)
+            results = self.scatter.run({
+                f"outbox:{channel}": partial(self._deliver_in_order, group)
+                for channel, group in by_channel.items()
+            }, deadline=self.outbox.lease_seconds)
+            delivered += sum(result.value for result in results.values() if result.ok)
+        return delivered
+
+    def _deliver_in_order(self, messages: List[OutboxMessage]) -> int:
+        return sum(1 for message in messages if self.deliver(message))
+
+    def deliver(self, message: OutboxMessage) -> bool:
+        try:
+            getattr(self.client, message.method)(**message.kwargs)
+        except SlackApiError as e:
+            error = e.response.get("error", str(e)) if e.response is not None else str(e)
+            if error in LOCAL_REFUSALS and getattr(e.response, "status_code", None) is None:
+                # Slack is known to be down or the local rate limit queue is full;
+                # wait for a slot without using up attempts
+                self.outbox.release(message, max(getattr(e, "retry_after", 0.0), self.outbox.base_backoff))
+                return False
+            retry_after = None
+            if getattr(e.response, "status_code", None) == 429:
+                retry_after = float(e.response.headers.get("Retry-After", self.outbox.base_backoff))
+            self.outbox.mark_failed(message, error, permanent=error in PERMANENT_ERRORS, retry_after=retry_after)
+            return False
+        except Exception as e:
+            self.outbox.mark_failed(message, str(e))
+            return False
+        self.outbox.mark_delivered(message)
+        return True
+
+    def ensure_running(self) -> None:
+        """Start the drain thread for the current process if it is not running."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="outbox-drainer", daemon=True)
+            self._thread.start()
+            self._pid = pid
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopping.set()
+        self.outbox.new_messages.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._pid = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self.outbox.new_messages.clear()
+            try:
+                self.drain()
+            except Exception as e:
+                logger.error(f"Outbox drain failed: {str(e)}", exc_info=True)
+            self.outbox.new_messages.wait(self.poll_interval)
@@ -0,0 +1,83 @@
+"""
+SQLite connection management for the local data store.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+DEFAULT_DB_PATH = "slack_leave.db"
+
+
+def get_db_path() -> str:
+    """Return the database path configured for this deployment."""
+    return os.getenv("SLACK_LEAVE_DB_PATH", DEFAULT_DB_PATH)
+
+
+class SQLiteDatabase:
+    """Per-thread SQLite connections to a single WAL-mode database file.
+
+    Connections are opened lazily and re-opened after a fork, so the object
+    can be created at import time and shared by every gunicorn worker.
+    """
+
+    def __init__(self, path: Optional[str] = None, busy_timeout: float = 5.0):
+        self.path = path or get_db_path()
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schemas = []
+
+    def register_schema(self, statements: str) -> None:
+        """Register DDL that is applied to every new connection (idempotent)."""
+        with self._schema_lock:
+            if statements not in self._schemas:
+                self._schemas.append(statements)
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            connection.executescript(statements)
+
+    def connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                schemas = list(self._schemas)
+            for statements in schemas:
+                connection.executescript(statements)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block inside BEGIN IMMEDIATE ... COMMIT on this thread's connection."""
+        connection = self.connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
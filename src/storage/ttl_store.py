@@ -0,0 +1,87 @@
+"""
+Key-value store with per-entry expiry, shared by all workers through SQLite.
+"""
+
+import re
+import threading
+import time
+from typing import Optional
+
+from src.storage.sqlite import SQLiteDatabase
+
+_TABLE_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class SQLiteTTLStore:
+    """String values keyed by string, each expiring after its own TTL."""
+
+    def __init__(self, db: SQLiteDatabase, table: str, purge_every: int = 100):
+        if not _TABLE_NAME.match(table):
+            raise ValueError(f"Invalid table name: {table}")
+        self.db = db
+        self.table = table
+        self.purge_every = purge_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self.db.register_schema(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                expires_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_{table}_expires ON {table} (expires_at);
+        """)
+
+    def get(self, key: str) -> Optional[str]:
+        row = self.db.connection().execute(
+            f"SELECT value FROM {self.table} WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        return row["value"] if row else None
+
+    def contains(self, key: str) -> bool:
+        row = self.db.connection().execute(
+            f"SELECT 1 FROM {self.table} WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def put(self, key: str, value: Optional[str], ttl: float) -> None:
+        """Insert or replace an entry."""
+        self.db.connection().execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, time.time() + ttl)
+        )
+        self._after_write()
+
+    def add(self, key: str, value: Optional[str], ttl: float) -> bool:
+        """Insert an entry only if the key is absent or expired. Returns True if inserted."""
+        now = time.time()
+        with self.db.transaction() as connection:
+            connection.execute(f"DELETE FROM {self.table} WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = connection.execute(
+                f"INSERT OR IGNORE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + ttl)
+            )
+            inserted = cursor.rowcount == 1
+        self._after_write()
+        return inserted
+
+    def delete(self, key: str) -> None:
+        self.db.connection().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        self.db.connection().execute(f"DELETE FROM {self.table}")
+
+    def purge_expired(self) -> int:
+        cursor = self.db.connection().execute(
+            f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+    def _after_write(self) -> None:
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.purge_every == 0
+        if due:
+            self.purge_expired()
@@ -0,0 +1,14 @@
+"""
+Shared pytest configuration.
+"""
+import os
+import tempfile
+
+# Keep the SQLite store used by src.app out of the working tree during tests
+os.environ.setdefault(
+    "SLACK_LEAVE_DB_PATH",
+    os.path.join(tempfile.mkdtemp(prefix="slack-leave-tests-"), "slack_leave.db")
+)
+
+# The app's user directory would download the workspace from Slack in the background
+os.environ.setdefault("SLACK_USER_DIRECTORY", "false")
@@ -0,0 +1,66 @@
+"""
+Tests for signed approve/reject action tokens.
+"""
+import pytest
+from src.metrics import MetricsRegistry
+from src.slack.action_tokens import ActionTokenSigner, is_action_token
+
+DETAILS = {
+    "request_id": "abc123",
+    "requester_id": "U06MKKWAWJX",
+    "approver_id": "U06M5QCCLN9",
+    "leave_type": "Paid Time Off",
+    "start_date": "2024-03-20",
+    "end_date": "2024-03-22"
+}
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+@pytest.fixture
+def signer(metrics):
+    return ActionTokenSigner("test_secret", ttl=60, metrics=metrics)
+
+def test_round_trip(signer, metrics):
+    """Test that a token decodes to the details it was signed with."""
+    token = signer.sign(dict(DETAILS, channel_id="C123", message_ts="123.456"))
+
+    assert is_action_token(token)
+    assert len(token) < 200
+    assert signer.verify(token) == dict(DETAILS, channel_id="C123", message_ts="123.456")
+    assert metrics.snapshot()["action_tokens.verified"] == 1
+
+def test_missing_fields_decode_as_none(signer):
+    """Test that optional fields come back as None and end_date defaults to start_date."""
+    details = signer.verify(signer.sign({"requester_id": "U1", "start_date": "2024-03-20"}))
+
+    assert details["request_id"] is None
+    assert details["end_date"] == "2024-03-20"
+
+def test_tampered_token_is_rejected(signer, metrics):
+    """Test that changing the payload invalidates the signature."""
+    token = signer.sign(DETAILS)
+    forged = signer.sign(dict(DETAILS, requester_id="U999"))
+
+    # Payload of one token with the signature of another
+    assert signer.verify(f"v1.{forged.split('.')[1]}.{token.split('.')[2]}") is None
+    assert signer.verify(token[:-2]) is None
+    assert metrics.snapshot()["action_tokens.rejected"] == 2
+
+def test_token_from_another_secret_is_rejected(signer):
+    """Test that tokens only verify under the secret that signed them."""
+    assert signer.verify(ActionTokenSigner("other_secret").sign(DETAILS)) is None
+
+def test_expired_token_is_rejected(signer, metrics):
+    """Test that a token stops verifying after its TTL."""
+    token = signer.sign(DETAILS, now=1000)
+
+    assert signer.verify(token, now=1059) is not None
+    assert signer.verify(token, now=1061) is None
+    assert metrics.snapshot()["action_tokens.expired"] == 1
+
+@pytest.mark.parametrize("value", [None, "", "approve", "v1.", "v1.@@@.###", "v1.é.é", "v1.bm90IGpzb24.AAAA"])
+def test_malformed_values_are_rejected(signer, value):
+    """Test that garbage never raises."""
+    assert signer.verify(value) is None
@@ -9,7 +9,10 @@ from urllib.parse import urlencode
 
 @pytest.fixture
 def client():
-    from src.app import app
+    from src.app import app, request_verifier, idempotency
+    # Tests legitimately resend identical signed bodies within the same second
+    request_verifier.clear_replay_cache()
+    idempotency.clear()
     with app.test_client() as client:
         yield client
 
@@ -257,4 +260,119 @@ def test_invalid_signature(client):
         
     assert response.status_code == 401
     response_data = json.loads(response.data)
-    assert response_data["error"] == "Invalid request signature" 
\ No newline at end of file
+    assert response_data["error"] == "Invalid request signature" 
+
+def test_metrics_requires_token(client, monkeypatch):
+    """Test that the metrics endpoint is hidden unless a token is configured."""
+    monkeypatch.delenv('METRICS_TOKEN', raising=False)
+    assert client.get('/metrics').status_code == 404
+
+    monkeypatch.setenv('METRICS_TOKEN', 'secret')
+    assert client.get('/metrics').status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+
+    assert response.status_code == 200
+    assert "metrics" in json.loads(response.data)
+
+def test_replayed_request_rejected(client, slack_signature):
+    """Test that the same signed request is only accepted once."""
+    body = urlencode({'command': '/invalid', 'user_id': 'U123456', 'trigger_id': 'trigger123'})
+    headers = slack_signature(body)
+
+    first = client.post('/slack/commands', data=body, headers=headers)
+    second = client.post('/slack/commands', data=body, headers=headers)
+
+    assert first.status_code == 200
+    assert second.status_code == 401
+    assert json.loads(second.data)["error"] == "Request replayed"
+
+def test_interactivity_requires_signature(client):
+    """Test that interactive payloads are verified like commands."""
+    body = urlencode({"payload": json.dumps({"type": "block_actions"})})
+    headers = {
+        'X-Slack-Request-Timestamp': str(int(time.time())),
+        'X-Slack-Signature': 'v0=invalid_signature',
+        'Content-Type': 'application/x-www-form-urlencoded'
+    }
+
+    response = client.post('/slack/interactivity', data=body, headers=headers)
+
+    assert response.status_code == 401
+
+def test_duplicate_view_submission_runs_once(client, slack_signature):
+    """Test that a redelivered view submission reuses the first response."""
+    payload = {"type": "view_submission", "user": {"id": "U123456"}, "view": {"id": "V123", "callback_id": "leave_request_modal"}}
+    body = urlencode({"payload": json.dumps(payload)})
+
+    with patch('src.slack.slack_actions.SlackActionsHandler.handle_view_submission') as mock_handler:
+        mock_handler.return_value = {"response_action": "clear"}
+        first = client.post('/slack/interactivity', data=body, headers=slack_signature(body))
+        time.sleep(1)  # new timestamp, so the signature differs like a real Slack retry
+        retry_headers = slack_signature(body)
+        retry_headers['X-Slack-Retry-Num'] = '1'
+        second = client.post('/slack/interactivity', data=body, headers=retry_headers)
+
+    assert mock_handler.call_count == 1
+    assert json.loads(first.data) == json.loads(second.data)
+
+def test_corrected_view_submission_runs_again(client, slack_signature):
+    """Test that a resubmission of the same view after validation errors reaches the handler."""
+    payload = {"type": "view_submission", "user": {"id": "U123456"}, "view": {"id": "V123", "callback_id": "denial_reason_modal"}}
+    body = urlencode({"payload": json.dumps(payload)})
+
+    with patch('src.slack.slack_actions.SlackActionsHandler.handle_view_submission') as mock_handler:
+        mock_handler.side_effect = [
+            {"response_action": "errors", "errors": {"denial_reason_block": "Please provide a reason"}},
+            None
+        ]
+        first = client.post('/slack/interactivity', data=body, headers=slack_signature(body))
+        time.sleep(1)
+        second = client.post('/slack/interactivity', data=body, headers=slack_signature(body))
+
+    assert mock_handler.call_count == 2
+    assert json.loads(first.data)["response_action"] == "errors"
+    assert json.loads(second.data) == {}
+
+def test_refused_click_does_not_block_approver(client, slack_signature):
+    """Test that an unauthorized click on a request does not replay its refusal to the approver."""
+    def click(user_id):
+        payload = {
+            "type": "block_actions",
+            "user": {"id": user_id},
+            "actions": [{"action_id": "approve_leave", "action_ts": "111.222", "value": "{}"}],
+            "container": {"channel_id": "C1", "message_ts": "123.456"}
+        }
+        body = urlencode({"payload": json.dumps(payload)})
+        return client.post('/slack/interactivity', data=body, headers=slack_signature(body))
+
+    def handle_action(payload):
+        if payload["user"]["id"] != "U06M5QCCLN9":
+            return {"response_action": "errors", "errors": {"action": "You are not authorized to perform this action"}}
+        return {"response_action": "clear"}
+
+    with patch('src.slack.slack_actions.SlackActionsHandler.handle_action', side_effect=handle_action) as mock_handler:
+        refused = click("M456")
+        approved = click("U06M5QCCLN9")
+        time.sleep(1)  # a new signature, as for a real second click
+        double_click = click("U06M5QCCLN9")
+
+    assert json.loads(refused.data)["response_action"] == "errors"
+    assert json.loads(approved.data) == {}
+    assert json.loads(double_click.data) == {}
+    assert [call.args[0]["user"]["id"] for call in mock_handler.call_args_list] == ["M456", "U06M5QCCLN9"]
+
+def test_user_change_event_updates_directory(client, slack_signature):
+    """Test that user_change events are handed to the user directory."""
+    body = json.dumps({
+        "type": "event_callback",
+        "event": {"type": "user_change", "user": {"id": "U777", "name": "renamed", "updated": 42}}
+    })
+    headers = dict(slack_signature(body), **{'Content-Type': 'application/json'})
+
+    with patch('src.app.user_directory') as user_directory:
+        response = client.post('/slack/events', data=body, headers=headers)
+
+    assert response.status_code == 200
+    user_directory.apply_event.assert_called_once_with(
+        {"type": "user_change", "user": {"id": "U777", "name": "renamed", "updated": 42}}
+    )
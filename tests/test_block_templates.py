@@ -0,0 +1,56 @@
+"""
+Tests for precompiled Block Kit templates.
+"""
+import pytest
+from src.slack.block_templates import compile_blocks
+from src.slack.layouts import APPROVER_NOTIFICATION, REJECTION_UPDATE
+
+@pytest.fixture
+def template():
+    return compile_blocks(
+        {"type": "section", "text": {"type": "mrkdwn", "text": "Request from <@{user_id}>"}},
+        {"type": "divider"},
+        {"type": "context", "elements": [{"type": "mrkdwn", "text": "Static footer"}]}
+    )
+
+def test_render_fills_fields(template):
+    """Test that rendering substitutes the fields and keeps the static blocks."""
+    assert template.render(user_id="U123") == [
+        {"type": "section", "text": {"type": "mrkdwn", "text": "Request from <@U123>"}},
+        {"type": "divider"},
+        {"type": "context", "elements": [{"type": "mrkdwn", "text": "Static footer"}]}
+    ]
+    assert template.fields == {"user_id"}
+
+def test_static_blocks_are_shared(template):
+    """Test that static subtrees are reused across renders instead of rebuilt."""
+    first, second = template.render(user_id="U1"), template.render(user_id="U2")
+
+    assert first[1] is second[1] and first[2] is second[2]
+    assert first[0] is not second[0]
+
+def test_missing_field_raises(template):
+    """Test that a missing field is an error, not an empty string."""
+    with pytest.raises(KeyError):
+        template.render()
+
+@pytest.mark.parametrize("layout, values", [
+    (APPROVER_NOTIFICATION, {"user_id": "U1", "leave_type_display": "PTO", "start_date": "2024-03-20",
+                             "end_date": "2024-03-22", "coverage_person": "U2", "tasks": "Reviews",
+                             "reason": "Trip", "approve_value": "abc", "reject_value": "abc"}),
+    (REJECTION_UPDATE, {"requester_id": "U1", "leave_type": "PTO", "start_date": "2024-03-20",
+                        "end_date": "2024-03-22", "denial_reason": "No coverage"}),
+])
+def test_layouts_render_consistently(layout, values):
+    """Test that the shipped layouts render to the same blocks as formatting every string."""
+    def format_all(node):
+        if isinstance(node, str):
+            return node.format_map(values)
+        if isinstance(node, dict):
+            return {key: format_all(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [format_all(value) for value in node]
+        return node
+
+    assert layout.fields == set(values)
+    assert layout.render(**values) == format_all(layout.blocks)
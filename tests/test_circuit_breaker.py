@@ -0,0 +1,115 @@
+"""
+Tests for the Slack API circuit breaker.
+"""
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from urllib.error import URLError
+from slack_sdk.errors import SlackApiError
+from src.metrics import MetricsRegistry
+from src.slack.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakerClient,
+    CircuitGateClient,
+    CircuitOpenError
+)
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+@pytest.fixture
+def breaker(metrics):
+    return CircuitBreaker(window_size=4, min_calls=4, open_seconds=30, metrics=metrics)
+
+def trip(client, calls=4):
+    client.client.chat_postMessage.side_effect = URLError("timed out")
+    for _ in range(calls):
+        with pytest.raises(URLError):
+            client.chat_postMessage(channel="C123", text="Hi")
+
+def test_opens_on_error_rate_and_fails_fast(breaker, metrics):
+    """Test that repeated transport errors open the circuit."""
+    client = CircuitBreakerClient(MagicMock(), breaker, metrics=metrics)
+    trip(client)
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as error:
+        client.views_open(trigger_id="T123", view={})
+    assert error.value.response["error"] == "circuit_open"
+    client.client.views_open.assert_not_called()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["circuit.transitions.closed_to_open"] == 1
+    assert snapshot["circuit.state"] == 2
+    assert snapshot["circuit.rejected"] == 1
+
+def test_client_errors_do_not_open(breaker, metrics):
+    """Test that bad-request errors are not counted as Slack being down."""
+    client = CircuitBreakerClient(MagicMock(), breaker, metrics=metrics)
+    client.client.chat_postMessage.side_effect = SlackApiError("error", {"ok": False, "error": "channel_not_found"})
+    for _ in range(6):
+        with pytest.raises(SlackApiError):
+            client.chat_postMessage(channel="C123", text="Hi")
+
+    assert breaker.state == CLOSED
+
+def test_opens_on_slow_calls(metrics):
+    """Test that a window of slow calls opens the circuit."""
+    breaker = CircuitBreaker(window_size=4, min_calls=4, slow_call_seconds=1.0, slow_call_rate=0.75, metrics=metrics)
+    for _ in range(3):
+        breaker.record(False, 2.0)
+    breaker.record(False, 0.1)
+
+    assert breaker.state == OPEN
+
+def test_half_open_probe_closes_or_reopens(breaker, metrics):
+    """Test recovery through a single half-open probe."""
+    client = CircuitBreakerClient(MagicMock(), breaker, metrics=metrics)
+    trip(client)
+
+    with patch("src.slack.circuit_breaker.time.monotonic", return_value=breaker._opened_at + 31):
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow() is True
+        assert breaker.allow() is False  # only one probe at a time
+        breaker.record(True, 0.1)
+    assert breaker.state == OPEN
+
+    client.client.chat_postMessage.side_effect = None
+    with patch("src.slack.circuit_breaker.time.monotonic", return_value=breaker._opened_at + 31):
+        client.chat_postMessage(channel="C123", text="Hi")
+        assert breaker.state == CLOSED
+    assert metrics.snapshot()["circuit.transitions.half_open_to_closed"] == 1
+
+def test_notifications_are_deferred_to_outbox(breaker, metrics):
+    """Test that deferrable calls go to the outbox while the circuit is open."""
+    outbox = MagicMock()
+    outbox.enqueue.return_value = 7
+    client = CircuitBreakerClient(MagicMock(), breaker, outbox=outbox, metrics=metrics)
+    trip(client)
+
+    response = client.chat_postMessage(channel="C123", text="Later")
+
+    assert response == {"ok": True, "deferred": True, "outbox_id": 7}
+    outbox.enqueue.assert_called_once_with("chat_postMessage", channel="C123", text="Later")
+    assert metrics.snapshot()["circuit.deferred"] == 1
+
+def test_gate_refuses_before_outer_queues(breaker, metrics):
+    """Test that an open circuit is checked before the rate limiter and scheduler wrapped by the gate."""
+    inner = CircuitBreakerClient(MagicMock(), breaker, metrics=metrics)
+    trip(inner)
+    queued = MagicMock()
+    gate = CircuitGateClient(queued, breaker, metrics=metrics)
+
+    with pytest.raises(CircuitOpenError):
+        gate.views_open(trigger_id="T123", view={})
+    queued.views_open.assert_not_called()
+
+    # Half-open: the probe goes through the outer layers to the inner breaker
+    with patch("src.slack.circuit_breaker.time.monotonic", return_value=time.monotonic() + 31):
+        assert breaker.state == HALF_OPEN
+        gate.chat_postMessage(channel="C123", text="Probe")
+    queued.chat_postMessage.assert_called_once()
@@ -0,0 +1,68 @@
+"""
+Tests for the slash command text parser.
+"""
+import pytest
+from datetime import date
+from src.slack.command_parser import parse_command_text, resolve_date
+
+# A Wednesday
+TODAY = date(2026, 11, 4)
+
+@pytest.mark.parametrize("phrase, expected", [
+    ("today", date(2026, 11, 4)),
+    ("Tomorrow", date(2026, 11, 5)),
+    ("fri", date(2026, 11, 6)),
+    ("wed", date(2026, 11, 4)),
+    ("next fri", date(2026, 11, 6)),
+    ("next wed", date(2026, 11, 11)),
+    ("2026-12-24", date(2026, 12, 24)),
+    ("someday", None),
+])
+def test_resolve_date(phrase, expected):
+    """Test that date phrases resolve relative to today."""
+    assert resolve_date(phrase, TODAY) == expected
+
+def test_full_request():
+    """Test that type, range, coverage and reason are all picked up."""
+    fields = parse_command_text("pto 2026-11-03..2026-11-05 cover:<@U123|kuro> Family trip", today=TODAY)
+
+    assert fields == {
+        "leave_type": "pto",
+        "leave_type_display": "PTO",
+        "start_date": "2026-11-03",
+        "end_date": "2026-11-05",
+        "coverage_person": "U123",
+        "reason": "Family trip"
+    }
+
+def test_single_day_phrase():
+    """Test that a single date is both start and end."""
+    fields = parse_command_text("sick today", today=TODAY)
+
+    assert fields == {"leave_type": "sick_emergency", "leave_type_display": "Sick/Emergency",
+                      "start_date": "2026-11-04", "end_date": "2026-11-04"}
+
+def test_range_with_phrases():
+    """Test ranges written with 'to' and multi-word phrases."""
+    fields = parse_command_text("holiday tomorrow to next fri", today=TODAY)
+
+    assert (fields["start_date"], fields["end_date"]) == ("2026-11-05", "2026-11-06")
+
+def test_to_without_a_date_is_reason():
+    """Test that 'to' not followed by a date stays part of the reason."""
+    fields = parse_command_text("pto fri to visit family...", today=TODAY)
+
+    assert fields["end_date"] == "2026-11-06"
+    assert fields["reason"] == "to visit family..."
+
+def test_unescaped_cover_is_ignored():
+    """Test that a cover: name without a user ID is left for the form."""
+    fields = parse_command_text("pto today cover:@kuro", today=TODAY)
+
+    assert "coverage_person" not in fields
+    assert "reason" not in fields
+
+def test_backwards_range_is_rejected():
+    """Test that a range ending before it starts is an error."""
+    with pytest.raises(ValueError):
+        parse_command_text("pto 2026-11-05..2026-11-03", today=TODAY)
@@ -0,0 +1,91 @@
+"""
+Tests for the adaptive (AIMD) outbound concurrency limit.
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web import SlackResponse
+from src.metrics import MetricsRegistry
+from src.slack.circuit_breaker import CircuitOpenError
+from src.slack.concurrency import AdaptiveScheduler
+from src.slack.scheduler import PrioritizedClient
+
+def rate_limited_error():
+    response = SlackResponse(
+        client=None, http_verb="POST", api_url="https://slack.com/api/chat.postMessage",
+        req_args={}, data={"ok": False, "error": "ratelimited"},
+        headers={"Retry-After": "1"}, status_code=429
+    )
+    return SlackApiError("ratelimited", response)
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+@pytest.fixture
+def scheduler(metrics):
+    return AdaptiveScheduler(initial_limit=4, min_limit=1, max_limit=8, latency_target=1.0, metrics=metrics)
+
+def busy_success(scheduler):
+    """A fast call made while every slot is in use."""
+    held = scheduler.limit
+    for _ in range(held):
+        scheduler.acquire()
+    scheduler.observe(0.1)
+    for _ in range(held):
+        scheduler.release()
+
+def test_additive_increase_while_busy(scheduler, metrics):
+    """Test that fast calls grow the limit by about one per round of calls."""
+    for _ in range(5):
+        busy_success(scheduler)
+    assert scheduler.limit == 5
+
+    for _ in range(100):
+        busy_success(scheduler)
+    assert scheduler.limit == 8
+    assert metrics.snapshot()["scheduler.limit"] == 8
+
+def test_no_increase_when_idle(scheduler):
+    """Test that the limit does not grow while it isn't being used."""
+    for _ in range(20):
+        with scheduler.slot():
+            scheduler.observe(0.1)
+    assert scheduler.limit == 4
+
+def test_multiplicative_decrease_on_429(scheduler, metrics):
+    """Test that a 429 halves the limit, once per latency target."""
+    scheduler.observe(0.1, rate_limited_error())
+    scheduler.observe(0.1, rate_limited_error())
+    assert scheduler.limit == 2
+
+    with patch("src.slack.concurrency.time.monotonic", return_value=10**9):
+        scheduler.observe(0.1, rate_limited_error())
+    assert scheduler.limit == 1
+    assert metrics.snapshot()["scheduler.limit_decreases"] == 2
+
+def test_slow_calls_decrease_limit(scheduler):
+    """Test that calls over the latency target shrink the limit gently."""
+    scheduler._limit = 8.0
+    scheduler.max_concurrent = 8
+    scheduler.observe(2.5)
+    assert scheduler.limit == 7
+
+def test_circuit_open_is_ignored(scheduler):
+    """Test that locally refused calls don't count as fast successes."""
+    for _ in range(10):
+        with scheduler.slot():
+            with scheduler.slot():
+                scheduler.observe(0.0, CircuitOpenError(retry_after=5))
+    assert scheduler.limit == 4
+
+def test_client_reports_outcomes(scheduler):
+    """Test that the prioritized client feeds call outcomes to the scheduler."""
+    client = MagicMock()
+    client.chat_postMessage.side_effect = rate_limited_error()
+
+    with pytest.raises(SlackApiError):
+        PrioritizedClient(client, scheduler).chat_postMessage(channel="C123", text="Hi")
+
+    assert scheduler.limit == 2
+    assert scheduler.in_flight == 0
@@ -0,0 +1,64 @@
+"""
+Tests for the bounded background executor.
+"""
+import threading
+import pytest
+from src.metrics import MetricsRegistry
+from src.slack.executor import BoundedExecutor
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+def test_submit_runs_task_in_background(metrics):
+    """Test that submitted tasks run on a worker thread."""
+    executor = BoundedExecutor(max_workers=1, max_queue=10, name="test", metrics=metrics)
+    done = threading.Event()
+    ran_on = []
+
+    def task():
+        ran_on.append(threading.current_thread().name)
+        done.set()
+
+    assert executor.submit(task) is True
+    assert done.wait(2)
+    executor.shutdown()
+
+    assert ran_on == ["test-0"]
+    snapshot = metrics.snapshot()
+    assert snapshot["test.completed"] == 1
+    assert snapshot["test.wait_time"]["count"] == 1
+
+def test_full_queue_runs_inline(metrics):
+    """Test that a full queue falls back to running the task in the caller."""
+    executor = BoundedExecutor(max_workers=1, max_queue=1, name="test", metrics=metrics)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(2)
+
+    executor.submit(blocker)
+    assert started.wait(2)
+    executor.submit(lambda: None)  # fills the queue
+
+    ran_inline = []
+    assert executor.submit(lambda: ran_inline.append(threading.current_thread().name)) is False
+    release.set()
+    executor.shutdown()
+
+    assert ran_inline == [threading.current_thread().name]
+    assert metrics.snapshot()["test.caller_runs"] == 1
+
+def test_failed_task_is_counted(metrics):
+    """Test that exceptions in tasks are logged and counted, not raised."""
+    executor = BoundedExecutor(max_workers=1, max_queue=10, name="test", metrics=metrics)
+
+    def failing():
+        raise RuntimeError("boom")
+
+    executor.submit(failing)
+    executor.shutdown()
+
+    assert metrics.snapshot()["test.failed"] == 1
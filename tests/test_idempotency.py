@@ -0,0 +1,78 @@
+"""
+Tests for the idempotency store.
+"""
+import pytest
+from src.metrics import MetricsRegistry
+from src.storage.sqlite import SQLiteDatabase
+from src.storage.idempotency import IdempotencyStore, interaction_key, command_key
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+@pytest.fixture
+def store(tmp_path, metrics):
+    return IdempotencyStore(SQLiteDatabase(str(tmp_path / "idempotency.db")), ttl=60, metrics=metrics)
+
+def test_duplicate_returns_cached_response(store, metrics):
+    """Test that the handler runs once and duplicates get its response."""
+    calls = []
+
+    def handler():
+        calls.append(1)
+        return {"response_action": "clear"}
+
+    assert store.run("view:V1", handler) == {"response_action": "clear"}
+    assert store.run("view:V1", handler, retry_num="1") == {"response_action": "clear"}
+    assert len(calls) == 1
+    snapshot = metrics.snapshot()
+    assert snapshot["idempotency.hits"] == 1
+    assert snapshot["idempotency.slack_retries"] == 1
+
+def test_shared_across_store_instances(tmp_path):
+    """Test that keys are visible to other workers using the same database."""
+    path = str(tmp_path / "shared.db")
+    first = IdempotencyStore(SQLiteDatabase(path), ttl=60)
+    second = IdempotencyStore(SQLiteDatabase(path), ttl=60)
+
+    first.run("trigger:T1", lambda: {"ok": True})
+    assert second.run("trigger:T1", lambda: {"ok": False}) == {"ok": True}
+
+def test_failed_handler_can_be_retried(store):
+    """Test that a key is released when the handler raises."""
+    def failing():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        store.run("trigger:T2", failing)
+    assert store.run("trigger:T2", lambda: {"ok": True}) == {"ok": True}
+
+def test_validation_errors_are_not_cached(store):
+    """Test that a resubmission after validation errors runs the handler again."""
+    errors = {"response_action": "errors", "errors": {"date_block": "Please select a start date"}}
+    assert store.run("view:V4", lambda: errors) == errors
+    assert store.run("view:V4", lambda: {"response_action": "clear"}) == {"response_action": "clear"}
+    assert store.run("view:V4", lambda: errors) == {"response_action": "clear"}
+
+def test_expired_key_runs_again(tmp_path):
+    """Test that entries expire after the TTL."""
+    store = IdempotencyStore(SQLiteDatabase(str(tmp_path / "ttl.db")), ttl=0)
+    store.run("trigger:T3", lambda: {"n": 1})
+    assert store.run("trigger:T3", lambda: {"n": 2}) == {"n": 2}
+
+def test_interaction_keys():
+    """Test the keys derived from Slack payloads."""
+    assert interaction_key({"type": "view_submission", "view": {"id": "V123"}}) == "view:V123"
+    assert interaction_key({
+        "type": "block_actions",
+        "user": {"id": "U1"},
+        "actions": [{"action_id": "approve_leave", "action_ts": "111.222"}],
+        "container": {"channel_id": "C1", "message_ts": "123.456"}
+    }) == "approve:C1:123.456:U1"
+    assert interaction_key({
+        "type": "block_actions",
+        "user": {"id": "U1"},
+        "actions": [{"action_id": "reject_leave", "action_ts": "111.222"}]
+    }) == "action:111.222:U1"
+    assert command_key({"trigger_id": "T9"}) == "trigger:T9"
+    assert command_key({}) is None
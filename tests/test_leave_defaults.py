@@ -0,0 +1,42 @@
+"""
+Tests for per-user leave form defaults.
+"""
+import pytest
+from src.slack.models import LeaveRequest
+from src.storage.sqlite import SQLiteDatabase
+from src.storage.leave_defaults import LeaveDefaultsStore
+
+@pytest.fixture
+def store(tmp_path):
+    return LeaveDefaultsStore(SQLiteDatabase(str(tmp_path / "leave.db")))
+
+def submit(store, leave_type, coverage_person="U2", tasks="Reviews", user_id="U1"):
+    store.record(LeaveRequest(user_id=user_id, leave_type=leave_type, start_date="2024-03-20",
+                              coverage_person=coverage_person, tasks=tasks, reason="Trip"))
+
+def test_unknown_user_has_no_defaults(store):
+    """Test that a user without submissions gets an empty form."""
+    assert store.get("U1") == {}
+
+def test_last_coverage_and_tasks_are_kept(store):
+    """Test that the latest coverage person and tasks replace earlier ones."""
+    submit(store, "pto", coverage_person="U2", tasks="Reviews")
+    submit(store, "pto", coverage_person="U3", tasks="On-call")
+
+    assert store.get("U1") == {"coverage_person": "U3", "tasks": "On-call", "leave_type": "pto"}
+
+def test_most_used_leave_type_wins(store):
+    """Test that the leave type is the most used one, ties going to the latest."""
+    submit(store, "pto")
+    submit(store, "pto")
+    submit(store, "sick_emergency")
+    assert store.get("U1")["leave_type"] == "pto"
+
+    submit(store, "sick_emergency")
+    assert store.get("U1")["leave_type"] == "sick_emergency"
+
+def test_defaults_are_per_user(store):
+    """Test that one user's submissions do not prefill another's form."""
+    submit(store, "holiday", user_id="U1")
+
+    assert store.get("U2") == {}
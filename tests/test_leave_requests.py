@@ -0,0 +1,82 @@
+"""
+Tests for the leave request store.
+"""
+import pytest
+from src.storage.sqlite import SQLiteDatabase
+from src.storage.leave_requests import LeaveRequestStore, STATUS_APPROVED, STATUS_DENIED, STATUS_PENDING
+
+@pytest.fixture
+def db(tmp_path):
+    return SQLiteDatabase(str(tmp_path / "leave.db"))
+
+@pytest.fixture
+def store(db):
+    return LeaveRequestStore(db)
+
+def test_create_and_get(store):
+    """Test that a created request is pending and round-trips its fields."""
+    request_id = store.create("U1", "pto", "2024-03-20", "2024-03-22", approver_id="U9",
+                              leave_type_display="PTO", coverage_person="U2", tasks="Reviews", reason="Trip")
+
+    record = store.get(request_id)
+    assert record["status"] == STATUS_PENDING
+    assert record["requester_id"] == "U1"
+    assert record["leave_type_display"] == "PTO"
+    assert record["end_date"] == "2024-03-22"
+    assert store.get("missing") is None
+    assert len(request_id) == 12
+
+def test_end_date_defaults_to_start_date(store):
+    """Test that single-day requests store the start date as the end date."""
+    record = store.get(store.create("U1", "pto", "2024-03-20"))
+    assert record["end_date"] == "2024-03-20"
+
+def test_attach_message_only_once(store):
+    """Test that a request is bound to the first notification it was seen on."""
+    request_id = store.create("U1", "pto", "2024-03-20")
+    store.attach_message(request_id, "C1", "1.1")
+    store.attach_message(request_id, "C2", "2.2")
+
+    assert store.get_by_message("C1", "1.1")["id"] == request_id
+    assert store.get_by_message("C2", "2.2") is None
+
+def test_decide_is_compare_and_set(store):
+    """Test that a request can only be decided once."""
+    request_id = store.create("U1", "pto", "2024-03-20")
+
+    assert store.decide(request_id, STATUS_DENIED, "U9", "No coverage") is True
+    assert store.decide(request_id, STATUS_APPROVED, "U8") is False
+
+    record = store.get(request_id)
+    assert record["status"] == STATUS_DENIED
+    assert record["decided_by"] == "U9"
+    assert record["denial_reason"] == "No coverage"
+
+def test_decide_rejects_unknown_status(store):
+    """Test that only approve/deny are valid decisions."""
+    request_id = store.create("U1", "pto", "2024-03-20")
+    with pytest.raises(ValueError):
+        store.decide(request_id, STATUS_PENDING, "U9")
+
+def test_queries_by_requester_approver_and_dates(store):
+    """Test the indexed lookups used instead of scanning Slack messages."""
+    first = store.create("U1", "pto", "2024-03-01", "2024-03-05", approver_id="U9")
+    second = store.create("U1", "sick", "2024-04-10", approver_id="U9")
+    other = store.create("U2", "pto", "2024-03-04", "2024-03-08", approver_id="U8")
+    store.decide(second, STATUS_APPROVED, "U9")
+
+    assert [r["id"] for r in store.for_requester("U1")] == [second, first]
+    assert [r["id"] for r in store.for_requester("U1", status=STATUS_PENDING)] == [first]
+    assert [r["id"] for r in store.for_approver("U9")] == [first]
+    assert [r["id"] for r in store.overlapping("2024-03-05", "2024-03-06")] == [first, other]
+    assert store.overlapping("2024-05-01", "2024-05-02") == []
+
+@pytest.mark.parametrize("query, params", [
+    ("SELECT * FROM leave_requests WHERE requester_id = ? ORDER BY start_date DESC", ("U1",)),
+    ("SELECT * FROM leave_requests WHERE approver_id = ? AND status = ?", ("U9", "pending")),
+    ("SELECT * FROM leave_requests WHERE channel_id = ? AND message_ts = ?", ("C1", "1.1")),
+])
+def test_lookups_use_an_index(store, db, query, params):
+    """Test that the hot lookups are served by an index, not a table scan."""
+    plan = " ".join(row[-1] for row in db.connection().execute(f"EXPLAIN QUERY PLAN {query}", params))
+    assert "USING INDEX" in plan or "USING COVERING INDEX" in plan
@@ -0,0 +1,77 @@
+"""
+Tests for the private_metadata codec.
+"""
+import json
+import pytest
+from src.metrics import MetricsRegistry
+from src.slack.metadata import MAX_LENGTH, MetadataCodec
+from src.storage.sqlite import SQLiteDatabase
+from src.storage.ttl_store import SQLiteTTLStore
+
+METADATA = {
+    "requester_id": "U06MKKWAWJX",
+    "channel_id": "C1234567890",
+    "message_ts": "1234567890.123456",
+    "leave_type": "Paid Time Off",
+    "start_date": "2024-03-20",
+    "end_date": "2024-03-22"
+}
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+@pytest.fixture
+def codec(tmp_path, metrics):
+    store = SQLiteTTLStore(SQLiteDatabase(str(tmp_path / "metadata.db")), "modal_metadata")
+    return MetadataCodec(store, spill_ttl=60, metrics=metrics)
+
+def test_round_trip_is_smaller_than_json(codec):
+    """Test that packed metadata decodes to the original and is shorter than plain JSON."""
+    packed = codec.encode(METADATA)
+
+    assert codec.decode(packed) == METADATA
+    assert len(packed) < len(json.dumps(METADATA)) * 2 / 3
+
+def test_single_day_and_missing_fields(codec):
+    """Test that end_date defaults to start_date and absent fields stay absent."""
+    packed = codec.encode({"requester_id": "U1", "start_date": "2024-03-20", "end_date": "2024-03-20"})
+
+    assert packed == 'm1:["U1",null,null,null,"2024-03-20"]'
+    assert codec.decode(packed) == {"requester_id": "U1", "start_date": "2024-03-20", "end_date": "2024-03-20"}
+
+def test_extra_fields_round_trip(codec):
+    """Test that fields outside the packed layout are carried as well."""
+    metadata = dict(METADATA, request_id="abc", note="Needs HR review")
+    assert codec.decode(codec.encode(metadata)) == metadata
+
+def test_oversized_metadata_spills(codec, metrics):
+    """Test that metadata over Slack's limit is stored server-side behind a short key."""
+    metadata = dict(METADATA, leave_type="Extended " * 400)
+
+    encoded = codec.encode(metadata)
+
+    assert encoded.startswith("m1~") and len(encoded) < 40
+    assert codec.decode(encoded) == metadata
+    assert metrics.snapshot()["metadata.spilled"] == 1
+
+def test_expired_spill_raises(codec, metrics):
+    """Test that a spilled entry that is gone is reported as invalid metadata."""
+    encoded = codec.encode(dict(METADATA, leave_type="x" * MAX_LENGTH))
+    codec.spill_store.clear()
+
+    with pytest.raises(ValueError):
+        codec.decode(encoded)
+    assert metrics.snapshot()["metadata.spill_misses"] == 1
+
+def test_oversized_without_store_raises(metrics):
+    """Test that the codec refuses to produce metadata Slack would reject."""
+    with pytest.raises(ValueError):
+        MetadataCodec(metrics=metrics).encode(dict(METADATA, leave_type="x" * MAX_LENGTH))
+
+def test_legacy_json_is_decoded(codec):
+    """Test that modals opened before the codec still submit."""
+    assert codec.decode(json.dumps(METADATA)) == METADATA
+    assert codec.decode("") == {}
+    with pytest.raises(ValueError):
+        codec.decode("m1:{}")
@@ -0,0 +1,37 @@
+"""
+Tests for the in-process metrics registry.
+"""
+import pytest
+from src.metrics import MetricsRegistry
+
+def test_counter_and_gauge():
+    """Test that counters accumulate and gauges track the latest value."""
+    metrics = MetricsRegistry()
+    metrics.counter("requests").inc()
+    metrics.counter("requests").inc(2)
+    metrics.gauge("depth").set(5)
+    metrics.gauge("depth").dec()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"] == 3
+    assert snapshot["depth"] == 4
+
+def test_timer_snapshot():
+    """Test that timers report count, total, max and average."""
+    metrics = MetricsRegistry()
+    timer = metrics.timer("latency")
+    timer.observe(0.5)
+    timer.observe(1.5)
+
+    snapshot = metrics.snapshot()["latency"]
+    assert snapshot["count"] == 2
+    assert snapshot["total"] == 2.0
+    assert snapshot["max"] == 1.5
+    assert snapshot["avg"] == 1.0
+
+def test_metric_type_conflict():
+    """Test that a name cannot be reused for a different metric type."""
+    metrics = MetricsRegistry()
+    metrics.counter("calls")
+    with pytest.raises(TypeError):
+        metrics.gauge("calls")
@@ -0,0 +1,109 @@
+"""
+Tests for cached modal templates.
+"""
+import json
+import os
+import pytest
+from src.metrics import MetricsRegistry
+from src.slack.modal_templates import CachedModal
+
+FALLBACK = {
+    "type": "modal",
+    "callback_id": "fallback",
+    "blocks": [
+        {"type": "input", "block_id": "date_block", "element": {"type": "datepicker", "action_id": "start_date"}},
+        {"type": "input", "block_id": "reason_block", "element": {"type": "plain_text_input", "action_id": "reason"}}
+    ]
+}
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+def write_view(path, callback_id, mtime):
+    path.write_text(json.dumps({"type": "modal", "callback_id": callback_id, "blocks": []}))
+    os.utime(path, (mtime, mtime))
+
+def test_missing_file_uses_fallback(tmp_path, metrics):
+    """Test that the fallback is served when the template file does not exist."""
+    modal = CachedModal(tmp_path / "modal.json", FALLBACK, metrics=metrics)
+
+    assert modal.view()["callback_id"] == "fallback"
+    assert metrics.counter("modal_template.reloads").value == 0
+
+def test_initial_date_is_injected_per_request(tmp_path, metrics):
+    """Test that date pickers get the request's date without touching the cached view."""
+    modal = CachedModal(tmp_path / "modal.json", FALLBACK, metrics=metrics)
+
+    view = modal.view(today="2024-03-20")
+
+    assert view["blocks"][0]["element"]["initial_date"] == "2024-03-20"
+    assert view["blocks"][1] is FALLBACK["blocks"][1]
+    assert "initial_date" not in FALLBACK["blocks"][0]["element"]
+    assert modal.view(today="2024-03-21")["blocks"][0]["element"]["initial_date"] == "2024-03-21"
+
+def test_file_is_parsed_once(tmp_path, metrics):
+    """Test that the file is not read again while its mtime is unchanged."""
+    path = tmp_path / "modal.json"
+    write_view(path, "from_file", 1000)
+    modal = CachedModal(path, FALLBACK, check_interval=0, metrics=metrics)
+
+    for _ in range(3):
+        assert modal.view()["callback_id"] == "from_file"
+
+    assert metrics.counter("modal_template.reloads").value == 1
+
+def test_changed_file_is_reloaded(tmp_path, metrics):
+    """Test that a new mtime reloads the view."""
+    path = tmp_path / "modal.json"
+    write_view(path, "v1", 1000)
+    modal = CachedModal(path, FALLBACK, check_interval=0, metrics=metrics)
+
+    write_view(path, "v2", 2000)
+
+    assert modal.view()["callback_id"] == "v2"
+    assert metrics.counter("modal_template.reloads").value == 2
+
+def test_invalid_file_keeps_last_view(tmp_path, metrics):
+    """Test that a broken edit does not replace the last good view."""
+    path = tmp_path / "modal.json"
+    write_view(path, "v1", 1000)
+    modal = CachedModal(path, FALLBACK, check_interval=0, metrics=metrics)
+
+    path.write_text("{not json")
+    os.utime(path, (2000, 2000))
+
+    assert modal.view()["callback_id"] == "v1"
+    assert metrics.counter("modal_template.reload_errors").value == 1
+
+def test_mtime_is_not_checked_within_interval(tmp_path, metrics):
+    """Test that the file is only stat'ed once per check interval."""
+    path = tmp_path / "modal.json"
+    write_view(path, "v1", 1000)
+    modal = CachedModal(path, FALLBACK, check_interval=3600, metrics=metrics)
+
+    write_view(path, "v2", 2000)
+
+    assert modal.view()["callback_id"] == "v1"
+
+def test_initial_values_prefill_inputs(tmp_path, metrics):
+    """Test that defaults are set on the matching inputs, with select options matched exactly."""
+    fallback = {
+        "type": "modal",
+        "blocks": [
+            {"type": "input", "element": {"type": "static_select", "action_id": "leave_type",
+                                          "options": [{"text": {"type": "plain_text", "text": "PTO"}, "value": "pto"}]}},
+            {"type": "input", "element": {"type": "users_select", "action_id": "coverage_person"}},
+            {"type": "input", "element": {"type": "plain_text_input", "action_id": "tasks"}},
+            {"type": "input", "element": {"type": "plain_text_input", "action_id": "reason"}}
+        ]
+    }
+    modal = CachedModal(tmp_path / "modal.json", fallback, metrics=metrics)
+
+    blocks = modal.view(initial_values={"leave_type": "pto", "coverage_person": "U2", "tasks": "Reviews"})["blocks"]
+
+    assert blocks[0]["element"]["initial_option"] == fallback["blocks"][0]["element"]["options"][0]
+    assert blocks[1]["element"]["initial_user"] == "U2"
+    assert blocks[2]["element"]["initial_value"] == "Reviews"
+    assert blocks[3] is fallback["blocks"][3]
+    assert "initial_option" not in modal.view(initial_values={"leave_type": "retired"})["blocks"][0]["element"]
@@ -0,0 +1,46 @@
+"""
+Tests for the typed values parsed from Slack payloads.
+"""
+import pytest
+from src.slack.models import LeaveRequest, parse_leave_request
+
+VALUES = {
+    "leave_type_block": {"leave_type": {"selected_option": {"text": {"type": "plain_text", "text": "PTO"}, "value": "pto"}}},
+    "date_block": {"start_date": {"selected_date": "2024-03-20"}},
+    "end_date_block": {"end_date": {"selected_date": "2024-03-22"}},
+    "coverage_block": {"coverage_person": {"selected_user": "U456"}},
+    "tasks_block": {"tasks": {"value": "Reviews"}},
+    "reason_block": {"reason": {"value": "Trip"}}
+}
+
+def test_parse_complete_form():
+    """Test that a complete form parses into a LeaveRequest."""
+    leave_request = parse_leave_request("U123", VALUES)
+
+    assert leave_request == LeaveRequest("U123", "pto", "2024-03-20", "2024-03-22", leave_type_display="PTO",
+                                         coverage_person="U456", tasks="Reviews", reason="Trip")
+
+def test_missing_fields_return_errors_by_block():
+    """Test that every missing field is reported against its block."""
+    values = {key: value for key, value in VALUES.items() if key not in ("date_block", "reason_block")}
+
+    assert parse_leave_request("U123", values) == {
+        "date_block": "Please select a start date",
+        "reason_block": "Please provide a reason"
+    }
+
+def test_end_date_optional_when_not_required():
+    """Test that the end date defaults to the start date for forms without one."""
+    values = {key: value for key, value in VALUES.items() if key != "end_date_block"}
+
+    assert "end_date_block" in parse_leave_request("U123", values)
+    assert parse_leave_request("U123", values, require_end_date=False).end_date == "2024-03-20"
+
+def test_leave_request_is_slotted():
+    """Test that LeaveRequest carries no per-instance dict."""
+    leave_request = LeaveRequest("U123", "pto", "2024-03-20")
+
+    assert not hasattr(leave_request, "__dict__")
+    with pytest.raises(AttributeError):
+        leave_request.unknown = True
+    assert leave_request.leave_type_display == "pto"
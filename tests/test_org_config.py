@@ -0,0 +1,99 @@
+"""
+Tests for the hot-reloadable org config.
+"""
+import json
+import os
+import pytest
+from src.config import organization
+from src.config import org_config
+from src.config.org_config import OrgConfigWatcher, build_directory
+from src.metrics import MetricsRegistry
+
+CONFIG = {
+    "departments": {
+        "Engineering": {"head": "H1", "members": ["M1", "M2"]},
+        "Platform": {"head": "H2", "members": ["M3"], "reports_to": "H1"}
+    },
+    "admins": ["A1"],
+    "hr_channel_id": "C_HR"
+}
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+@pytest.fixture
+def restore_organization(monkeypatch):
+    """Undo install_directory's changes to the module after the test."""
+    for name in ("DEPARTMENTS", "DEPARTMENT_HEADS", "DEPARTMENT_STRUCTURE", "ADMIN_USERS", "HR_CHANNEL_ID",
+                 "DELEGATIONS", "_directory"):
+        monkeypatch.setattr(organization, name, getattr(organization, name))
+
+def write_config(path, config, mtime):
+    path.write_text(json.dumps(config))
+    os.utime(path, (mtime, mtime))
+
+def test_reload_installs_new_directory(tmp_path, metrics, restore_organization):
+    """Test that a changed file replaces the org chart used by the lookups."""
+    path = tmp_path / "org.json"
+    write_config(path, CONFIG, 1000)
+    watcher = OrgConfigWatcher(str(path), metrics=metrics)
+
+    assert watcher.reload() is True
+    assert organization.get_department_head("M3") == "H2"
+    assert organization.get_hr_channel_id() == "C_HR"
+    assert organization.is_admin("A1") is True
+    assert organization.DEPARTMENT_STRUCTURE["H1"]["team_members"] == ["M1", "M2"]
+
+    # Unchanged file: nothing to do
+    assert watcher.reload() is False
+
+    moved = json.loads(json.dumps(CONFIG))
+    moved["departments"]["Platform"]["members"].append("M4")
+    write_config(path, moved, 2000)
+    assert watcher.reload() is True
+    assert organization.get_department_head("M4") == "H2"
+    assert metrics.counter("org_config.reloads").value == 2
+
+def test_missing_hr_channel_falls_back_to_default(tmp_path, metrics, restore_organization):
+    """Test that a file without hr_channel_id gets the startup channel, not the previous file's."""
+    path = tmp_path / "org.json"
+    write_config(path, CONFIG, 1000)
+    watcher = OrgConfigWatcher(str(path), metrics=metrics)
+    assert watcher.reload() is True
+    assert organization.get_hr_channel_id() == "C_HR"
+
+    write_config(path, {key: value for key, value in CONFIG.items() if key != "hr_channel_id"}, 2000)
+    assert watcher.reload() is True
+    assert organization.get_hr_channel_id() == org_config.DEFAULT_HR_CHANNEL_ID != "C_HR"
+
+def test_invalid_file_keeps_current_directory(tmp_path, metrics, restore_organization):
+    """Test that a bad edit is rejected and the previous org chart stays in place."""
+    path = tmp_path / "org.json"
+    write_config(path, CONFIG, 1000)
+    watcher = OrgConfigWatcher(str(path), metrics=metrics)
+    watcher.reload()
+    directory = organization.get_directory()
+
+    path.write_text("{not json")
+    os.utime(path, (2000, 2000))
+
+    assert watcher.reload() is False
+    assert organization.get_directory() is directory
+    assert metrics.counter("org_config.reload_errors").value == 1
+
+@pytest.mark.parametrize("departments, message", [
+    ({"A": {"head": "H1", "members": ["M1"]}, "B": {"head": "H2", "members": ["M1"]}}, "different heads"),
+    ({"A": {"head": "H1", "members": ["M1"], "reports_to": "H9"}}, "heads no department"),
+    ({"A": {"head": "H1", "members": ["H2"]}, "B": {"head": "H2", "members": ["H1"]}}, "cycle"),
+    ({"A": {"head": "H1", "members": [], "reports_to": "H1"}}, "cycle"),
+])
+def test_inconsistent_org_chart_is_rejected(departments, message):
+    """Test duplicate membership, unknown heads and reporting cycles."""
+    with pytest.raises(ValueError, match=message):
+        build_directory({"departments": departments, "admins": ["A1"]})
+
+def test_config_requires_admins():
+    """Test that a config locking everyone out of approvals is rejected."""
+    with pytest.raises(ValueError):
+        build_directory({"departments": CONFIG["departments"], "admins": []})
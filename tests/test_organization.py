@@ -7,7 +7,11 @@ from src.config.organization import (
     get_department_head,
     get_department_name,
     HR_CHANNEL_ID,
-    DEPARTMENTS
+    DEPARTMENTS,
+    DEPARTMENT_STRUCTURE,
+    OrgDirectory,
+    get_directory,
+    is_admin
 )
 
 @pytest.fixture
@@ -57,4 +61,68 @@ def test_get_department_head_with_self_as_team_member():
     # Test case: Dabyll (U06PNMDFVQW) is both department head and team member
     # Nikko (U07UV1KFBR7) is a team member
     dept_head_id = get_department_head("U07UV1KFBR7")
-    assert dept_head_id == "U06PNMDFVQW", "Department head should be found even if they are listed as a team member" 
\ No newline at end of file
+    assert dept_head_id == "U06PNMDFVQW", "Department head should be found even if they are listed as a team member" 
+
+def test_directory_is_built_once():
+    """Test that lookups share one precomputed directory until the structure is replaced."""
+    assert get_directory() is get_directory()
+
+def test_directory_follows_replaced_structure(mock_department_structure):
+    """Test that replacing DEPARTMENTS rebuilds the directory."""
+    assert get_directory().departments is mock_department_structure
+    assert get_department_name("U06MKKWAWJX") is None
+
+def test_directory_lookups():
+    """Test the directory's member, head and department tables."""
+    directory = OrgDirectory({
+        "Engineering": {"head": "H1", "members": ["M1", "M2", "H1"]},
+        "Platform": {"head": "H2", "members": ["M3", "H1"]}
+    }, ["A1"])
+
+    assert directory.head_of == {"M1": "H1", "M2": "H1", "M3": "H2"}
+    assert directory.department_of["H1"] == "Engineering"
+    assert directory.team_members("H1") == {"M1", "M2"}
+    assert directory.team_members("H2") == {"M3", "H1"}
+    assert directory.team_members("M1") == frozenset()
+    assert directory.admins == {"A1"}
+
+@pytest.mark.parametrize("departments", [
+    {"Engineering": {"members": ["M1"]}},
+    {"Engineering": {"head": "H1", "members": "M1"}},
+    {"Engineering": {"head": "H1", "members": ["M1", None]}},
+])
+def test_directory_rejects_invalid_structure(departments):
+    """Test that a malformed department structure fails at load instead of at routing time."""
+    with pytest.raises(ValueError):
+        OrgDirectory(departments, [])
+
+def test_department_structure_matches_departments():
+    """Test that the head-keyed structure is derived from DEPARTMENTS."""
+    for head, info in DEPARTMENT_STRUCTURE.items():
+        assert DEPARTMENTS[info["department"]]["head"] == head
+        assert all(get_department_head(member) == head for member in info["team_members"])
+
+def test_is_admin():
+    """Test admin lookup."""
+    assert is_admin("U06M5QCCLN9") is True
+    assert is_admin("U06MKKWAWJX") is False
+
+def test_approval_scope():
+    """Test that heads decide only their team and reporting heads, delegates act for their heads, admins for all."""
+    directory = OrgDirectory({
+        "Engineering": {"head": "H1", "members": ["M1", "H2"]},
+        "Platform": {"head": "H2", "members": ["M2"]},
+        "Sales": {"head": "H3", "members": ["M3"]}
+    }, ["A1"], delegations={"D1": ["H2"]})
+
+    assert directory.can_decide("H1", "M1") and directory.can_decide("H1", "H2")
+    assert not directory.can_decide("H1", "M2")
+    assert directory.can_decide("H2", "M2") and not directory.can_decide("H2", "M3")
+    assert directory.can_decide("D1", "M2") and not directory.can_decide("D1", "M1")
+    assert directory.can_decide("A1", "M3")
+    assert not directory.can_decide("M1", "M2")
+
+def test_delegation_to_unknown_head_is_rejected():
+    """Test that delegations must come from department heads."""
+    with pytest.raises(ValueError):
+        OrgDirectory({"Engineering": {"head": "H1", "members": ["M1"]}}, ["A1"], delegations={"D1": ["M1"]})
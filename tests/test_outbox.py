@@ -0,0 +1,133 @@
+"""
+Tests for the durable notification outbox.
+"""
+import time
+import pytest
+from unittest.mock import MagicMock
+from slack_sdk.errors import SlackApiError
+from src.metrics import MetricsRegistry
+from src.storage.sqlite import SQLiteDatabase
+from src.slack.circuit_breaker import CircuitOpenError
+from src.slack.rate_limiter import RateLimitedClient, RateLimiter
+from src.slack.scatter import ScatterGather
+from src.storage.outbox import NotificationOutbox, OutboxDrainer
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+@pytest.fixture
+def outbox(tmp_path, metrics):
+    return NotificationOutbox(SQLiteDatabase(str(tmp_path / "outbox.db")), base_backoff=0.01, metrics=metrics)
+
+def test_drain_delivers_messages(outbox, metrics):
+    """Test that queued calls are delivered and removed."""
+    client = MagicMock()
+    outbox.enqueue("chat_postMessage", channel="U123", text="Hello")
+
+    delivered = OutboxDrainer(outbox, client).drain()
+
+    assert delivered == 1
+    client.chat_postMessage.assert_called_once_with(channel="U123", text="Hello")
+    assert outbox.pending_count() == 0
+    assert metrics.snapshot()["outbox.delivered"] == 1
+
+def test_batch_is_written_atomically(outbox):
+    """Test that a batch records nothing until it completes."""
+    with pytest.raises(RuntimeError):
+        with outbox.batch():
+            outbox.enqueue("chat_update", channel="C1", ts="1.2", text="Updated")
+            raise RuntimeError("handler failed")
+    assert outbox.pending_count() == 0
+
+    with outbox.batch():
+        outbox.enqueue("chat_update", channel="C1", ts="1.2", text="Updated")
+        outbox.enqueue("chat_postMessage", channel="U1", text="Approved")
+    assert outbox.pending_count() == 2
+
+def test_transient_failure_is_retried(outbox, metrics):
+    """Test that a failed delivery is rescheduled with backoff."""
+    client = MagicMock()
+    client.chat_postMessage.side_effect = [
+        SlackApiError("error", {"ok": False, "error": "internal_error"}),
+        {"ok": True}
+    ]
+    outbox.enqueue("chat_postMessage", channel="U123", text="Hello")
+    drainer = OutboxDrainer(outbox, client)
+
+    assert drainer.drain() == 0
+    assert outbox.pending_count() == 1
+    time.sleep(0.05)
+    assert drainer.drain() == 1
+    assert metrics.snapshot()["outbox.retried"] == 1
+
+def test_permanent_failure_is_dead_lettered(outbox):
+    """Test that permanent Slack errors go straight to the dead-letter table."""
+    client = MagicMock()
+    client.chat_postMessage.side_effect = SlackApiError("error", {"ok": False, "error": "channel_not_found"})
+    outbox.enqueue("chat_postMessage", channel="C404", text="Hello")
+
+    OutboxDrainer(outbox, client).drain()
+
+    assert outbox.pending_count() == 0
+    assert outbox.dead_letter_count() == 1
+
+def test_expired_lease_is_reclaimed(outbox):
+    """Test that messages claimed by a crashed worker are delivered again."""
+    outbox.lease_seconds = 0
+    outbox.enqueue("chat_postMessage", channel="U123", text="Hello")
+    assert len(outbox.claim()) == 1  # claimed, then the worker "dies"
+
+    time.sleep(0.01)
+    client = MagicMock()
+    assert OutboxDrainer(outbox, client).drain() == 1
+    client.chat_postMessage.assert_called_once()
+
+def test_scattered_drain_keeps_channel_order(outbox):
+    """Test that concurrent delivery preserves order within a channel."""
+    client = MagicMock()
+    outbox.enqueue_many([
+        ("chat_update", {"channel": "C1", "ts": "1.0", "text": "first"}),
+        ("chat_postMessage", {"channel": "U2", "text": "dm"}),
+        ("chat_postMessage", {"channel": "C1", "text": "second"}),
+    ])
+    scatter = ScatterGather(max_workers=2, metrics=MetricsRegistry())
+
+    delivered = OutboxDrainer(outbox, client, scatter=scatter).drain()
+    scatter.shutdown()
+
+    assert delivered == 3
+    channel_calls = [call for call in client.method_calls if call.kwargs.get("channel") == "C1"]
+    assert [call.kwargs["text"] for call in channel_calls] == ["first", "second"]
+    assert outbox.pending_count() == 0
+
+def test_open_circuit_does_not_use_attempts(outbox):
+    """Test that deliveries refused by an open circuit are retried without counting attempts."""
+    client = MagicMock()
+    client.chat_postMessage.side_effect = CircuitOpenError(retry_after=30)
+    outbox.enqueue("chat_postMessage", channel="U123", text="Hello")
+
+    assert OutboxDrainer(outbox, client).drain() == 0
+
+    row = outbox.db.connection().execute("SELECT status, attempts, next_attempt_at FROM outbox").fetchone()
+    assert row["status"] == "pending"
+    assert row["attempts"] == 0
+    assert row["next_attempt_at"] > time.time() + 25
+
+def test_local_rate_limit_does_not_use_attempts(tmp_path, metrics):
+    """Test that messages refused by the local rate limiter wait for a slot instead of being dead-lettered."""
+    outbox = NotificationOutbox(SQLiteDatabase(str(tmp_path / "limited.db")), max_attempts=2,
+                                base_backoff=0.01, metrics=metrics)
+    slack = MagicMock()
+    client = RateLimitedClient(slack, RateLimiter(share=1 / 9, max_wait=0.1, metrics=metrics), metrics=metrics)
+    for n in range(6):
+        outbox.enqueue("chat_postMessage", channel="C_HR", text=f"request {n}")
+
+    drainer = OutboxDrainer(outbox, client)
+    delivered = drainer.drain() + drainer.drain()
+
+    assert 0 < delivered < 6
+    assert outbox.dead_letter_count() == 0
+    rows = outbox.db.connection().execute("SELECT status, attempts FROM outbox").fetchall()
+    assert len(rows) == 6 - delivered
+    assert all(row["status"] == "pending" and row["attempts"] == 0 for row in rows)
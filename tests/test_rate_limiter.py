@@ -0,0 +1,105 @@
+"""
+Tests for outbound Slack rate limiting.
+"""
+import contextvars
+import pytest
+from unittest.mock import MagicMock, patch
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web import SlackResponse
+from src.metrics import MetricsRegistry
+from src.slack.rate_limiter import TokenBucket, RateLimiter, RateLimitedClient
+
+def rate_limited_error(retry_after="2"):
+    response = SlackResponse(
+        client=None, http_verb="POST", api_url="https://slack.com/api/chat.postMessage",
+        req_args={}, data={"ok": False, "error": "ratelimited"},
+        headers={"Retry-After": retry_after}, status_code=429
+    )
+    return SlackApiError("ratelimited", response)
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+def test_token_bucket_queues_reservations():
+    """Test that reservations beyond the burst wait in arrival order."""
+    bucket = TokenBucket(rate=1.0, capacity=2)
+    waits = [bucket.reserve() for _ in range(4)]
+
+    assert waits[0] == 0 and waits[1] == 0
+    assert 0.9 < waits[2] <= 1.0
+    assert 1.9 < waits[3] <= 2.0
+
+def test_token_bucket_pause():
+    """Test that a pause delays every reservation."""
+    bucket = TokenBucket(rate=10.0, capacity=5)
+    bucket.pause(3)
+    assert bucket.reserve() > 2.9
+
+def test_post_message_uses_channel_bucket(metrics):
+    """Test that chat.postMessage is limited per method and per channel."""
+    limiter = RateLimiter(metrics=metrics)
+    names = [name for name, _ in limiter.buckets_for("chat.postMessage", {"channel": "C123"})]
+    assert names == ["chat.postMessage", "channel:C123"]
+    assert [name for name, _ in limiter.buckets_for("views.open", {})] == ["views.open"]
+
+def test_client_retries_after_429(metrics):
+    """Test that a 429 pauses the buckets and the call is retried."""
+    client = MagicMock()
+    client.chat_postMessage.side_effect = [rate_limited_error("2"), {"ok": True}]
+    limited = RateLimitedClient(client, RateLimiter(metrics=metrics))
+
+    with patch("src.slack.rate_limiter.time.sleep") as sleep:
+        assert limited.chat_postMessage(channel="C123", text="Hi") == {"ok": True}
+
+    assert client.chat_postMessage.call_count == 2
+    assert sleep.call_args[0][0] > 1.9
+    assert metrics.snapshot()["rate_limit.channel:C123.throttled"] == 1
+
+def test_client_rejects_when_queue_too_deep(metrics):
+    """Test that calls fail with ratelimited instead of waiting past max_wait."""
+    client = MagicMock()
+    limited = RateLimitedClient(client, RateLimiter(share=0.01, max_wait=1.0, metrics=metrics))
+
+    for _ in range(3):  # the per-channel burst
+        limited.chat_postMessage(channel="C123", text="Hi")
+    with pytest.raises(SlackApiError) as error:
+        limited.chat_postMessage(channel="C123", text="Hi")
+
+    assert error.value.response["error"] == "ratelimited"
+    assert client.chat_postMessage.call_count == 3
+
+def test_non_rate_limit_errors_propagate(metrics):
+    """Test that other Slack errors are raised unchanged."""
+    client = MagicMock()
+    client.chat_update.side_effect = SlackApiError("error", {"ok": False, "error": "channel_not_found"})
+    limited = RateLimitedClient(client, RateLimiter(metrics=metrics))
+
+    with pytest.raises(SlackApiError):
+        limited.chat_update(channel="C123", ts="1.2", text="Hi")
+    assert client.chat_update.call_count == 1
+
+def test_trigger_call_does_not_wait_past_its_budget(metrics):
+    """Test that views.open with an exhausted bucket fails as an expired trigger instead of queueing."""
+    from src.slack.scheduler import mark_trigger_received
+
+    client = MagicMock()
+    limited = RateLimitedClient(client, RateLimiter(share=0.01, max_wait=20.0, metrics=metrics),
+                                trigger_budget=2.5, metrics=metrics)
+
+    def open_views():
+        mark_trigger_received()
+        for _ in range(20):  # the views.open burst
+            limited.views_open(trigger_id="T1", view={})
+        with patch("src.slack.rate_limiter.time.sleep") as sleep:
+            with pytest.raises(SlackApiError) as error:
+                limited.views_open(trigger_id="T1", view={})
+        sleep.assert_not_called()
+        return error.value
+
+    # A context of its own, so the trigger mark does not leak into other tests
+    error = contextvars.copy_context().run(open_views)
+
+    assert error.response["error"] == "expired_trigger_id"
+    assert client.views_open.call_count == 20
+    assert metrics.snapshot()["rate_limit.trigger_expired"] == 1
@@ -0,0 +1,64 @@
+"""
+Tests for scatter-gather execution of independent Slack calls.
+"""
+import threading
+import time
+import pytest
+from slack_sdk.errors import SlackApiError
+from src.metrics import MetricsRegistry
+from src.slack.scatter import ScatterGather, run_serially
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+@pytest.fixture
+def scatter(metrics):
+    scatter = ScatterGather(max_workers=4, deadline=2.0, metrics=metrics)
+    yield scatter
+    scatter.shutdown()
+
+def test_calls_run_concurrently(scatter):
+    """Test that total latency is the slowest call, not the sum."""
+    barrier = threading.Barrier(3, timeout=2)
+
+    def call(value):
+        barrier.wait()
+        return value
+
+    started = time.monotonic()
+    results = scatter.run({"a": lambda: call(1), "b": lambda: call(2), "c": lambda: call(3)})
+
+    assert time.monotonic() - started < 1.0
+    assert [name for name in results] == ["a", "b", "c"]
+    assert [result.value for result in results.values()] == [1, 2, 3]
+
+def test_errors_are_collected_per_call(scatter, metrics):
+    """Test that one failing call does not affect the others."""
+    def fail():
+        raise SlackApiError("error", {"ok": False, "error": "channel_not_found"})
+
+    results = scatter.run({"update": fail, "dm": lambda: {"ok": True}})
+
+    assert not results["update"].ok
+    assert isinstance(results["update"].error, SlackApiError)
+    assert results["dm"].ok and results["dm"].value == {"ok": True}
+    assert metrics.snapshot()["scatter.failures"] == 1
+
+def test_deadline_reports_stragglers(scatter, metrics):
+    """Test that calls still running at the deadline are reported as timeouts."""
+    release = threading.Event()
+    results = scatter.run({"slow": lambda: release.wait(5), "fast": lambda: "done"}, deadline=0.1)
+    release.set()
+
+    assert isinstance(results["slow"].error, TimeoutError)
+    assert results["fast"].value == "done"
+    assert metrics.snapshot()["scatter.timeouts"] == 1
+
+def test_run_serially_matches_results():
+    """Test the serial fallback used with the outbox."""
+    order = []
+    results = run_serially({"a": lambda: order.append("a"), "b": lambda: order.append("b")})
+
+    assert order == ["a", "b"]
+    assert all(result.ok for result in results.values())
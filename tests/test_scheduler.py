@@ -0,0 +1,86 @@
+"""
+Tests for prioritized admission of outbound Slack calls.
+"""
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from slack_sdk.errors import SlackApiError
+from src.metrics import MetricsRegistry
+from src.slack.scheduler import (
+    PRIORITY_NORMAL,
+    PRIORITY_TRIGGER,
+    PriorityScheduler,
+    PrioritizedClient,
+    mark_trigger_received
+)
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+def test_trigger_calls_are_admitted_first(metrics):
+    """Test that a waiting trigger-bound call overtakes earlier notifications."""
+    scheduler = PriorityScheduler(max_concurrent=1, metrics=metrics)
+    order = []
+    scheduler.acquire(PRIORITY_NORMAL)
+
+    def waiter(priority, name):
+        with scheduler.slot(priority):
+            order.append(name)
+
+    threads = [threading.Thread(target=waiter, args=(PRIORITY_NORMAL, "notification"))]
+    threads[0].start()
+    while metrics.snapshot()["scheduler.waiting"] < 1:
+        time.sleep(0.01)
+    threads.append(threading.Thread(target=waiter, args=(PRIORITY_TRIGGER, "views_open")))
+    threads[1].start()
+    while metrics.snapshot()["scheduler.waiting"] < 2:
+        time.sleep(0.01)
+
+    scheduler.release()
+    for thread in threads:
+        thread.join(2)
+
+    assert order == ["views_open", "notification"]
+    assert scheduler.in_flight == 0
+
+def test_acquire_times_out(metrics):
+    """Test that a waiter gives up after its timeout and leaves the queue."""
+    scheduler = PriorityScheduler(max_concurrent=1, metrics=metrics)
+    scheduler.acquire()
+
+    with pytest.raises(TimeoutError):
+        scheduler.acquire(PRIORITY_TRIGGER, timeout=0.05)
+
+    assert metrics.snapshot()["scheduler.waiting"] == 0
+    scheduler.release()
+    with scheduler.slot():
+        assert scheduler.in_flight == 1
+
+def test_spent_trigger_budget_fails_fast(metrics):
+    """Test that views_open is not sent once the trigger would have expired."""
+    client = MagicMock()
+    prioritized = PrioritizedClient(client, PriorityScheduler(metrics=metrics), trigger_budget=2.5, metrics=metrics)
+    mark_trigger_received(time.monotonic() - 3)
+
+    with pytest.raises(SlackApiError) as error:
+        prioritized.views_open(trigger_id="T123", view={})
+
+    assert error.value.response["error"] == "expired_trigger_id"
+    client.views_open.assert_not_called()
+    assert metrics.snapshot()["scheduler.trigger_expired"] == 1
+
+def test_calls_pass_through(metrics):
+    """Test that calls within budget reach the client and free their slot."""
+    client = MagicMock()
+    client.views_open.return_value = {"ok": True}
+    scheduler = PriorityScheduler(metrics=metrics)
+    prioritized = PrioritizedClient(client, scheduler, metrics=metrics)
+    mark_trigger_received()
+
+    assert prioritized.views_open(trigger_id="T123", view={}) == {"ok": True}
+    prioritized.chat_postMessage(channel="C123", text="Hi")
+
+    assert scheduler.in_flight == 0
+    assert metrics.snapshot()["scheduler.trigger.wait"]["count"] == 1
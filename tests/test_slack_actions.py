@@ -1,8 +1,13 @@
 """
 Tests for the Slack actions handler.
 """
+import threading
 import pytest
 from unittest.mock import patch, MagicMock
+from src.metrics import MetricsRegistry
+from src.slack.metadata import decode_metadata
+from src.slack.models import LeaveRequest
+from src.slack.scatter import ScatterGather
 from src.slack.slack_actions import SlackActionsHandler
 import json
 from slack_sdk.errors import SlackApiError
@@ -659,4 +664,487 @@ def test_handle_view_submission_denial_modal_missing_metadata_fields(slack_actio
         "errors": {
             "submission": "Invalid request data. Please try again."
         }
-    }
\ No newline at end of file
+    }
+
+def test_ack_first_approval_is_queued(mock_slack_client):
+    """Test that ack-first mode acknowledges before calling Slack."""
+    executor = MagicMock()
+    handler = SlackActionsHandler(mock_slack_client, executor=executor)
+    payload = {
+        "type": "block_actions",
+        "user": {"id": "U06M5QCCLN9"},
+        "actions": [{"action_id": "approve_leave"}],
+        "container": {"message_ts": "123.456", "channel_id": "C123"},
+        "message": {
+            "blocks": [{
+                "type": "section",
+                "fields": [
+                    {"type": "mrkdwn", "text": "*Requester:*\n<@U06MKKWAWJX>"},
+                    {"type": "mrkdwn", "text": "*Type:*\nPTO"},
+                    {"type": "mrkdwn", "text": "*Duration:*\n2024-03-20 to 2024-03-22"},
+                    {"type": "mrkdwn", "text": "*Coverage:*\n<@U456>"}
+                ]
+            }]
+        }
+    }
+
+    result = handler.handle_action(payload)
+
+    assert result == {"response_action": "clear"}
+    mock_slack_client.chat_update.assert_not_called()
+    executor.submit.assert_called_once()
+    assert executor.submit.call_args[0][0] == handler._handle_approval
+
+def test_ack_first_leave_request_validates_inline(mock_slack_client):
+    """Test that ack-first mode still returns validation errors synchronously."""
+    executor = MagicMock()
+    handler = SlackActionsHandler(mock_slack_client, executor=executor)
+    payload = {
+        "type": "view_submission",
+        "user": {"id": "U06MKKWAWJX"},
+        "view": {"callback_id": "leave_request_modal", "state": {"values": {}}}
+    }
+
+    result = handler.handle_view_submission(payload)
+
+    assert result["response_action"] == "errors"
+    executor.submit.assert_not_called()
+
+def test_ack_first_denial_is_queued(mock_slack_client):
+    """Test that a valid denial submission is queued and the modal closes."""
+    executor = MagicMock()
+    handler = SlackActionsHandler(mock_slack_client, executor=executor)
+    payload = {
+        "view": {
+            "callback_id": "denial_modal",
+            "private_metadata": json.dumps({
+                "requester_id": "U123",
+                "channel_id": "C123",
+                "message_ts": "123.456"
+            }),
+            "state": {"values": {"denial_reason": {"denial_reason_input": {"value": "No coverage"}}}}
+        }
+    }
+
+    assert handler.handle_view_submission(payload) == {}
+    mock_slack_client.chat_update.assert_not_called()
+    executor.submit.assert_called_once_with(handler._process_rejection, payload)
+
+def test_outbox_records_approval_calls(mock_slack_client):
+    """Test that approvals are recorded in the outbox instead of sent inline."""
+    outbox = MagicMock()
+    handler = SlackActionsHandler(mock_slack_client, outbox=outbox)
+    payload = {"user": {"id": "U06M5QCCLN9"}}
+    request_details = {
+        "channel_id": "C123",
+        "message_ts": "123.456",
+        "requester_id": "U06MKKWAWJX",
+        "leave_type": "PTO",
+        "start_date": "2024-03-20"
+    }
+
+    handler._queue_approval_processing(payload, request_details)
+
+    outbox.batch.assert_called_once()
+    methods = [call[0][0] for call in outbox.enqueue.call_args_list]
+    assert methods == ["chat_update", "chat_postMessage"]
+    mock_slack_client.chat_update.assert_not_called()
+
+def test_approval_calls_are_scattered(mock_slack_client):
+    """Test that the message update and requester DM run concurrently."""
+    scatter = ScatterGather(max_workers=2, metrics=MetricsRegistry())
+    handler = SlackActionsHandler(mock_slack_client, scatter=scatter)
+    barrier = threading.Barrier(2, timeout=2)
+    mock_slack_client.chat_update.side_effect = lambda **kwargs: barrier.wait()
+    mock_slack_client.chat_postMessage.side_effect = lambda **kwargs: barrier.wait()
+    request_details = {
+        "channel_id": "C123",
+        "message_ts": "123.456",
+        "requester_id": "U06MKKWAWJX",
+        "leave_type": "PTO",
+        "start_date": "2024-03-20"
+    }
+
+    assert handler._handle_approval({"user": {"id": "U06M5QCCLN9"}}, request_details) is True
+    scatter.shutdown()
+
+def test_approval_fails_when_update_fails(mock_slack_client):
+    """Test that a failed message update is reported even though the DM was sent."""
+    handler = SlackActionsHandler(mock_slack_client, scatter=ScatterGather(metrics=MetricsRegistry()))
+    mock_slack_client.chat_update.side_effect = SlackApiError("Error", {"error": "message_not_found"})
+    request_details = {
+        "channel_id": "C123",
+        "message_ts": "123.456",
+        "requester_id": "U06MKKWAWJX",
+        "leave_type": "PTO",
+        "start_date": "2024-03-20"
+    }
+
+    assert handler._handle_approval({"user": {"id": "U06M5QCCLN9"}}, request_details) is False
+    mock_slack_client.chat_postMessage.assert_called_once()
+
+def test_rejection_modal_expired_trigger_prompts_reopen(mock_slack_client):
+    """Test that an expired trigger sends the approver an ephemeral re-open button."""
+    handler = SlackActionsHandler(mock_slack_client)
+    mock_slack_client.views_open.side_effect = SlackApiError("Error", {"error": "expired_trigger_id"})
+    payload = {
+        "type": "block_actions",
+        "user": {"id": "U06M5QCCLN9"},
+        "trigger_id": "trigger123",
+        "actions": [{"action_id": "reject_leave"}],
+        "container": {"message_ts": "123.456", "channel_id": "C123"},
+        "message": {
+            "blocks": [{
+                "type": "section",
+                "fields": [
+                    {"type": "mrkdwn", "text": "*Requester:*\n<@U06MKKWAWJX>"},
+                    {"type": "mrkdwn", "text": "*Type:*\nPTO"},
+                    {"type": "mrkdwn", "text": "*Duration:*\n2024-03-20 to 2024-03-22"},
+                    {"type": "mrkdwn", "text": "*Coverage:*\n<@U456>"}
+                ]
+            }]
+        }
+    }
+
+    assert handler.handle_action(payload) == {"response_action": "clear"}
+
+    kwargs = mock_slack_client.chat_postEphemeral.call_args.kwargs
+    assert kwargs["channel"] == "C123" and kwargs["user"] == "U06M5QCCLN9"
+    button = kwargs["blocks"][1]["elements"][0]
+    assert button["action_id"] == "reopen_denial_modal"
+
+    # Clicking the button opens the modal with the new trigger
+    mock_slack_client.views_open.side_effect = None
+    reopen = {
+        "type": "block_actions",
+        "user": {"id": "U06M5QCCLN9"},
+        "trigger_id": "trigger456",
+        "actions": [{"action_id": "reopen_denial_modal", "value": button["value"]}],
+        "container": {"type": "message", "is_ephemeral": True}
+    }
+    assert handler.handle_action(reopen) == {"response_action": "clear"}
+
+    kwargs = mock_slack_client.views_open.call_args.kwargs
+    assert kwargs["trigger_id"] == "trigger456"
+    metadata = decode_metadata(kwargs["view"]["private_metadata"])
+    assert metadata["requester_id"] == "U06MKKWAWJX"
+    assert metadata["message_ts"] == "123.456"
+
+def test_stored_request_is_decided_once(mock_slack_client, tmp_path):
+    """Test that buttons carry the stored request ID and a second decision is refused."""
+    from src.storage.sqlite import SQLiteDatabase
+    from src.storage.leave_requests import LeaveRequestStore, STATUS_APPROVED
+
+    store = LeaveRequestStore(SQLiteDatabase(str(tmp_path / "leave.db")))
+    handler = SlackActionsHandler(mock_slack_client, store=store)
+    request_id = store.create("U06MKKWAWJX", "pto", "2024-03-20", "2024-03-22", leave_type_display="PTO")
+
+    handler._process_leave_request(LeaveRequest("U06MKKWAWJX", "pto", "2024-03-20", leave_type_display="PTO"), request_id)
+    button = next(
+        block["elements"][0]
+        for call in mock_slack_client.chat_postMessage.call_args_list
+        for block in call.kwargs.get("blocks", [])
+        if block["type"] == "actions"
+    )
+    assert button["value"] == request_id
+
+    # No message blocks needed: the request is looked up by ID
+    payload = {
+        "type": "block_actions",
+        "user": {"id": "U06M5QCCLN9"},
+        "actions": [{"action_id": "approve_leave", "value": button["value"]}],
+        "container": {"type": "message", "message_ts": "123.456", "channel_id": "C123"}
+    }
+    assert handler.handle_action(payload) == {"response_action": "clear"}
+    record = store.get(request_id)
+    assert record["status"] == STATUS_APPROVED
+    assert record["message_ts"] == "123.456"
+
+    result = handler.handle_action(payload)
+    assert result["response_action"] == "errors"
+
+@pytest.mark.parametrize("date_fields", [
+    [{"type": "mrkdwn", "text": "*Duration:*\n2024-03-20 to 2024-03-22"}],
+    [{"type": "mrkdwn", "text": "*Start Date:*\n2024-03-20"}, {"type": "mrkdwn", "text": "*End Date:*\n2024-03-22"}],
+])
+def test_extract_request_details_by_label(slack_actions, date_fields):
+    """Test that legacy notifications are parsed by field label, whichever date layout they use."""
+    message = {
+        "container": {"channel_id": "C123", "message_ts": "123.456"},
+        "blocks": [
+            {"type": "header", "text": {"type": "plain_text", "text": "New Leave Request"}},
+            {"type": "section", "fields": [
+                {"type": "mrkdwn", "text": "*Type:*\nPTO"},
+                {"type": "mrkdwn", "text": "*Requester:*\n<@U06MKKWAWJX>"}
+            ]},
+            {"type": "section", "fields": date_fields}
+        ]
+    }
+
+    details = slack_actions._extract_request_details(message)
+
+    assert details == {
+        "requester_id": "U06MKKWAWJX",
+        "channel_id": "C123",
+        "message_ts": "123.456",
+        "leave_type": "PTO",
+        "start_date": "2024-03-20",
+        "end_date": "2024-03-22"
+    }
+
+def test_action_token_round_trip(mock_slack_client):
+    """Test that signed buttons are acted on without message blocks and the denial modal carries a token."""
+    from src.slack.action_tokens import ActionTokenSigner
+
+    tokens = ActionTokenSigner("test_secret", metrics=MetricsRegistry())
+    handler = SlackActionsHandler(mock_slack_client, tokens=tokens)
+    value = tokens.sign({
+        "requester_id": "U06MKKWAWJX",
+        "leave_type": "PTO",
+        "start_date": "2024-03-20",
+        "end_date": "2024-03-22"
+    })
+    payload = {
+        "type": "block_actions",
+        "user": {"id": "U06M5QCCLN9"},
+        "trigger_id": "trigger123",
+        "actions": [{"action_id": "reject_leave", "value": value}],
+        "container": {"type": "message", "message_ts": "123.456", "channel_id": "C123"}
+    }
+
+    assert handler.handle_action(payload) == {"response_action": "clear"}
+
+    metadata = mock_slack_client.views_open.call_args.kwargs["view"]["private_metadata"]
+    assert handler._load_metadata(metadata)["message_ts"] == "123.456"
+    submission = {
+        "user": {"id": "U06M5QCCLN9"},
+        "view": {
+            "callback_id": "denial_modal",
+            "private_metadata": metadata,
+            "state": {"values": {"denial_reason": {"denial_reason_input": {"value": "No coverage"}}}}
+        }
+    }
+    assert handler.handle_view_submission(submission) == {}
+    assert mock_slack_client.chat_update.call_args.kwargs["ts"] == "123.456"
+
+    # A forged or expired token is refused rather than parsed
+    payload["actions"][0]["value"] = value[:-1] + ("A" if value[-1] != "A" else "B")
+    assert handler.handle_action(payload)["response_action"] == "errors"
+
+def test_action_token_request_is_decided_once(mock_slack_client, tmp_path, monkeypatch):
+    """Test that in token mode a request is still decided exactly once, by its signed approver or a delegate."""
+    from src.config import organization
+    from src.slack.action_tokens import ActionTokenSigner
+    from src.storage.sqlite import SQLiteDatabase
+    from src.storage.leave_requests import LeaveRequestStore
+
+    monkeypatch.setattr(organization, "DEPARTMENTS", {
+        "Engineering": {"head": "H1", "members": ["U1"]},
+        "Operations": {"head": "H2", "members": ["U2"]}
+    })
+    monkeypatch.setattr(organization, "ADMIN_USERS", ["A1"])
+    monkeypatch.setattr(organization, "DELEGATIONS", {"D1": ["H1"]})
+    store = LeaveRequestStore(SQLiteDatabase(str(tmp_path / "leave.db")))
+    tokens = ActionTokenSigner("test_secret", metrics=MetricsRegistry())
+    handler = SlackActionsHandler(mock_slack_client, store=store, tokens=tokens)
+
+    handler.submit_leave_request(LeaveRequest("U1", "pto", "2024-03-20", "2024-03-22", coverage_person="U2",
+                                              tasks="Reviews", reason="Trip"))
+    notification = [call.kwargs for call in mock_slack_client.chat_postMessage.call_args_list
+                    if call.kwargs["channel"] == "H1"][0]
+    buttons = {element["action_id"]: element["value"]
+               for block in notification["blocks"] if block["type"] == "actions" for element in block["elements"]}
+
+    def click(user_id, action_id):
+        return handler.handle_action({
+            "type": "block_actions",
+            "user": {"id": user_id},
+            "trigger_id": "trigger123",
+            "actions": [{"action_id": action_id, "value": buttons[action_id]}],
+            "container": {"type": "message", "message_ts": "123.456", "channel_id": "H1"}
+        })
+
+    # A token signed for another approver is refused even for a head who may decide U1
+    stale = tokens.sign(dict(tokens.verify(buttons["approve_leave"]), approver_id="H2"))
+    assert handler.handle_action({
+        "type": "block_actions", "user": {"id": "H1"},
+        "actions": [{"action_id": "approve_leave", "value": stale}],
+        "container": {"type": "message", "message_ts": "123.456", "channel_id": "H1"}
+    })["response_action"] == "errors"
+
+    assert click("D1", "approve_leave") == {"response_action": "clear"}
+    assert click("H1", "approve_leave")["errors"]["action"] == "This request has already been decided"
+    assert store.overlapping("2024-03-21", "2024-03-21", requester_id="U1")
+
+def test_reopened_denial_modal_carries_token(mock_slack_client):
+    """Test that the denial modal opened from the re-open prompt keeps a signed token."""
+    from src.slack.action_tokens import ActionTokenSigner, is_action_token
+
+    tokens = ActionTokenSigner("test_secret", metrics=MetricsRegistry())
+    handler = SlackActionsHandler(mock_slack_client, tokens=tokens)
+    value = tokens.sign({"requester_id": "U06MKKWAWJX", "channel_id": "C123", "message_ts": "123.456",
+                         "leave_type": "PTO", "start_date": "2024-03-20", "end_date": "2024-03-22"})
+
+    result = handler.handle_action({
+        "type": "block_actions",
+        "user": {"id": "U06M5QCCLN9"},
+        "trigger_id": "trigger123",
+        "actions": [{"action_id": "reopen_denial_modal", "value": value}]
+    })
+
+    assert result == {"response_action": "clear"}
+    metadata = mock_slack_client.views_open.call_args.kwargs["view"]["private_metadata"]
+    assert is_action_token(metadata)
+    assert handler._load_metadata(metadata)["message_ts"] == "123.456"
+
+def test_processed_request_updates_form_defaults(mock_slack_client):
+    """Test that an accepted request is folded into the requester's form defaults."""
+    defaults = MagicMock()
+    handler = SlackActionsHandler(mock_slack_client, defaults=defaults)
+    leave_request = LeaveRequest("U06MKKWAWJX", "pto", "2024-03-20", coverage_person="U2", tasks="Reviews")
+
+    handler._process_leave_request(leave_request)
+
+    defaults.record.assert_called_once_with(leave_request)
+
+def test_approver_notification_shows_requester_profile(mock_slack_client):
+    """Test that the approver sees the requester's cached profile under the request details."""
+    profiles = MagicMock()
+    profiles.get.return_value = {"id": "U06MKKWAWJX", "name": "annie", "title": None, "tz_label": "Philippine Standard Time"}
+    handler = SlackActionsHandler(mock_slack_client, executor=MagicMock(), profiles=profiles)
+
+    handler._process_leave_request(LeaveRequest("U06MKKWAWJX", "pto", "2024-03-20", coverage_person="U2", tasks="Reviews"))
+
+    profiles.get.assert_called_with("U06MKKWAWJX")
+    notification = [call.kwargs for call in mock_slack_client.chat_postMessage.call_args_list
+                    if call.kwargs["channel"] != "U06MKKWAWJX"][0]
+    assert notification["blocks"][1]["block_id"] == "requester_profile"
+    assert notification["blocks"][1]["elements"][0]["text"].startswith("*annie* · :clock3: Philippine Standard Time")
+
+def test_outbox_submission_does_not_wait_for_profile(mock_slack_client):
+    """Test that a submission recorded in the outbox is acked without calling users.info inline."""
+    from src.slack.user_profiles import UserProfileCache
+
+    release = threading.Event()
+    callers = []
+
+    def users_info(user):
+        callers.append(threading.current_thread())
+        release.wait(5)
+        return {"user": {"id": user, "profile": {"display_name": "annie"}}}
+
+    mock_slack_client.users_info.side_effect = users_info
+    outbox = MagicMock()
+    profiles = UserProfileCache(mock_slack_client, metrics=MetricsRegistry())
+    handler = SlackActionsHandler(mock_slack_client, outbox=outbox, profiles=profiles)
+    submission = {"type": "view_submission", "user": {"id": "U06MKKWAWJX"}, "view": {
+        "callback_id": "leave_request_modal",
+        "state": {"values": {
+            "leave_type_block": {"leave_type": {"selected_option": {"value": "pto", "text": {"text": "PTO"}}}},
+            "date_block": {"start_date": {"selected_date": "2024-03-20"}},
+            "end_date_block": {"end_date": {"selected_date": "2024-03-22"}},
+            "coverage_block": {"coverage_person": {"selected_user": "U2"}},
+            "tasks_block": {"tasks": {"value": "Reviews"}},
+            "reason_block": {"reason": {"value": "Trip"}}
+        }}
+    }}
+
+    try:
+        assert handler.handle_view_submission(submission) == {}
+        assert threading.current_thread() not in callers
+        blocks = [call.kwargs["blocks"] for call in outbox.enqueue.call_args_list if "blocks" in call.kwargs]
+        assert blocks and all(block.get("block_id") != "requester_profile" for block in blocks[-1])
+    finally:
+        release.set()
+
+def test_leave_form_dates_are_validated_inline(mock_slack_client):
+    """Test that changing a date in the open form shows its error with views_update."""
+    handler = SlackActionsHandler(mock_slack_client)
+    view = {
+        "id": "V123",
+        "hash": "h1",
+        "type": "modal",
+        "callback_id": "leave_request_modal",
+        "blocks": [{"type": "input", "block_id": "date_block"}, {"type": "input", "block_id": "end_date_block"}],
+        "state": {"values": {
+            "date_block": {"start_date": {"type": "datepicker", "selected_date": "2024-03-22"}},
+            "end_date_block": {"end_date": {"type": "datepicker", "selected_date": "2024-03-20"}}
+        }}
+    }
+    payload = {
+        "type": "block_actions",
+        "user": {"id": "U123"},
+        "container": {"type": "view", "view_id": "V123"},
+        "actions": [{"action_id": "end_date", "block_id": "end_date_block", "selected_date": "2024-03-20"}],
+        "view": view
+    }
+
+    assert handler.handle_action(payload) == {}
+
+    kwargs = mock_slack_client.views_update.call_args.kwargs
+    assert (kwargs["view_id"], kwargs["hash"]) == ("V123", "h1")
+    assert kwargs["view"]["blocks"][-1]["block_id"] == "end_date_block_validation"
+
+    # Submitting anyway is refused with the same error
+    submission = {"type": "view_submission", "user": {"id": "U123"}, "view": dict(view, state={"values": {
+        "leave_type_block": {"leave_type": {"selected_option": {"value": "pto", "text": {"text": "PTO"}}}},
+        "date_block": {"start_date": {"selected_date": "2024-03-22"}},
+        "end_date_block": {"end_date": {"selected_date": "2024-03-20"}},
+        "coverage_block": {"coverage_person": {"selected_user": "U2"}},
+        "tasks_block": {"tasks": {"value": "Reviews"}},
+        "reason_block": {"reason": {"value": "Trip"}}
+    }})}
+    result = handler.handle_view_submission(submission)
+    assert result["response_action"] == "errors"
+    assert "end_date_block" in result["errors"]
+
+def test_repeated_submission_is_rejected_as_overlap(mock_slack_client, tmp_path):
+    """Test that submitting the same dates twice is refused the second time despite the cache."""
+    from src.storage.sqlite import SQLiteDatabase
+    from src.storage.leave_requests import LeaveRequestStore
+
+    store = LeaveRequestStore(SQLiteDatabase(str(tmp_path / "leave.db")))
+    handler = SlackActionsHandler(mock_slack_client, store=store)
+    state = {"values": {
+        "leave_type_block": {"leave_type": {"selected_option": {"value": "pto", "text": {"text": "PTO"}}}},
+        "date_block": {"start_date": {"selected_date": "2024-03-20"}},
+        "end_date_block": {"end_date": {"selected_date": "2024-03-22"}},
+        "coverage_block": {"coverage_person": {"selected_user": "U2"}},
+        "tasks_block": {"tasks": {"value": "Reviews"}},
+        "reason_block": {"reason": {"value": "Trip"}}
+    }}
+    submission = {"type": "view_submission", "user": {"id": "U123"},
+                  "view": {"callback_id": "leave_request_modal", "state": state}}
+
+    # Validated (and cached) while the form was filled in
+    assert handler.validator.validate("U123", "2024-03-20", "2024-03-22", "U2") == {}
+    assert handler.handle_view_submission(submission) == {}
+    result = handler.handle_view_submission(submission)
+
+    assert result["response_action"] == "errors"
+    assert "date_block" in result["errors"]
+
+@pytest.mark.parametrize("approver_id, allowed", [
+    ("U06MM2BKMM2", True),   # the requester's department head
+    ("D123", False),         # head of another department
+    ("U06M5QCCLN9", True),   # admin
+])
+def test_only_the_requesters_head_or_an_admin_decides(mock_slack_client, tmp_path, approver_id, allowed):
+    """Test that a department head cannot decide requests from outside their team."""
+    from src.storage.sqlite import SQLiteDatabase
+    from src.storage.leave_requests import LeaveRequestStore
+
+    store = LeaveRequestStore(SQLiteDatabase(str(tmp_path / "leave.db")))
+    handler = SlackActionsHandler(mock_slack_client, store=store)
+    request_id = store.create("U234567", "pto", "2024-03-20", "2024-03-22", leave_type_display="PTO")
+
+    result = handler.handle_action({
+        "type": "block_actions",
+        "user": {"id": approver_id},
+        "actions": [{"action_id": "approve_leave", "value": request_id}],
+        "container": {"type": "message", "message_ts": "123.456", "channel_id": "C123"}
+    })
+
+    refused = result == {"response_action": "errors",
+                         "errors": {"action": "You are not authorized to perform this action"}}
+    assert refused is not allowed
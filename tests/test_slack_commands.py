@@ -202,6 +202,27 @@ def test_handle_slack_api_error(command_handler, sample_command_payload):
     assert response["ok"] is False
     assert "Failed to open leave request form" in response["error"]
 
+def test_expired_trigger_offers_reopen_button(command_handler, sample_command_payload):
+    """Test that an expired trigger falls back to an ephemeral re-open prompt."""
+    command_handler.client.views_open.side_effect = SlackApiError(
+        "error",
+        {"error": "expired_trigger_id"}
+    )
+
+    response = command_handler.handle_command(sample_command_payload)
+
+    assert response["response_type"] == "ephemeral"
+    button = response["blocks"][1]["elements"][0]
+    assert button["action_id"] == "reopen_leave_request_form"
+
+def test_reopen_leave_request_form(command_handler):
+    """Test that the re-open button opens the form with its own trigger."""
+    command_handler.reopen_leave_request_form({"trigger_id": "T999", "user": {"id": "U123"}})
+
+    kwargs = command_handler.client.views_open.call_args.kwargs
+    assert kwargs["trigger_id"] == "T999"
+    assert kwargs["view"]["callback_id"] == "leave_request_modal"
+
 def test_modal_template_loading(command_handler):
     """Test that the modal template is loaded correctly."""
     modal = command_handler._load_modal_template()
@@ -221,4 +242,64 @@ def test_modal_template_loading(command_handler):
     ]
 
     for field in required_fields:
-        assert field in block_ids, f"Missing required field: {field}" 
\ No newline at end of file
+        assert field in block_ids, f"Missing required field: {field}" 
+
+def test_modal_is_prefilled_from_defaults(mock_slack_client, sample_command_payload):
+    """Test that the form opens with the user's defaults."""
+    defaults = MagicMock()
+    defaults.get.return_value = {"coverage_person": "U2", "tasks": "Reviews", "leave_type": "pto"}
+    handler = SlackCommandsHandler(mock_slack_client, defaults=defaults)
+
+    handler.handle_command(sample_command_payload)
+
+    defaults.get.assert_called_once_with("U123")
+    blocks = {block.get("block_id"): block for block in mock_slack_client.views_open.call_args.kwargs["view"]["blocks"]}
+    assert blocks["coverage_block"]["element"]["initial_user"] == "U2"
+    assert blocks["tasks_block"]["element"]["initial_value"] == "Reviews"
+    assert blocks["leave_type_block"]["element"]["initial_option"]["value"] == "pto"
+
+def test_command_text_submits_without_modal(mock_slack_client):
+    """Test that a complete request in the command text is submitted directly."""
+    defaults = MagicMock()
+    defaults.get.return_value = {"coverage_person": "U2", "tasks": "Reviews", "leave_type": "pto"}
+    submit = MagicMock()
+    handler = SlackCommandsHandler(mock_slack_client, defaults=defaults, submit=submit)
+
+    result = handler.handle_command({"command": "/leave", "trigger_id": "T123", "user_id": "U123",
+                                     "text": "sick 2026-11-03 Flu"})
+
+    assert result["ok"] is True
+    mock_slack_client.views_open.assert_not_called()
+    leave_request = submit.call_args.args[0]
+    assert (leave_request.leave_type, leave_request.start_date, leave_request.end_date) == \
+        ("sick_emergency", "2026-11-03", "2026-11-03")
+    assert (leave_request.coverage_person, leave_request.tasks, leave_request.reason) == ("U2", "Reviews", "Flu")
+
+def test_incomplete_command_text_opens_prefilled_modal(mock_slack_client):
+    """Test that missing fields fall back to the form, prefilled from the text."""
+    submit = MagicMock()
+    handler = SlackCommandsHandler(mock_slack_client, submit=submit)
+
+    handler.handle_command({"command": "/leave", "trigger_id": "T123", "user_id": "U123",
+                            "text": "pto 2026-11-03..2026-11-05"})
+
+    submit.assert_not_called()
+    blocks = {block.get("block_id"): block for block in mock_slack_client.views_open.call_args.kwargs["view"]["blocks"]}
+    assert blocks["date_block"]["element"]["initial_date"] == "2026-11-03"
+    assert blocks["end_date_block"]["element"]["initial_date"] == "2026-11-05"
+    assert blocks["leave_type_block"]["element"]["initial_option"]["value"] == "pto"
+
+def test_invalid_command_text_opens_modal_with_errors(mock_slack_client):
+    """Test that a typed request naming yourself as coverage is not submitted but shown in the form."""
+    defaults = MagicMock()
+    defaults.get.return_value = {"tasks": "Reviews"}
+    submit = MagicMock()
+    handler = SlackCommandsHandler(mock_slack_client, defaults=defaults, submit=submit)
+
+    handler.handle_command({"command": "/leave", "trigger_id": "T123", "user_id": "U123",
+                            "text": "pto 2026-11-03..2026-11-05 cover:<@U123|me> Trip"})
+
+    submit.assert_not_called()
+    blocks = {block.get("block_id"): block for block in mock_slack_client.views_open.call_args.kwargs["view"]["blocks"]}
+    assert blocks["coverage_block"]["element"]["initial_user"] == "U123"
+    assert "yourself" in blocks["coverage_block_validation"]["elements"][0]["text"]
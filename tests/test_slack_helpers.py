@@ -6,6 +6,7 @@ from src.slack.slack_helpers import (
     create_denial_modal_view,
     format_date_for_display
 )
+from src.slack.metadata import decode_metadata
 import json
 
 def test_create_admin_notification_blocks():
@@ -111,7 +112,7 @@ def test_create_denial_modal_view():
     
     # Verify private_metadata is present and contains correct data
     assert 'private_metadata' in modal, "private_metadata should be present in modal"
-    metadata = json.loads(modal['private_metadata'])
+    metadata = decode_metadata(modal['private_metadata'])
     assert metadata['requester_id'] == 'U123'
     assert metadata['channel_id'] == 'C456'
     assert metadata['message_ts'] == '1234.5678'
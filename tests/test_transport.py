@@ -0,0 +1,112 @@
+"""
+Tests for the pooled keep-alive Slack transport.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from slack_sdk.errors import SlackApiError
+from src.metrics import MetricsRegistry
+from src.slack.transport import ConnectionPool, PooledWebClient
+
+class SlackAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    status = 200
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.connections.add(self.client_address)
+        if self.server.status == 429:
+            body = json.dumps({"ok": False, "error": "ratelimited"}).encode()
+        else:
+            body = json.dumps({"ok": True, "channel": "C123"}).encode()
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if self.server.status == 429:
+            self.send_header("Retry-After", "3")
+        self.end_headers()
+        self.wfile.write(body)
+        # Close without telling the client, like an idle timeout on Slack's side
+        self.close_connection = self.server.drop_connections
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlackAPIHandler)
+    server.daemon_threads = True
+    server.connections = set()
+    server.status = 200
+    server.drop_connections = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+def make_client(server, metrics):
+    pool = ConnectionPool(max_size=2, metrics=metrics)
+    return PooledWebClient(
+        token="xoxb-test",
+        base_url=f"http://127.0.0.1:{server.server_address[1]}/api/",
+        pool=pool
+    )
+
+def test_calls_reuse_one_connection(server, metrics):
+    """Test that sequential API calls share a keep-alive connection."""
+    client = make_client(server, metrics)
+
+    for _ in range(3):
+        assert client.chat_postMessage(channel="C123", text="Hi")["ok"] is True
+
+    assert len(server.connections) == 1
+    snapshot = metrics.snapshot()
+    assert snapshot["http_pool.misses"] == 1
+    assert snapshot["http_pool.hits"] == 2
+    assert snapshot["http_pool.idle"] == 1
+
+def test_warm_up_pre_connects(server, metrics):
+    """Test that warm_up fills the pool so the first call is a hit."""
+    client = make_client(server, metrics)
+
+    assert client.warm_up() == 2
+    client.chat_postMessage(channel="C123", text="Hi")
+
+    assert metrics.snapshot()["http_pool.hits"] == 1
+    assert metrics.snapshot()["http_pool.connect_time"]["count"] == 2
+
+def test_stale_connection_is_retried(server, metrics):
+    """Test that a connection closed while idle is replaced transparently."""
+    server.drop_connections = True
+    client = make_client(server, metrics)
+    client.chat_postMessage(channel="C123", text="Hi")
+
+    assert client.chat_postMessage(channel="C123", text="Again")["ok"] is True
+    assert len(server.connections) == 2
+    assert metrics.snapshot()["http_pool.discarded"] == 1
+
+def test_rate_limited_response_raises(server, metrics):
+    """Test that a 429 surfaces as SlackApiError with status and Retry-After."""
+    server.status = 429
+    client = make_client(server, metrics)
+
+    with pytest.raises(SlackApiError) as error:
+        client.chat_postMessage(channel="C123", text="Hi")
+
+    assert error.value.response.status_code == 429
+    assert error.value.response.headers["Retry-After"] == "3"
+
+def test_expired_idle_connections_are_closed(server, metrics):
+    """Test that connections idle longer than max_idle are not reused."""
+    client = make_client(server, metrics)
+    client.pool.max_idle = 0
+    client.chat_postMessage(channel="C123", text="Hi")
+    client.chat_postMessage(channel="C123", text="Hi")
+
+    assert metrics.snapshot()["http_pool.misses"] == 2
@@ -0,0 +1,118 @@
+"""
+Tests for the local Slack user directory.
+"""
+import threading
+import pytest
+from unittest.mock import MagicMock
+from src.metrics import MetricsRegistry
+from src.slack.user_directory import UserDirectory, iter_workspace_users
+from src.storage.sqlite import SQLiteDatabase
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+@pytest.fixture
+def db(tmp_path):
+    return SQLiteDatabase(str(tmp_path / "users.db"))
+
+def member(user_id, name, updated=1, **extra):
+    return dict({"id": user_id, "name": name, "real_name": name.title(), "updated": updated}, **extra)
+
+@pytest.fixture
+def client():
+    """users.list split over two pages."""
+    client = MagicMock()
+    pages = {
+        None: {"members": [member("U1", "ann"), member("B1", "bot", is_bot=True)],
+               "response_metadata": {"next_cursor": "page2"}},
+        "page2": {"members": [member("U2", "bob"), member("U3", "cat", deleted=True)],
+                  "response_metadata": {"next_cursor": ""}},
+    }
+    client.users_list.side_effect = lambda limit, cursor=None: pages[cursor]
+    return client
+
+def test_listing_follows_cursors(client):
+    """Test that every page of users.list is read."""
+    assert [user["id"] for user in iter_workspace_users(client)] == ["U1", "B1", "U2", "U3"]
+    assert client.users_list.call_count == 2
+
+def test_sync_then_boot_from_snapshot(client, db, metrics):
+    """Test that a second worker loads the persisted snapshot without calling Slack."""
+    UserDirectory(client, db, metrics=metrics).sync()
+    client.users_list.reset_mock()
+
+    directory = UserDirectory(client, db, metrics=metrics)
+    directory.load()
+
+    assert [user["id"] for user in directory.active_users()] == ["U1", "U2"]
+    assert directory.get("U2")["real_name"] == "Bob"
+    client.users_list.assert_not_called()
+
+def test_events_update_the_directory(client, db, metrics):
+    """Test that team_join and user_change are applied, and stale copies are ignored."""
+    directory = UserDirectory(client, db, refresh_interval=3600, metrics=metrics)
+    directory.load()
+
+    directory.apply_event({"type": "team_join", "user": member("U9", "new", updated=5)})
+    directory.apply_event({"type": "user_change", "user": member("U9", "renamed", updated=7)})
+    directory.apply_event({"type": "user_change", "user": member("U9", "stale", updated=6)})
+
+    assert directory.get("U9")["name"] == "renamed"
+    other = UserDirectory(client, db, metrics=metrics)
+    other.load()
+    assert other.get("U9")["name"] == "renamed"
+
+def test_workers_pick_up_each_others_events(client, db, metrics):
+    """Test that a worker sees changes another worker wrote to the snapshot."""
+    first = UserDirectory(client, db, refresh_interval=0, metrics=metrics)
+    second = UserDirectory(client, db, refresh_interval=0, metrics=metrics)
+    first.load()
+    second.load()
+    db.connection().execute("INSERT INTO slack_user_sync (id, completed_at) VALUES (1, 1e12)")
+
+    first.apply_event({"type": "team_join", "user": member("U9", "new")})
+
+    assert second.get("U9")["name"] == "new"
+    client.users_list.assert_not_called()
+
+def test_stale_snapshot_is_claimed_by_one_worker(client, db, metrics):
+    """Test that only one worker re-downloads a missing snapshot."""
+    first = UserDirectory(client, db, metrics=metrics)
+    second = UserDirectory(client, db, metrics=metrics)
+
+    assert first._claim_full_sync() is True
+    assert second._claim_full_sync() is False
+
+    first.sync()
+    first._syncing = False
+    assert first._claim_full_sync() is False
+
+def test_refresh_thread_downloads_missing_snapshot(client, db, metrics):
+    """Test that a fresh deployment syncs from the refresh thread, without waiting for a lookup."""
+    directory = UserDirectory(client, db, refresh_interval=3600, metrics=metrics)
+    directory.load()
+
+    directory.ensure_running()
+    try:
+        for _ in range(500):
+            if metrics.snapshot().get("user_directory.full_syncs"):
+                break
+            threading.Event().wait(0.01)
+    finally:
+        directory.stop(timeout=5)
+
+    assert metrics.snapshot()["user_directory.full_syncs"] == 1
+    assert [user["id"] for user in directory.active_users()] == ["U1", "U2"]
+
+def test_failed_sync_releases_its_claim(client, db, metrics):
+    """Test that a sync that fails can be retried at once instead of after the claim timeout."""
+    client.users_list.side_effect = RuntimeError("Slack is down")
+    first = UserDirectory(client, db, metrics=metrics)
+    second = UserDirectory(client, db, metrics=metrics)
+
+    assert first._claim_full_sync() is True
+    first._run_sync()
+
+    assert metrics.snapshot()["user_directory.sync_errors"] == 1
+    assert second._claim_full_sync() is True
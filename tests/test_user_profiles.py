@@ -0,0 +1,199 @@
+"""
+Tests for the Slack user profile cache.
+"""
+import threading
+import pytest
+from unittest.mock import MagicMock
+from slack_sdk.errors import SlackApiError
+from src.config import organization
+from src.metrics import MetricsRegistry
+from src.slack.helpers import create_admin_notification_blocks
+from src.slack.user_profiles import UserProfileCache
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+def slack_user(user_id, **extra):
+    return dict({
+        "id": user_id,
+        "name": "ann",
+        "real_name": "Ann Lee",
+        "tz": "Asia/Manila",
+        "tz_label": "Philippine Standard Time",
+        "tz_offset": 28800,
+        "profile": {"display_name": "annie", "title": "Engineer"}
+    }, **extra)
+
+def not_found(error="user_not_found"):
+    return SlackApiError("users.info failed", {"ok": False, "error": error})
+
+@pytest.fixture
+def client():
+    client = MagicMock()
+    client.users_info.side_effect = lambda user: {"user": slack_user(user)}
+    return client
+
+def test_profile_is_cached(client, metrics):
+    """Test that a profile is fetched once and served from the cache afterwards."""
+    profiles = UserProfileCache(client, metrics=metrics)
+
+    first = profiles.get("U1")
+    assert first["name"] == "annie"
+    assert first["title"] == "Engineer"
+    assert first["tz_label"] == "Philippine Standard Time"
+    assert profiles.get("U1") == first
+    assert client.users_info.call_count == 1
+
+    snapshot = metrics.snapshot()
+    assert snapshot["user_profiles.hits"] == 1
+    assert snapshot["user_profiles.misses"] == 1
+    assert snapshot["user_profiles.hit_rate"] == 0.5
+
+def test_profile_expires(client, metrics, monkeypatch):
+    """Test that a profile older than the TTL is fetched again."""
+    now = [1000.0]
+    monkeypatch.setattr("src.slack.user_profiles.time.monotonic", lambda: now[0])
+    profiles = UserProfileCache(client, ttl=60, metrics=metrics)
+
+    profiles.get("U1")
+    now[0] += 59
+    profiles.get("U1")
+    assert client.users_info.call_count == 1
+    now[0] += 2
+    profiles.get("U1")
+    assert client.users_info.call_count == 2
+
+@pytest.mark.parametrize("response", [
+    pytest.param(not_found(), id="unknown"),
+    pytest.param(not_found("user_not_visible"), id="not-visible"),
+    pytest.param({"user": slack_user("U1", deleted=True)}, id="deactivated"),
+])
+def test_missing_user_is_negatively_cached(response, metrics):
+    """Test that unknown and deactivated users are remembered as None."""
+    client = MagicMock()
+    if isinstance(response, Exception):
+        client.users_info.side_effect = response
+    else:
+        client.users_info.return_value = response
+    profiles = UserProfileCache(client, metrics=metrics)
+
+    assert profiles.get("U1") is None
+    assert profiles.get("U1") is None
+    assert client.users_info.call_count == 1
+    assert metrics.snapshot()["user_profiles.negative_hits"] == 1
+
+def test_transient_error_is_not_cached(metrics):
+    """Test that a failed lookup is retried on the next call."""
+    client = MagicMock()
+    client.users_info.side_effect = [not_found("ratelimited"), {"user": slack_user("U1")}]
+    profiles = UserProfileCache(client, metrics=metrics)
+
+    assert profiles.get("U1") is None
+    assert profiles.get("U1")["id"] == "U1"
+    assert metrics.snapshot()["user_profiles.errors"] == 1
+
+def test_concurrent_lookups_share_one_call(metrics):
+    """Test that lookups of a user made while it is being fetched wait for that fetch."""
+    release = threading.Event()
+    client = MagicMock()
+
+    def users_info(user):
+        release.wait(5)
+        return {"user": slack_user(user)}
+
+    client.users_info.side_effect = users_info
+    profiles = UserProfileCache(client, metrics=metrics)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(profiles.get("U1"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    while metrics.snapshot().get("user_profiles.coalesced", 0) < 7:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert client.users_info.call_count == 1
+    assert len(results) == 8 and all(result["id"] == "U1" for result in results)
+
+def test_least_recently_used_is_evicted(client, metrics):
+    """Test that the cache keeps at most max_entries profiles."""
+    profiles = UserProfileCache(client, max_entries=2, metrics=metrics)
+    profiles.get("U1")
+    profiles.get("U2")
+    profiles.get("U1")
+    profiles.get("U3")
+
+    profiles.get("U1")
+    assert client.users_info.call_count == 3
+    profiles.get("U2")
+    assert client.users_info.call_count == 4
+
+def test_admin_notification_shows_requester_profile(client, metrics, monkeypatch):
+    """Test that the admin notification gets a profile context block only with a cache."""
+    monkeypatch.setattr(organization, "DEPARTMENTS", {"Engineering": {"head": "U9", "members": ["U1"]}})
+    leave_request = {
+        "user": {"id": "U1"},
+        "leave_type": "pto",
+        "start_date": "2026-11-03",
+        "end_date": "2026-11-05",
+        "reason": "Trip",
+        "tasks_coverage": "Reviews",
+        "covering_user": {"id": "U2"}
+    }
+
+    plain = create_admin_notification_blocks(leave_request)
+    blocks = create_admin_notification_blocks(leave_request, profiles=UserProfileCache(client, metrics=metrics))
+
+    assert len(blocks) == len(plain) + 1
+    assert blocks[2]["block_id"] == "requester_profile"
+    assert blocks[2]["elements"][0]["text"] == (
+        "*annie* · Engineer · :clock3: Philippine Standard Time · Manager: <@U9>"
+    )
+
+def test_peek_fetches_in_the_background(metrics):
+    """Test that peek returns at once on a miss and has the profile cached for the next call."""
+    release = threading.Event()
+    client = MagicMock()
+
+    def users_info(user):
+        release.wait(5)
+        return {"user": slack_user(user)}
+
+    client.users_info.side_effect = users_info
+    profiles = UserProfileCache(client, metrics=metrics)
+
+    assert profiles.peek("U1") is None
+    assert profiles.peek("U1") is None
+    release.set()
+    assert profiles.get("U1")["id"] == "U1"
+    assert profiles.peek("U1")["name"] == "annie"
+    assert client.users_info.call_count == 1
+
+def test_peek_skips_fetches_when_the_pool_is_full(metrics):
+    """Test that peek never fetches on the calling thread and drops fetches the pool has no room for."""
+    started, release = threading.Event(), threading.Event()
+    fetched_on = []
+    client = MagicMock()
+
+    def users_info(user):
+        fetched_on.append((user, threading.current_thread().name))
+        started.set()
+        release.wait(5)
+        return {"user": slack_user(user)}
+
+    client.users_info.side_effect = users_info
+    profiles = UserProfileCache(client, fetch_workers=1, fetch_queue=1, metrics=metrics)
+
+    assert profiles.peek("U1") is None
+    assert started.wait(5)
+    assert profiles.peek("U2") is None  # queued behind U1
+    assert profiles.peek("U3") is None  # no room, skipped
+    assert metrics.snapshot()["user_profiles.fetch.dropped"] == 1
+    release.set()
+
+    assert profiles.get("U3")["id"] == "U3"
+    assert profiles.get("U2")["id"] == "U2"
+    assert sorted(user for user, _ in fetched_on) == ["U1", "U2", "U3"]
+    assert fetched_on[0] == ("U1", "user_profiles.fetch-0")
@@ -0,0 +1,121 @@
+"""
+Tests for inline leave form validation.
+"""
+import pytest
+from unittest.mock import MagicMock
+from src.metrics import MetricsRegistry
+from src.slack.validation import LeaveFormValidator, updated_view, with_validation_blocks
+from src.storage.leave_requests import LeaveRequestStore
+from src.storage.sqlite import SQLiteDatabase
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+@pytest.fixture
+def store(tmp_path):
+    return LeaveRequestStore(SQLiteDatabase(str(tmp_path / "leave.db")))
+
+def test_end_before_start(metrics):
+    """Test that a range ending before it starts is flagged on the end date."""
+    validator = LeaveFormValidator(metrics=metrics)
+
+    assert validator.validate("U1", "2024-03-22", "2024-03-20", None) == {
+        "end_date_block": "The end date must be on or after the start date"
+    }
+    assert validator.validate("U1", "2024-03-20", None, None) == {}
+
+def test_self_coverage(metrics):
+    """Test that users cannot cover for themselves."""
+    validator = LeaveFormValidator(metrics=metrics)
+
+    assert "coverage_block" in validator.validate("U1", None, None, "U1")
+
+def test_overlaps_with_own_and_coverage_leave(store, metrics):
+    """Test that the calendar flags the user's own overlapping leave and an absent coverage person."""
+    store.create("U1", "pto", "2024-03-18", "2024-03-20")
+    store.create("U2", "pto", "2024-03-21", "2024-03-25")
+    denied = store.create("U3", "pto", "2024-03-21", "2024-03-25")
+    store.decide(denied, "denied", "U9")
+    validator = LeaveFormValidator(store, metrics=metrics)
+
+    errors = validator.validate("U1", "2024-03-20", "2024-03-22", "U2")
+
+    assert errors == {
+        "date_block": "You already have leave from 2024-03-18 to 2024-03-20",
+        "coverage_block": "<@U2> is on leave during these dates"
+    }
+    assert validator.validate("U4", "2024-03-21", "2024-03-22", "U3") == {}
+
+def test_results_are_cached(metrics):
+    """Test that the same inputs are checked against the calendar only once."""
+    store = MagicMock()
+    store.overlapping.return_value = []
+    validator = LeaveFormValidator(store, metrics=metrics)
+
+    for _ in range(3):
+        assert validator.validate("U1", "2024-03-20", "2024-03-22", "U2") == {}
+
+    assert store.overlapping.call_count == 2
+    assert metrics.counter("form_validation.cache_hits").value == 2
+
+def test_cache_is_bounded(metrics):
+    """Test that the oldest results are evicted beyond max_entries."""
+    validator = LeaveFormValidator(max_entries=2, metrics=metrics)
+
+    for day in ("01", "02", "03"):
+        validator.validate("U1", f"2024-03-{day}", None, None)
+
+    assert len(validator._cache) == 2
+
+def test_validation_blocks_replace_previous_warnings():
+    """Test that warnings are inserted under their input and stale ones removed."""
+    blocks = [
+        {"type": "input", "block_id": "date_block"},
+        {"type": "context", "block_id": "date_block_validation", "elements": []},
+        {"type": "input", "block_id": "end_date_block"}
+    ]
+
+    updated = with_validation_blocks(blocks, {"end_date_block": "Too early"})
+
+    assert [block["block_id"] for block in updated] == ["date_block", "end_date_block", "end_date_block_validation"]
+    assert updated[2]["elements"][0]["text"] == ":warning: Too early"
+    assert with_validation_blocks(updated, {"end_date_block": "Too early"}) == updated
+
+def test_updated_view_keeps_only_writable_fields():
+    """Test that read-only fields of the open view are not sent back."""
+    view = {"id": "V1", "hash": "h", "state": {}, "type": "modal", "callback_id": "leave_request_modal",
+            "title": {"type": "plain_text", "text": "Leave"}, "blocks": []}
+
+    assert updated_view(view, [{"type": "divider"}]) == {
+        "type": "modal", "callback_id": "leave_request_modal",
+        "title": {"type": "plain_text", "text": "Leave"}, "blocks": [{"type": "divider"}]
+    }
+
+def test_fresh_and_forgotten_results_see_new_requests(store, metrics):
+    """Test that a cached result is bypassed on submit and dropped when the user submits."""
+    validator = LeaveFormValidator(store, metrics=metrics)
+    assert validator.validate("U1", "2024-03-20", "2024-03-22", "U2") == {}
+    assert validator.validate("U3", "2024-03-20", "2024-03-22", "U1") == {}
+
+    store.create("U1", "pto", "2024-03-20", "2024-03-22")
+    assert validator.validate("U1", "2024-03-20", "2024-03-22", "U2") == {}
+    assert "date_block" in validator.validate("U1", "2024-03-20", "2024-03-22", "U2", fresh=True)
+
+    validator.forget("U1")
+    assert "coverage_block" in validator.validate("U3", "2024-03-20", "2024-03-22", "U1")
+
+def test_inactive_coverage_is_flagged(metrics):
+    """Test that bots and deactivated users cannot be chosen to cover, while unknown users can."""
+    users = MagicMock()
+    users.get.side_effect = {
+        "B1": {"id": "B1", "is_bot": True, "deleted": False},
+        "U2": {"id": "U2", "is_bot": False, "deleted": True},
+        "U3": {"id": "U3", "is_bot": False, "deleted": False},
+    }.get
+    validator = LeaveFormValidator(users=users, metrics=metrics)
+
+    assert "coverage_block" in validator.validate("U1", None, None, "B1")
+    assert "coverage_block" in validator.validate("U1", None, None, "U2")
+    assert validator.validate("U1", None, None, "U3") == {}
+    assert validator.validate("U1", None, None, "U9") == {}
@@ -0,0 +1,67 @@
+"""
+Tests for Slack request signature verification.
+"""
+import hmac
+import hashlib
+import time
+import pytest
+from src.metrics import MetricsRegistry
+from src.slack.verification import SlackRequestVerifier
+
+SECRET = "test_signing_secret"
+
+def sign(body: bytes, timestamp: str) -> str:
+    return 'v0=' + hmac.new(SECRET.encode(), f"v0:{timestamp}:".encode() + body, hashlib.sha256).hexdigest()
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+@pytest.fixture
+def verifier(metrics):
+    return SlackRequestVerifier(SECRET, replay_cache_size=2, metrics=metrics)
+
+def test_valid_signature(verifier, metrics):
+    """Test that a correctly signed body is accepted and timed."""
+    timestamp = str(int(time.time()))
+    body = b"command=%2Fleave&user_id=U123"
+
+    assert verifier.verify(timestamp, sign(body, timestamp), body) is None
+    assert metrics.snapshot()["verification.latency"]["count"] == 1
+
+def test_invalid_signature(verifier):
+    """Test that a tampered body is rejected."""
+    timestamp = str(int(time.time()))
+    signature = sign(b"user_id=U123", timestamp)
+
+    assert verifier.verify(timestamp, signature, b"user_id=U999") == "Invalid request signature"
+    assert verifier.verify(None, signature, b"user_id=U123") == "Invalid request signature"
+    assert verifier.verify("not-a-number", signature, b"user_id=U123") == "Invalid request signature"
+
+def test_stale_timestamp(verifier):
+    """Test that old requests are rejected."""
+    timestamp = str(int(time.time()) - 60 * 10)
+    body = b"user_id=U123"
+
+    assert verifier.verify(timestamp, sign(body, timestamp), body) == "Request too old"
+
+def test_replay_is_rejected(verifier, metrics):
+    """Test that a signature is accepted only once."""
+    timestamp = str(int(time.time()))
+    body = b"user_id=U123"
+    signature = sign(body, timestamp)
+
+    assert verifier.verify(timestamp, signature, body) is None
+    assert verifier.verify(timestamp, signature, body) == "Request replayed"
+    assert metrics.snapshot()["verification.replayed"] == 1
+
+def test_replay_cache_is_bounded(verifier):
+    """Test that the least recently seen signatures are evicted."""
+    timestamp = str(int(time.time()))
+    bodies = [b"a=1", b"a=2", b"a=3"]
+    for body in bodies:
+        assert verifier.verify(timestamp, sign(body, timestamp), body) is None
+
+    # The first signature was evicted by the size-2 cache
+    assert verifier.verify(timestamp, sign(bodies[0], timestamp), bodies[0]) is None
+    assert verifier.verify(timestamp, sign(bodies[2], timestamp), bodies[2]) == "Request replayed"